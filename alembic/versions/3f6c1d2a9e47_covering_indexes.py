@@ -0,0 +1,73 @@
+"""Covering indexes for availability and employee queries
+
+Revision ID: 3f6c1d2a9e47
+Revises: b94d2caa7d25
+Create Date: 2026-10-19 09:12:31.482190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c1d2a9e47'
+down_revision: Union[str, None] = 'b94d2caa7d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_daily_availabilities_date_covering',
+            'daily_availabilities',
+            ['date'],
+            unique=False,
+            postgresql_include=['employee_id', 'status_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_employees_operational_role_id_is_active',
+            'employees',
+            ['operational_role_id', 'is_active'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # El índice covering reemplaza al índice simple por fecha.
+        op.drop_index(
+            'ix_daily_availabilities_date',
+            table_name='daily_availabilities',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_daily_availabilities_date',
+            'daily_availabilities',
+            ['date'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_employees_operational_role_id_is_active',
+            table_name='employees',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_daily_availabilities_date_covering',
+            table_name='daily_availabilities',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
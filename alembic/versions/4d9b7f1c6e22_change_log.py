@@ -0,0 +1,86 @@
+"""Change log fed by triggers for the incremental sync feed
+
+Revision ID: 4d9b7f1c6e22
+Revises: c81d5e3f2a60
+Create Date: 2026-10-19 12:41:18.905524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d9b7f1c6e22'
+down_revision: Union[str, None] = 'c81d5e3f2a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia congelada de models/changeLog.py al momento de esta revisión.
+CHANGE_LOG_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION record_row_changes() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('nutripae.skip_change_log', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO change_log (tx_id, entity, entity_id, operation)
+        SELECT pg_current_xact_id()::text::bigint, TG_ARGV[0], (to_jsonb(o) ->> 'id')::integer, 'delete'
+          FROM old_rows o
+         ORDER BY 3;
+    ELSE
+        INSERT INTO change_log (tx_id, entity, entity_id, operation, data)
+        SELECT pg_current_xact_id()::text::bigint, TG_ARGV[0], (to_jsonb(n) ->> 'id')::integer, lower(TG_OP), to_jsonb(n)
+          FROM new_rows n
+         ORDER BY 3;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+TRACKED_TABLES = {
+    "employees": "employee",
+    "daily_availabilities": "daily_availability",
+}
+
+TRIGGER_EVENTS = {
+    "insert": "INSERT", "update": "UPDATE", "delete": "DELETE",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('change_log',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('tx_id', sa.BigInteger(), nullable=False),
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(length=8), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('changed_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_log_tx_id_id', 'change_log', ['tx_id', 'id'], unique=False)
+    op.execute(CHANGE_LOG_FUNCTION_SQL)
+    for table, entity in TRACKED_TABLES.items():
+        for suffix, event in TRIGGER_EVENTS.items():
+            transition = "OLD TABLE AS old_rows" if event == "DELETE" else "NEW TABLE AS new_rows"
+            op.execute(
+                f"CREATE TRIGGER {table}_change_log_{suffix} AFTER {event} ON {table} "
+                f"REFERENCING {transition} FOR EACH STATEMENT EXECUTE FUNCTION record_row_changes('{entity}')"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TRACKED_TABLES:
+        for suffix in TRIGGER_EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_change_log_{suffix} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS record_row_changes()")
+    op.drop_index('ix_change_log_tx_id_id', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,85 @@
+"""Incrementally maintained employee counts per operational role
+
+Revision ID: 7a2e9c4b1f03
+Revises: 3f6c1d2a9e47
+Create Date: 2026-10-19 10:02:47.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2e9c4b1f03'
+down_revision: Union[str, None] = '3f6c1d2a9e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia congelada de models/roleEmployeeCount.py al momento de esta revisión.
+ROLE_COUNTS_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION employees_update_role_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.operational_role_id = NEW.operational_role_id
+       AND OLD.is_active = NEW.is_active THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE operational_role_employee_counts
+           SET total_count = total_count - 1,
+               active_count = active_count - CASE WHEN OLD.is_active THEN 1 ELSE 0 END
+         WHERE operational_role_id = OLD.operational_role_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO operational_role_employee_counts (operational_role_id, total_count, active_count)
+        VALUES (NEW.operational_role_id, 1, CASE WHEN NEW.is_active THEN 1 ELSE 0 END)
+        ON CONFLICT (operational_role_id) DO UPDATE
+           SET total_count = operational_role_employee_counts.total_count + 1,
+               active_count = operational_role_employee_counts.active_count + EXCLUDED.active_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+ROLE_COUNTS_TRIGGER_SQL = """
+CREATE TRIGGER employees_role_counts
+AFTER INSERT OR DELETE OR UPDATE OF operational_role_id, is_active ON employees
+FOR EACH ROW EXECUTE FUNCTION employees_update_role_counts()
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('operational_role_employee_counts',
+    sa.Column('operational_role_id', sa.Integer(), nullable=False),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.Column('active_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['operational_role_id'], ['operational_roles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('operational_role_id')
+    )
+    # Bloquea escrituras en employees mientras se instala el trigger y se calculan
+    # los contadores iniciales, para que ningún cambio quede sin contar.
+    op.execute("LOCK TABLE employees IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(ROLE_COUNTS_FUNCTION_SQL)
+    op.execute(ROLE_COUNTS_TRIGGER_SQL)
+    op.execute(
+        """
+        INSERT INTO operational_role_employee_counts (operational_role_id, total_count, active_count)
+        SELECT operational_role_id, count(*), count(*) FILTER (WHERE is_active)
+          FROM employees
+         GROUP BY operational_role_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS employees_role_counts ON employees")
+    op.execute("DROP FUNCTION IF EXISTS employees_update_role_counts()")
+    op.drop_table('operational_role_employee_counts')
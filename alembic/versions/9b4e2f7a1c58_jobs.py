@@ -0,0 +1,55 @@
+"""Background jobs queue
+
+Revision ID: 9b4e2f7a1c58
+Revises: e5a0b3c7d914
+Create Date: 2026-10-19 15:26:40.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e2f7a1c58'
+down_revision: Union[str, None] = 'e5a0b3c7d914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('job_type', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=16), server_default=sa.text("'queued'"), nullable=False),
+    sa.Column('params', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'::jsonb"), nullable=False),
+    sa.Column('created_by', sa.String(length=255), nullable=True),
+    sa.Column('progress_done', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('progress_total', sa.Integer(), nullable=True),
+    sa.Column('progress_message', sa.String(length=255), nullable=True),
+    sa.Column('cancel_requested', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('result_path', sa.String(length=500), nullable=True),
+    sa.Column('result_content_type', sa.String(length=100), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('worker_id', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('heartbeat_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_queued', 'jobs', ['job_type', 'id'], unique=False,
+                    postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('ix_jobs_running_heartbeat', 'jobs', ['heartbeat_at'], unique=False,
+                    postgresql_where=sa.text("status = 'running'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_running_heartbeat', table_name='jobs', postgresql_where=sa.text("status = 'running'"))
+    op.drop_index('ix_jobs_queued', table_name='jobs', postgresql_where=sa.text("status = 'queued'"))
+    op.drop_table('jobs')
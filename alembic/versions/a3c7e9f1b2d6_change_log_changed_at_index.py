@@ -0,0 +1,43 @@
+"""Index change_log.changed_at for the retention purge
+
+Revision ID: a3c7e9f1b2d6
+Revises: d1e8b3f6a9c4
+Create Date: 2026-10-19 23:05:41.318624
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c7e9f1b2d6'
+down_revision: Union[str, None] = 'd1e8b3f6a9c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_change_log_changed_at',
+            'change_log',
+            ['changed_at'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_change_log_changed_at',
+            table_name='change_log',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,92 @@
+"""Allow bulk loads to skip the per-role employee count trigger
+
+Revision ID: b8e4d1f6a2c7
+Revises: d27c8e1b5a49
+Create Date: 2026-10-19 19:05:44.271836
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4d1f6a2c7'
+down_revision: Union[str, None] = 'd27c8e1b5a49'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia congelada de models/roleEmployeeCount.py al momento de esta revisión.
+ROLE_COUNTS_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION employees_update_role_counts() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('nutripae.skip_role_counts', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'UPDATE'
+       AND OLD.operational_role_id = NEW.operational_role_id
+       AND OLD.is_active = NEW.is_active THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE operational_role_employee_counts
+           SET total_count = total_count - 1,
+               active_count = active_count - CASE WHEN OLD.is_active THEN 1 ELSE 0 END
+         WHERE operational_role_id = OLD.operational_role_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO operational_role_employee_counts (operational_role_id, total_count, active_count)
+        VALUES (NEW.operational_role_id, 1, CASE WHEN NEW.is_active THEN 1 ELSE 0 END)
+        ON CONFLICT (operational_role_id) DO UPDATE
+           SET total_count = operational_role_employee_counts.total_count + 1,
+               active_count = operational_role_employee_counts.active_count + EXCLUDED.active_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# La de la revisión 7a2e9c4b1f03, para el downgrade.
+PREVIOUS_ROLE_COUNTS_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION employees_update_role_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.operational_role_id = NEW.operational_role_id
+       AND OLD.is_active = NEW.is_active THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE operational_role_employee_counts
+           SET total_count = total_count - 1,
+               active_count = active_count - CASE WHEN OLD.is_active THEN 1 ELSE 0 END
+         WHERE operational_role_id = OLD.operational_role_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO operational_role_employee_counts (operational_role_id, total_count, active_count)
+        VALUES (NEW.operational_role_id, 1, CASE WHEN NEW.is_active THEN 1 ELSE 0 END)
+        ON CONFLICT (operational_role_id) DO UPDATE
+           SET total_count = operational_role_employee_counts.total_count + 1,
+               active_count = operational_role_employee_counts.active_count + EXCLUDED.active_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(ROLE_COUNTS_FUNCTION_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(PREVIOUS_ROLE_COUNTS_FUNCTION_SQL)
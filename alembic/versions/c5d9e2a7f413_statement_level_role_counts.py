@@ -0,0 +1,145 @@
+"""Statement-level role count triggers that lock counters in role order
+
+Revision ID: c5d9e2a7f413
+Revises: b8e4d1f6a2c7
+Create Date: 2026-10-19 21:14:08.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d9e2a7f413'
+down_revision: Union[str, None] = 'b8e4d1f6a2c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia congelada de models/roleEmployeeCount.py al momento de esta revisión.
+ROLE_COUNTS_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION employees_update_role_counts() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('nutripae.skip_role_counts', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO operational_role_employee_counts AS counts (operational_role_id, total_count, active_count)
+        SELECT operational_role_id, count(*), count(*) FILTER (WHERE is_active)
+          FROM new_rows
+         GROUP BY operational_role_id
+         ORDER BY operational_role_id
+        ON CONFLICT (operational_role_id) DO UPDATE
+           SET total_count = counts.total_count + EXCLUDED.total_count,
+               active_count = counts.active_count + EXCLUDED.active_count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO operational_role_employee_counts AS counts (operational_role_id, total_count, active_count)
+        SELECT operational_role_id, -count(*), -count(*) FILTER (WHERE is_active)
+          FROM old_rows
+         GROUP BY operational_role_id
+         ORDER BY operational_role_id
+        ON CONFLICT (operational_role_id) DO UPDATE
+           SET total_count = counts.total_count + EXCLUDED.total_count,
+               active_count = counts.active_count + EXCLUDED.active_count;
+    ELSE
+        INSERT INTO operational_role_employee_counts AS counts (operational_role_id, total_count, active_count)
+        SELECT operational_role_id, sum(total_delta), sum(active_delta)
+          FROM (
+                SELECT operational_role_id, 1 AS total_delta, CASE WHEN is_active THEN 1 ELSE 0 END AS active_delta
+                  FROM new_rows
+                 UNION ALL
+                SELECT operational_role_id, -1, CASE WHEN is_active THEN -1 ELSE 0 END
+                  FROM old_rows
+               ) AS deltas
+         GROUP BY operational_role_id
+        HAVING sum(total_delta) <> 0 OR sum(active_delta) <> 0
+         ORDER BY operational_role_id
+        ON CONFLICT (operational_role_id) DO UPDATE
+           SET total_count = counts.total_count + EXCLUDED.total_count,
+               active_count = counts.active_count + EXCLUDED.active_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+ROLE_COUNTS_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER employees_role_counts_insert
+    AFTER INSERT ON employees REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION employees_update_role_counts()
+    """,
+    """
+    CREATE TRIGGER employees_role_counts_update
+    AFTER UPDATE ON employees REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION employees_update_role_counts()
+    """,
+    """
+    CREATE TRIGGER employees_role_counts_delete
+    AFTER DELETE ON employees REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION employees_update_role_counts()
+    """,
+]
+
+# Las de la revisión b8e4d1f6a2c7, para el downgrade.
+PREVIOUS_ROLE_COUNTS_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION employees_update_role_counts() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('nutripae.skip_role_counts', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'UPDATE'
+       AND OLD.operational_role_id = NEW.operational_role_id
+       AND OLD.is_active = NEW.is_active THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE operational_role_employee_counts
+           SET total_count = total_count - 1,
+               active_count = active_count - CASE WHEN OLD.is_active THEN 1 ELSE 0 END
+         WHERE operational_role_id = OLD.operational_role_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO operational_role_employee_counts (operational_role_id, total_count, active_count)
+        VALUES (NEW.operational_role_id, 1, CASE WHEN NEW.is_active THEN 1 ELSE 0 END)
+        ON CONFLICT (operational_role_id) DO UPDATE
+           SET total_count = operational_role_employee_counts.total_count + 1,
+               active_count = operational_role_employee_counts.active_count + EXCLUDED.active_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+PREVIOUS_ROLE_COUNTS_TRIGGER_SQL = """
+CREATE TRIGGER employees_role_counts
+AFTER INSERT OR DELETE OR UPDATE OF operational_role_id, is_active ON employees
+FOR EACH ROW EXECUTE FUNCTION employees_update_role_counts()
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sin escrituras en employees durante el cambio de triggers: ningún cambio queda sin contar.
+    op.execute("LOCK TABLE employees IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER IF EXISTS employees_role_counts ON employees")
+    op.execute(ROLE_COUNTS_FUNCTION_SQL)
+    for trigger_sql in ROLE_COUNTS_TRIGGERS_SQL:
+        op.execute(trigger_sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("LOCK TABLE employees IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER IF EXISTS employees_role_counts_insert ON employees")
+    op.execute("DROP TRIGGER IF EXISTS employees_role_counts_update ON employees")
+    op.execute("DROP TRIGGER IF EXISTS employees_role_counts_delete ON employees")
+    op.execute(PREVIOUS_ROLE_COUNTS_FUNCTION_SQL)
+    op.execute(PREVIOUS_ROLE_COUNTS_TRIGGER_SQL)
@@ -0,0 +1,46 @@
+"""Delete daily availabilities with their employee at the database level
+
+Revision ID: c81d5e3f2a60
+Revises: 7a2e9c4b1f03
+Create Date: 2026-10-19 11:20:05.630217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81d5e3f2a60'
+down_revision: Union[str, None] = '7a2e9c4b1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Nombre que PostgreSQL asignó a la FK sin nombre de la migración inicial.
+CONSTRAINT_NAME = 'daily_availabilities_employee_id_fkey'
+
+
+def _replace_foreign_key(**kwargs) -> None:
+    """
+    Cambia la FK en dos pasos: se agrega como NOT VALID (sin revisar las filas, con un
+    lock breve) y se valida después de confirmar, fuera de la transacción de la
+    migración: VALIDATE CONSTRAINT no bloquea las escrituras sobre las tablas.
+    """
+    op.drop_constraint(CONSTRAINT_NAME, 'daily_availabilities', type_='foreignkey')
+    op.create_foreign_key(
+        CONSTRAINT_NAME, 'daily_availabilities', 'employees', ['employee_id'], ['id'],
+        postgresql_not_valid=True, **kwargs
+    )
+    with op.get_context().autocommit_block():
+        op.execute(f'ALTER TABLE daily_availabilities VALIDATE CONSTRAINT {CONSTRAINT_NAME}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_foreign_key(ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_foreign_key()
@@ -0,0 +1,56 @@
+"""Commit-ordered, sharded collection version for employee list ETags
+
+Revision ID: d1e8b3f6a9c4
+Revises: c5d9e2a7f413
+Create Date: 2026-10-19 21:47:32.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1e8b3f6a9c4'
+down_revision: Union[str, None] = 'c5d9e2a7f413'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia congelada de models/collectionVersion.py al momento de esta revisión.
+BUMP_VERSION_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO collection_versions (name, shard, version)
+    VALUES (TG_ARGV[0], mod(pg_backend_pid(), 64), 1)
+    ON CONFLICT (name, shard) DO UPDATE SET version = collection_versions.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+EMPLOYEES_VERSION_TRIGGER_SQL = """
+CREATE TRIGGER employees_collection_version
+AFTER INSERT OR UPDATE OR DELETE ON employees
+FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version('employees')
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('collection_versions',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name', 'shard')
+    )
+    op.execute("INSERT INTO collection_versions (name, shard, version) VALUES ('employees', 0, 1)")
+    op.execute(BUMP_VERSION_FUNCTION_SQL)
+    op.execute(EMPLOYEES_VERSION_TRIGGER_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS employees_collection_version ON employees")
+    op.execute("DROP FUNCTION IF EXISTS bump_collection_version()")
+    op.drop_table('collection_versions')
@@ -0,0 +1,50 @@
+"""Transactional outbox for domain events
+
+Revision ID: e5a0b3c7d914
+Revises: 4d9b7f1c6e22
+Create Date: 2026-10-19 14:03:52.271846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a0b3c7d914'
+down_revision: Union[str, None] = '4d9b7f1c6e22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('aggregate_type', sa.String(length=32), nullable=False),
+    sa.Column('aggregate_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=64), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('next_attempt_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('dispatched_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('failed_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_events_pending', 'outbox_events', ['next_attempt_at', 'id'], unique=False,
+                    postgresql_where=sa.text('dispatched_at IS NULL AND failed_at IS NULL'))
+    op.create_index('ix_outbox_events_pending_aggregate', 'outbox_events', ['aggregate_type', 'aggregate_id', 'id'],
+                    unique=False, postgresql_where=sa.text('dispatched_at IS NULL AND failed_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_events_pending_aggregate', table_name='outbox_events',
+                  postgresql_where=sa.text('dispatched_at IS NULL AND failed_at IS NULL'))
+    op.drop_index('ix_outbox_events_pending', table_name='outbox_events',
+                  postgresql_where=sa.text('dispatched_at IS NULL AND failed_at IS NULL'))
+    op.drop_table('outbox_events')
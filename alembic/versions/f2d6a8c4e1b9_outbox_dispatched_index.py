@@ -0,0 +1,44 @@
+"""Index dispatched outbox events for the retention purge
+
+Revision ID: f2d6a8c4e1b9
+Revises: a3c7e9f1b2d6
+Create Date: 2026-10-19 23:31:12.540937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d6a8c4e1b9'
+down_revision: Union[str, None] = 'a3c7e9f1b2d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_outbox_events_dispatched_at',
+            'outbox_events',
+            ['dispatched_at'],
+            unique=False,
+            postgresql_where=sa.text('dispatched_at IS NOT NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_outbox_events_dispatched_at',
+            table_name='outbox_events',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
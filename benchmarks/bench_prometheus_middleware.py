@@ -0,0 +1,166 @@
+"""
+Microbenchmark del costo por petición de PrometheusMiddleware.
+
+Llama directo a la app ASGI (sin servidor ni red) con una mezcla de rutas
+como la del servicio: listados, /employees/{id} con ids distintos, reportes
+y rutas que no existen. Compara:
+
+- no-middleware: la app sola (línea base).
+- legacy-basehttp: la versión anterior, sobre BaseHTTPMiddleware, que recorre
+  app.routes con route.matches() en cada petición y llama a .labels() cada vez.
+- asgi-cached: `utils.telemetrics.PrometheusMiddleware`, ASGI puro con caché
+  LRU de plantillas e hijos de métricas ya ligados.
+
+Uso: PYTHONPATH=src python benchmarks/bench_prometheus_middleware.py [--requests 20000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import APIRouter, FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Match
+from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+
+from utils.telemetrics import (EXCEPTIONS, REQUESTS, REQUESTS_IN_PROGRESS,
+                               REQUESTS_PROCESSING_TIME, RESPONSES,
+                               PrometheusMiddleware)
+
+
+class LegacyPrometheusMiddleware(BaseHTTPMiddleware):
+    """Copia de la implementación anterior (sin el exemplar de OpenTelemetry)."""
+
+    def __init__(self, app, app_name: str = "bench"):
+        super().__init__(app)
+        self.app_name = app_name
+
+    async def dispatch(self, request, call_next):
+        method = request.method
+        path, is_handled_path = self.get_path(request)
+        if not is_handled_path:
+            return await call_next(request)
+
+        REQUESTS_IN_PROGRESS.labels(method=method, path=path, app_name=self.app_name).inc()
+        REQUESTS.labels(method=method, path=path, app_name=self.app_name).inc()
+        before_time = time.perf_counter()
+        try:
+            response = await call_next(request)
+        except BaseException as e:
+            status_code = HTTP_500_INTERNAL_SERVER_ERROR
+            EXCEPTIONS.labels(method=method, path=path, exception_type=type(e).__name__, app_name=self.app_name).inc()
+            raise e from None
+        else:
+            status_code = response.status_code
+            REQUESTS_PROCESSING_TIME.labels(method=method, path=path, app_name=self.app_name).observe(
+                time.perf_counter() - before_time
+            )
+        finally:
+            RESPONSES.labels(method=method, path=path, status_code=status_code, app_name=self.app_name).inc()
+            REQUESTS_IN_PROGRESS.labels(method=method, path=path, app_name=self.app_name).dec()
+        return response
+
+    @staticmethod
+    def get_path(request):
+        for route in request.app.routes:
+            match, child_scope = route.matches(request.scope)
+            if match == Match.FULL:
+                return route.path, True
+        return request.url.path, False
+
+
+def build_app(middleware=None) -> FastAPI:
+    """App con la misma forma de rutas que el servicio y endpoints triviales."""
+    app = FastAPI()
+
+    async def ok():
+        return {"ok": True}
+
+    for prefix, item in (
+        ("/employees", "employee_id"),
+        ("/availabilities", "availability_id"),
+        ("/jobs", "job_id"),
+        ("/parametrics/document-types", "item_id"),
+        ("/parametrics/genders", "item_id"),
+        ("/parametrics/operational-roles", "item_id"),
+        ("/parametrics/availability-statuses", "item_id"),
+    ):
+        router = APIRouter(prefix=prefix)
+        router.add_api_route("/", ok, methods=["GET"])
+        router.add_api_route("/", ok, methods=["POST"])
+        router.add_api_route(f"/{{{item}}}", ok, methods=["GET"])
+        router.add_api_route(f"/{{{item}}}", ok, methods=["PUT"])
+        router.add_api_route(f"/{{{item}}}", ok, methods=["DELETE"])
+        app.include_router(router, prefix="/api/v1")
+    app.add_api_route("/api/v1/changes", ok, methods=["GET"])
+    app.add_api_route("/api/v1/employees/{employee_id}/availabilities", ok, methods=["GET"])
+    if middleware is not None:
+        app.add_middleware(middleware, app_name="bench")
+    return app
+
+
+def build_requests(count: int) -> list[tuple[str, str]]:
+    mix = []
+    for i in range(count):
+        kind = i % 10
+        if kind < 4:
+            mix.append(("GET", f"/api/v1/employees/{i % 5000}"))
+        elif kind < 6:
+            mix.append(("GET", "/api/v1/employees/"))
+        elif kind == 6:
+            mix.append(("PUT", f"/api/v1/availabilities/{i}"))
+        elif kind == 7:
+            mix.append(("GET", f"/api/v1/employees/{i % 300}/availabilities"))
+        elif kind == 8:
+            mix.append(("GET", "/api/v1/changes"))
+        else:
+            mix.append(("GET", f"/api/v1/parametrics/genders/{i % 7}"))
+    return mix
+
+
+async def drive(app, requests) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for method, path in requests:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1),
+            "server": ("bench", 80),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    requests = build_requests(args.requests)
+    results = {}
+    for name, middleware in (
+        ("no-middleware", None),
+        ("legacy-basehttp", LegacyPrometheusMiddleware),
+        ("asgi-cached", PrometheusMiddleware),
+    ):
+        app = build_app(middleware)
+        asyncio.run(drive(app, requests[:1000]))  # calentamiento (construye el stack y llena la caché)
+        results[name] = statistics.median(asyncio.run(drive(app, requests)) for _ in range(args.repeat))
+
+    baseline = results["no-middleware"]
+    print(f"{args.requests} requests, median wall time of {args.repeat} runs")
+    for name, seconds in results.items():
+        per_request = seconds / args.requests * 1e6
+        overhead = (seconds - baseline) / args.requests * 1e6
+        print(f"  {name:<16} {per_request:8.1f} us/request   overhead {overhead:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
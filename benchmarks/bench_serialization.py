@@ -0,0 +1,106 @@
+"""
+Microbenchmark de serialización de respuestas grandes de disponibilidades.
+
+Compara, para 10k filas de `DailyAvailabilityDetails` construidas a partir de
+objetos con atributos (como los que devuelve el ORM):
+
+- fastapi-default: lo que hace FastAPI con `response_model` y JSONResponse
+  (validar, volcar a dicts/listas con mode="json", json.dumps de la stdlib).
+- orjson-response: igual, pero codificando con orjson (default_response_class).
+- typeadapter-json: `utils.serialization.serialize_response`, que valida y
+  escribe directo a bytes JSON desde pydantic-core.
+
+Uso: PYTHONPATH=src python benchmarks/bench_serialization.py [--rows 10000] [--repeat 7]
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+import orjson
+
+import schemas
+from utils.serialization import get_adapter, serialize_response
+
+RESPONSE_TYPE = List[schemas.DailyAvailabilityDetails]
+
+
+def build_rows(count: int) -> list[SimpleNamespace]:
+    roles = [SimpleNamespace(id=i, name=f"Rol {i}", description=f"Descripción del rol {i}") for i in range(4)]
+    statuses = [SimpleNamespace(id=i, name=f"Estado {i}") for i in range(6)]
+    employees = [
+        SimpleNamespace(id=i, full_name=f"Empleado Número {i:05d}", operational_role=roles[i % len(roles)])
+        for i in range(500)
+    ]
+    now = datetime.now(timezone.utc)
+    start = date.today()
+    return [
+        SimpleNamespace(
+            id=i,
+            date=start + timedelta(days=i // len(employees)),
+            status_id=statuses[i % len(statuses)].id,
+            notes="Nota de prueba" if i % 5 == 0 else None,
+            employee_id=employees[i % len(employees)].id,
+            created_at=now,
+            updated_at=now,
+            status=statuses[i % len(statuses)],
+            employee=employees[i % len(employees)],
+        )
+        for i in range(count)
+    ]
+
+
+def fastapi_default(rows) -> bytes:
+    adapter = get_adapter(RESPONSE_TYPE)
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_response(rows) -> bytes:
+    adapter = get_adapter(RESPONSE_TYPE)
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def typeadapter_json(rows) -> bytes:
+    return serialize_response(RESPONSE_TYPE, rows).body
+
+
+def measure(fn, rows, repeat: int) -> list[float]:
+    fn(rows)  # calentamiento (construye el TypeAdapter)
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn(rows)
+        timings.append(time.process_time() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    assert json.loads(fastapi_default(rows)) == json.loads(typeadapter_json(rows))
+
+    results = {}
+    for name, fn in (
+        ("fastapi-default", fastapi_default),
+        ("orjson-response", orjson_response),
+        ("typeadapter-json", typeadapter_json),
+    ):
+        results[name] = statistics.median(measure(fn, rows, args.repeat))
+
+    baseline = results["fastapi-default"]
+    print(f"{args.rows} rows of DailyAvailabilityDetails, median CPU time of {args.repeat} runs")
+    for name, seconds in results.items():
+        print(f"  {name:<18} {seconds * 1000:8.1f} ms   {baseline / seconds:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
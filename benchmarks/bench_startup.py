@@ -0,0 +1,90 @@
+"""
+Tiempo de arranque de la API en procesos nuevos, como el de un pod recién escalado.
+
+Cada corrida es un intérprete nuevo que mide:
+- import: `import main` (Settings, app, routers y middlewares; sin engine ni exportador OTLP).
+- startup: el lifespan completo (trazas, cliente de auth, precalentamiento del pool y de
+  la caché paramétrica). Necesita la base de datos del .env; con --import-only se omite.
+Con --top N muestra además los módulos que más tardan en importarse (python -X importtime).
+
+Uso: PYTHONPATH=src python benchmarks/bench_startup.py [--runs 5] [--import-only] [--top 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+result = {"import": imported - started}
+if "--startup" in sys.argv:
+    async def startup():
+        async with main.app.router.lifespan_context(main.app):
+            result["startup"] = time.perf_counter() - imported
+    asyncio.run(startup())
+print("RESULT " + json.dumps(result), flush=True)
+"""
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT / "src"), env.get("PYTHONPATH")]))
+    return env
+
+
+def run_once(startup: bool) -> dict:
+    args = [sys.executable, "-c", CHILD] + (["--startup"] if startup else [])
+    completed = subprocess.run(args, cwd=ROOT, env=child_env(), capture_output=True, text=True, check=True)
+    # La app escribe logs por stdout: el resultado va en su propia línea marcada
+    line = next(line for line in completed.stdout.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+def slowest_imports(top: int) -> list[tuple[int, str]]:
+    """(microsegundos acumulados, módulo) de los imports más lentos de `import main`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=child_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-only", action="store_true", help="No corre el lifespan (sin base de datos).")
+    parser.add_argument("--top", type=int, default=0, help="Muestra los N módulos más lentos de importar.")
+    args = parser.parse_args()
+
+    run_once(startup=False)  # calentamiento: caché de bytecode y del sistema de archivos
+    results = [run_once(startup=not args.import_only) for _ in range(args.runs)]
+
+    print(f"{args.runs} fresh processes")
+    for phase in ("import", "startup"):
+        values = [result[phase] for result in results if phase in result]
+        if values:
+            print(f"  {phase:<8} median {statistics.median(values) * 1e3:8.1f} ms   "
+                  f"min {min(values) * 1e3:8.1f} ms   max {max(values) * 1e3:8.1f} ms")
+
+    if args.top:
+        print("slowest imports (cumulative) under `import main`:")
+        for microseconds, module in slowest_imports(args.top):
+            print(f"  {microseconds / 1e3:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
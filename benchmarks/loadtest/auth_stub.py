@@ -0,0 +1,29 @@
+"""
+Sustituto local del servicio de autenticación para las pruebas de carga.
+
+Responde check-authorization autorizando todo con un usuario fijo, para que las
+mediciones de la API no dependan de NutriPAE-AUTH. No valida el token.
+
+Lo arranca benchmarks/loadtest/run.py; a mano:
+    uvicorn auth_stub:app --app-dir benchmarks/loadtest --port 8801
+"""
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+USER = {"authorized": True, "user_id": 1, "user_email": "loadtest@nutripae.local", "missing_permissions": []}
+
+
+async def check_authorization(request: Request) -> JSONResponse:
+    return JSONResponse(USER)
+
+
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "healthy"})
+
+
+app = Starlette(routes=[
+    Route("/api/v1/authorization/check-authorization", check_authorization, methods=["POST"]),
+    Route("/", health),
+])
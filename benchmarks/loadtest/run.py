@@ -0,0 +1,304 @@
+"""
+Prueba de carga repetible de la API.
+
+run: levanta el sustituto de auth (auth_stub.py) y la API con `python -m server`, con
+SQL_STATEMENT_COUNT_HEADER=true, contra la base del .env (sembrada con poe db-generate-data).
+Descubre ids y fechas reales por la API y lanza --concurrency clientes en lazo cerrado
+durante --duration segundos con la mezcla elegida (ver scenarios.MIXES); lo que ocurre
+durante --warmup no se mide. Guarda por escenario y en total: peticiones, errores, 503
+(carga rechazada), throughput, p50/p95/p99 y sentencias SQL por petición, en JSON bajo
+data/loadtest/. Con --target mide una API ya levantada, que debe aceptar --token.
+
+compare: compara dos resultados y termina con código 1 si el candidato empeora más de
+--threshold en latencia o throughput, sube la tasa de errores o hace al menos una
+sentencia SQL más por petición en algún escenario.
+
+Uso:
+  PYTHONPATH=src python benchmarks/loadtest/run.py run [--mix default] [--concurrency 32]
+      [--duration 60] [--warmup 10] [--workers 1] [--seed 1] [--output archivo.json]
+  PYTHONPATH=src python benchmarks/loadtest/run.py compare base.json candidato.json [--threshold 0.10]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from scenarios import MIXES, SCENARIOS, discover
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+OUTPUT_DIR = ROOT / "data" / "loadtest"
+
+# Escenarios con menos muestras no se comparan: sus percentiles son ruido
+MIN_SAMPLES = 30
+
+
+def child_env(extra: dict) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT / "src"), env.get("PYTHONPATH")]))
+    env.update(extra)
+    return env
+
+
+def start_process(args: list[str], env: dict, log_path: Path) -> subprocess.Popen:
+    # El hijo hereda el descriptor; el padre puede cerrarlo
+    with open(log_path, "wb") as log:
+        return subprocess.Popen(args, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_ready(url: str, process: Optional[subprocess.Popen], timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"Process serving {url} exited with code {process.returncode}; see its log in {OUTPUT_DIR}.")
+        try:
+            if httpx.get(url, timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise SystemExit(f"{url} not ready after {timeout:.0f}s.")
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=35)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: list[tuple[float, int, Optional[int]]], seconds: float) -> dict:
+    latencies = sorted(elapsed for elapsed, _, _ in samples)
+    statements = sorted(count for _, _, count in samples if count is not None)
+    count = len(samples)
+    errors = sum(1 for _, status, _ in samples if status == 0 or status >= 400)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rejected_503": sum(1 for _, status, _ in samples if status == 503),
+        "error_rate": errors / count if count else 0.0,
+        "throughput_rps": count / seconds if seconds else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1e3,
+        "p95_ms": percentile(latencies, 0.95) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1e3,
+        "sql_mean": sum(statements) / len(statements) if statements else None,
+        "sql_p95": percentile(statements, 0.95) if statements else None,
+    }
+
+
+async def client_loop(client, fixtures, mix, rng, measure_from, stop_at, samples) -> None:
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < stop_at:
+        name = rng.choices(names, weights)[0]
+        method, path, body = SCENARIOS[name](rng, fixtures)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            status = response.status_code
+            header = response.headers.get("x-sql-statement-count")
+            statements = int(header) if header is not None else None
+        except httpx.HTTPError:
+            status, statements = 0, None
+        if started >= measure_from:
+            samples[name].append((time.perf_counter() - started, status, statements))
+
+
+async def load(base_url: str, token: str, mix: dict, concurrency: int, duration: float, warmup: float, seed: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30.0) as client:
+        fixtures = await discover(client)
+        samples: dict[str, list] = defaultdict(list)
+        started = time.perf_counter()
+        measure_from, stop_at = started + warmup, started + warmup + duration
+        await asyncio.gather(*(
+            client_loop(client, fixtures, mix, random.Random(f"{seed}-{worker}"), measure_from, stop_at, samples)
+            for worker in range(concurrency)
+        ))
+        # Las últimas peticiones pueden terminar después de stop_at
+        seconds = time.perf_counter() - measure_from
+
+    every = [sample for scenario in samples.values() for sample in scenario]
+    return {
+        "fixtures": {"employees": len(fixtures.employee_ids), "availabilities": len(fixtures.availability_ids),
+                     "first_date": fixtures.first_date.isoformat(), "last_date": fixtures.last_date.isoformat()},
+        "scenarios": {name: summarize(samples[name], seconds) for name in sorted(samples)},
+        "total": summarize(every, seconds),
+    }
+
+
+def git_revision() -> dict:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True).stdout.strip())
+        return {"git_sha": sha, "git_dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"git_sha": None, "git_dirty": None}
+
+
+def run(args) -> None:
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    mix = MIXES[args.mix]
+    processes = []
+    try:
+        if args.target:
+            base_url = args.target.rstrip("/")
+        else:
+            auth = start_process(
+                [sys.executable, "-m", "uvicorn", "auth_stub:app", "--app-dir", str(HERE),
+                 "--host", "127.0.0.1", "--port", str(args.auth_port), "--log-level", "warning"],
+                child_env({}), OUTPUT_DIR / "auth_stub.log",
+            )
+            processes.append(auth)
+            wait_ready(f"http://127.0.0.1:{args.auth_port}/", auth)
+
+            api = start_process(
+                [sys.executable, "-m", "server", "--workers", str(args.workers), "--max-requests", "0"],
+                child_env({
+                    "SERVER_HOST": "127.0.0.1",
+                    "SERVER_PORT": str(args.port),
+                    "NUTRIPAE_AUTH_HOST": "127.0.0.1",
+                    "NUTRIPAE_AUTH_PORT": str(args.auth_port),
+                    "NUTRIPAE_AUTH_URL": f"http://127.0.0.1:{args.auth_port}/api/v1",
+                    "SQL_STATEMENT_COUNT_HEADER": "true",
+                    "LOG_LEVEL": "WARNING",
+                }),
+                OUTPUT_DIR / "api.log",
+            )
+            processes.append(api)
+            wait_ready(f"http://127.0.0.1:{args.port}/", api)
+            base_url = f"http://127.0.0.1:{args.port}"
+
+        result = asyncio.run(load(
+            f"{base_url}{args.prefix}", args.token, mix, args.concurrency, args.duration, args.warmup, args.seed,
+        ))
+    finally:
+        for process in reversed(processes):
+            stop_process(process)
+
+    result["meta"] = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mix": args.mix,
+        "weights": mix,
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "warmup_seconds": args.warmup,
+        "seed": args.seed,
+        "workers": None if args.target else args.workers,
+        "target": args.target,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        **git_revision(),
+    }
+    output = Path(args.output) if args.output else OUTPUT_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{args.mix}.json"
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False))
+
+    print(f"mix={args.mix} concurrency={args.concurrency} duration={args.duration:.0f}s -> {output}")
+    print_table(result)
+    if result["total"]["sql_mean"] is None:
+        print("note: no X-SQL-Statement-Count header; set SQL_STATEMENT_COUNT_HEADER=true on the target.")
+
+
+def print_table(result: dict) -> None:
+    print(f"  {'scenario':<24}{'reqs':>8}{'err':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'sql':>7}")
+    rows = list(result["scenarios"].items()) + [("TOTAL", result["total"])]
+    for name, row in rows:
+        sql = "-" if row["sql_mean"] is None else f"{row['sql_mean']:.1f}"
+        print(f"  {name:<24}{row['requests']:>8}{row['errors']:>6}{row['throughput_rps']:>9.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{sql:>7}")
+
+
+def regressions(base: dict, candidate: dict, threshold: float) -> list[str]:
+    """Motivos por los que `candidate` es peor que `base` (vacío si no hay regresión)."""
+    found = []
+    for metric in ("p50_ms", "p95_ms", "p99_ms"):
+        if base[metric] and candidate[metric] > base[metric] * (1 + threshold):
+            found.append(f"{metric} {base[metric]:.1f} -> {candidate[metric]:.1f}")
+    if base["throughput_rps"] and candidate["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+        found.append(f"throughput {base['throughput_rps']:.1f} -> {candidate['throughput_rps']:.1f} rps")
+    if candidate["error_rate"] > base["error_rate"] + 0.01:
+        found.append(f"error rate {base['error_rate']:.1%} -> {candidate['error_rate']:.1%}")
+    if base["sql_mean"] is not None and candidate["sql_mean"] is not None and candidate["sql_mean"] - base["sql_mean"] >= 1:
+        found.append(f"sql/request {base['sql_mean']:.1f} -> {candidate['sql_mean']:.1f}")
+    return found
+
+
+def compare(args) -> None:
+    base = json.loads(Path(args.base).read_text())
+    candidate = json.loads(Path(args.candidate).read_text())
+    for key in ("mix", "concurrency"):
+        if base["meta"].get(key) != candidate["meta"].get(key):
+            print(f"warning: runs differ in {key}: {base['meta'].get(key)} vs {candidate['meta'].get(key)}")
+
+    rows = [(name, base["scenarios"][name], candidate["scenarios"][name])
+            for name in sorted(base["scenarios"]) if name in candidate["scenarios"]]
+    rows.append(("TOTAL", base["total"], candidate["total"]))
+
+    failed = False
+    print(f"  {'scenario':<24}{'p95 ms':>18}{'rps':>18}{'sql':>12}  verdict")
+    for name, old, new in rows:
+        sql = "-" if old["sql_mean"] is None or new["sql_mean"] is None else f"{old['sql_mean']:.1f}->{new['sql_mean']:.1f}"
+        if min(old["requests"], new["requests"]) < MIN_SAMPLES:
+            verdict = "skipped (few samples)"
+        else:
+            found = regressions(old, new, args.threshold)
+            failed = failed or bool(found)
+            verdict = "REGRESSION: " + "; ".join(found) if found else "ok"
+        print(f"  {name:<24}{old['p95_ms']:>8.1f} ->{new['p95_ms']:>7.1f}"
+              f"{old['throughput_rps']:>8.1f} ->{new['throughput_rps']:>7.1f}{sql:>12}  {verdict}")
+    sys.exit(1 if failed else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Corre la prueba de carga y guarda el resultado.")
+    run_parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    run_parser.add_argument("--concurrency", type=int, default=32, help="Clientes simultáneos en lazo cerrado.")
+    run_parser.add_argument("--duration", type=float, default=60.0, help="Segundos medidos.")
+    run_parser.add_argument("--warmup", type=float, default=10.0, help="Segundos previos que no se miden.")
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn de la API levantada.")
+    run_parser.add_argument("--port", type=int, default=8800)
+    run_parser.add_argument("--auth-port", type=int, default=8801)
+    run_parser.add_argument("--target", help="URL de una API ya levantada (no arranca procesos).")
+    run_parser.add_argument("--prefix", default="/api/v1")
+    run_parser.add_argument("--token", default="loadtest", help="Bearer enviado a la API.")
+    run_parser.add_argument("--output", help="Archivo JSON de salida (por defecto en data/loadtest/).")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compara dos resultados y marca regresiones.")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Empeoramiento relativo tolerado.")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Escenarios y mezclas de la prueba de carga.
+
+Cada escenario arma una petición (método, ruta, cuerpo JSON) a partir de los datos
+descubiertos en la base sembrada (`Fixtures`) y de un generador aleatorio con semilla,
+así dos corridas con la misma semilla piden lo mismo en el mismo orden por worker.
+"""
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+import httpx
+
+SURNAMES = [
+    "García", "Rodríguez", "Martínez", "López", "González", "Hernández",
+    "Pérez", "Sánchez", "Ramírez", "Torres", "Gómez", "Díaz",
+]
+
+
+@dataclass
+class Fixtures:
+    """Ids y fechas reales de la base, para que las peticiones encuentren datos."""
+    employee_ids: list[int]
+    availability_ids: list[int]
+    status_ids: list[int]
+    first_date: date
+    last_date: date
+
+
+Request = tuple[str, str, Optional[dict]]
+
+
+def employee_search(rng: random.Random, fx: Fixtures) -> Request:
+    return "GET", f"/employees/?search={rng.choice(SURNAMES)}&limit=50", None
+
+
+def employee_list(rng: random.Random, fx: Fixtures) -> Request:
+    skip = rng.randrange(0, max(1, len(fx.employee_ids)))
+    return "GET", f"/employees/?is_active=true&skip={skip}&limit=100&fields=full_name,document_number,operational_role_name", None
+
+
+def employee_detail(rng: random.Random, fx: Fixtures) -> Request:
+    return "GET", f"/employees/{rng.choice(fx.employee_ids)}", None
+
+
+def employee_lookup(rng: random.Random, fx: Fixtures) -> Request:
+    ids = rng.sample(fx.employee_ids, min(100, len(fx.employee_ids)))
+    return "POST", "/employees/lookup", {"ids": ids}
+
+
+def employee_availabilities(rng: random.Random, fx: Fixtures) -> Request:
+    return "GET", f"/availabilities/employee/{rng.choice(fx.employee_ids)}?limit=100", None
+
+
+def availability_report(rng: random.Random, fx: Fixtures) -> Request:
+    span = max(0, (fx.last_date - fx.first_date).days - 6)
+    start = fx.first_date + timedelta(days=rng.randint(0, span))
+    return "GET", f"/availabilities/?start_date={start}&end_date={start + timedelta(days=6)}", None
+
+
+def options(rng: random.Random, fx: Fixtures) -> Request:
+    return "GET", "/options", None
+
+
+def availability_update(rng: random.Random, fx: Fixtures) -> Request:
+    return "PUT", f"/availabilities/{rng.choice(fx.availability_ids)}", {"notes": f"loadtest {rng.randrange(10**6)}"}
+
+
+def bulk_schedule(rng: random.Random, fx: Fixtures) -> Request:
+    # Fechas futuras, fuera de la ventana sembrada; la API solo encola el trabajo
+    start = fx.last_date + timedelta(days=rng.randint(30, 300))
+    return "POST", "/jobs/availability-schedules", {
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=6)).isoformat(),
+        "status_id": rng.choice(fx.status_ids),
+        "employee_ids": rng.sample(fx.employee_ids, min(200, len(fx.employee_ids))),
+    }
+
+
+SCENARIOS: dict[str, Callable[[random.Random, Fixtures], Request]] = {
+    fn.__name__: fn for fn in (
+        employee_search, employee_list, employee_detail, employee_lookup, employee_availabilities,
+        availability_report, options, availability_update, bulk_schedule,
+    )
+}
+
+# Mezclas: escenario -> peso relativo
+MIXES: dict[str, dict[str, int]] = {
+    "default": {
+        "employee_detail": 30, "employee_search": 20, "employee_list": 10, "employee_availabilities": 10,
+        "availability_report": 10, "employee_lookup": 5, "options": 5, "availability_update": 7, "bulk_schedule": 3,
+    },
+    "reads": {
+        "employee_detail": 40, "employee_search": 25, "employee_list": 10, "employee_availabilities": 10,
+        "employee_lookup": 10, "options": 5,
+    },
+    "writes": {"availability_update": 70, "bulk_schedule": 20, "employee_detail": 10},
+    "reports": {"availability_report": 60, "employee_availabilities": 20, "employee_list": 20},
+}
+
+
+async def discover(client: httpx.AsyncClient, pages: int = 5) -> Fixtures:
+    """Lee por la API empleados activos, algunas de sus disponibilidades y los estados."""
+    employee_ids: list[int] = []
+    for page in range(pages):
+        response = await client.get("/employees/", params={"is_active": "true", "skip": page * 1000, "limit": 200})
+        response.raise_for_status()
+        employee_ids += [employee["id"] for employee in response.json()]
+    if not employee_ids:
+        raise SystemExit("No active employees found: seed the database first (poe db-generate-data).")
+
+    availability_ids, dates = [], []
+    for employee_id in employee_ids[:20]:
+        response = await client.get(f"/availabilities/employee/{employee_id}", params={"limit": 100})
+        response.raise_for_status()
+        for availability in response.json():
+            availability_ids.append(availability["id"])
+            dates.append(date.fromisoformat(availability["date"]))
+    if not availability_ids:
+        raise SystemExit("No availabilities found: seed the database first (poe db-generate-data).")
+
+    response = await client.get("/options/availability-statuses")
+    response.raise_for_status()
+    return Fixtures(
+        employee_ids=sorted(set(employee_ids)),
+        availability_ids=availability_ids,
+        status_ids=[status["id"] for status in response.json()],
+        first_date=min(dates),
+        last_date=max(dates),
+    )
@@ -25,6 +25,28 @@ class Settings(BaseSettings):
         data = values.data
         return f"postgresql+psycopg2://{data.get('POSTGRES_USER')}:{data.get('POSTGRES_PASSWORD')}@{data.get('DB_HOST')}:{data.get('DB_HOST_PORT')}/{data.get('POSTGRES_DB')}"
 
+    # Pool de conexiones de SQLAlchemy y los hilos para los handlers síncronos.
+    # Por defecto hay un hilo por conexión posible (DB_POOL_SIZE + DB_MAX_OVERFLOW):
+    # más hilos solo esperarían el checkout ocupando un hilo
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    THREADPOOL_CAPACITY: int | None = None
+    # Conexiones que se abren al arrancar, antes de recibir tráfico (None = DB_POOL_SIZE)
+    DB_WARMUP_CONNECTIONS: int | None = None
+
+    # Arranque de producción (python -m server): procesos, reciclaje y apagado ordenado.
+    # SERVER_WORKERS None = núcleos disponibles; SERVER_MAX_REQUESTS 0 = no reciclar
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int | None = None
+    SERVER_MAX_REQUESTS: int = 10000
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    SERVER_KEEP_ALIVE_SECONDS: int = 5
+    # IPs o CIDR (separados por coma) de los proxies cuyo X-Forwarded-For se acepta;
+    # el valor por defecto es el de uvicorn. Poner aquí la red del balanceador.
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
     API_PREFIX_STR: str = "/api/v1"
     MODULE_IDENTIFIER: str = "nutripae-rh"
 
@@ -43,8 +65,97 @@ class Settings(BaseSettings):
         data = values.data
         return f"http://{data.get('NUTRIPAE_AUTH_HOST')}:{data.get('NUTRIPAE_AUTH_PORT')}{data.get('NUTRIPAE_AUTH_PREFIX_STR')}"
     
+    # Cliente HTTP compartido (lo crea el lifespan) hacia check-authorization
+    AUTH_TIMEOUT_SECONDS: float = 10.0
+    AUTH_MAX_CONNECTIONS: int = 20
+
     OTLP_GRPC_ENDPOINT: str
 
+    # Trazas: proporción de peticiones muestreadas (respetando al padre). Las demás se
+    # exportan igual si terminan en error o tardan más de OTEL_SLOW_REQUEST_SECONDS.
+    OTEL_TRACES_SAMPLE_RATIO: float = 0.1
+    OTEL_SLOW_REQUEST_SECONDS: float = 1.0
+    OTEL_TAIL_BUFFER_MAX_TRACES: int = 1000
+    # Cola y lotes del BatchSpanProcessor (si se llena se descartan spans, no se bloquea)
+    OTEL_BSP_MAX_QUEUE_SIZE: int = 2048
+    OTEL_BSP_MAX_EXPORT_BATCH_SIZE: int = 512
+    OTEL_BSP_SCHEDULE_DELAY_MILLIS: int = 5000
+    OTEL_BSP_EXPORT_TIMEOUT_MILLIS: int = 30000
+
+    # Logging: JSON por stdout escrito en segundo plano (cola acotada, descarta si se llena).
+    # LOG_LEVELS fija el nivel por logger; el INFO de LOG_SAMPLED_LOGGERS se muestrea por traza
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: dict[str, str] = {"sqlalchemy.engine": "WARNING", "httpx": "WARNING"}
+    LOG_FORMAT: str = "json"  # "json" o "text"
+    LOG_INFO_SAMPLE_RATE: float = 1.0
+    LOG_SAMPLED_LOGGERS: list[str] = ["uvicorn.access", "routes", "services"]
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Encabezado X-SQL-Statement-Count en cada respuesta; solo para pruebas de carga
+    SQL_STATEMENT_COUNT_HEADER: bool = False
+
+    # Archivo histórico de disponibilidades (almacenamiento frío en Parquet)
+    AVAILABILITY_ARCHIVE_DIR: str = "data/archive/daily_availabilities"
+    AVAILABILITY_HOT_RETENTION_DAYS: int = 180
+
+    # X-Total-Count de GET /employees con búsqueda: exacto (count(*) OVER () en la misma
+    # consulta) si el planificador estima hasta este número de filas; si no, la estimación
+    # con X-Total-Count-Estimated: true
+    EMPLOYEE_EXACT_COUNT_LIMIT: int = 10000
+
+    # Caché en proceso de las tablas paramétricas (red de seguridad entre procesos)
+    PARAMETRIC_CACHE_TTL_SECONDS: int = 300
+
+    # Registro de cambios de GET /changes: el worker (python -m worker) borra los de más
+    # de estos días; un cursor anterior a lo que queda recibe 410 y el cliente se resincroniza
+    CHANGE_LOG_RETENTION_DAYS: int = 30
+
+    # Stream SSE de cambios de disponibilidades
+    # "memory": un solo proceso; "postgres": LISTEN/NOTIFY para varios workers y para
+    # los eventos que publica el worker de trabajos (python -m worker)
+    AVAILABILITY_EVENTS_BACKEND: str = "memory"
+    AVAILABILITY_EVENTS_BUFFER_SIZE: int = 1000
+    SSE_HEARTBEAT_SECONDS: int = 15
+
+    # Outbox de eventos de dominio y su despachador (python -m dispatcher)
+    OUTBOX_SINK: str = "file"  # "webhook", "file" o "memory"
+    OUTBOX_WEBHOOK_URL: str | None = None
+    OUTBOX_WEBHOOK_TIMEOUT_SECONDS: float = 5.0
+    OUTBOX_FILE_PATH: str = "data/outbox/events.jsonl"
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_RETRY_BASE_SECONDS: float = 1.0
+    OUTBOX_RETRY_MAX_SECONDS: float = 300.0
+    # Los eventos ya entregados se borran pasado este tiempo (los fallidos se conservan)
+    OUTBOX_DISPATCHED_RETENTION_HOURS: int = 72
+    OUTBOX_METRICS_PORT: int = 9101
+
+    # Límite adaptativo (AIMD) de peticiones en curso por clase de ruta; lo que no
+    # consigue cupo tras una cola corta recibe 503 con Retry-After
+    CONCURRENCY_LIMITER_ENABLED: bool = True
+    CONCURRENCY_MAX_LIMITS: dict[str, int] = {"reads": 24, "writes": 8, "reports": 4}
+    CONCURRENCY_TARGET_LATENCY_SECONDS: dict[str, float] = {"reads": 0.3, "writes": 0.5, "reports": 3.0}
+    CONCURRENCY_MIN_LIMIT: int = 2
+    CONCURRENCY_QUEUE_SIZE: int = 32
+    CONCURRENCY_QUEUE_TIMEOUT_SECONDS: float = 1.0
+    CONCURRENCY_RETRY_AFTER_SECONDS: int = 1
+
+    # Encabezado Idempotency-Key en los POST: vigencia de las respuestas guardadas,
+    # espera máxima por una petición en curso con la misma llave y conexiones (aparte
+    # del pool de la API) que sostienen esos locks; al agotarse se responde 503
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: float = 30.0
+    IDEMPOTENCY_LOCK_POOL_SIZE: int = 5
+
+    # Trabajos en segundo plano y su worker (python -m worker)
+    JOB_RESULTS_DIR: str = "data/jobs"
+    JOB_MAX_CONCURRENCY: dict[str, int] = {}  # límite por tipo, p. ej. {"availability_export": 2}
+    JOB_STALE_SECONDS: int = 600
+    WORKER_CONCURRENCY: int = 2
+    WORKER_POLL_INTERVAL_SECONDS: float = 2.0
+    WORKER_METRICS_PORT: int = 9102
+
     model_config = SettingsConfigDict(
         env_file=f".env",
         extra="ignore"
@@ -11,6 +11,30 @@ logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
+async def _post_check_authorization(request: Request, token: str, auth_payload: dict) -> httpx.Response:
+    """
+    Llama a check-authorization con el cliente compartido que crea el lifespan de la app
+    (conexiones keep-alive reutilizadas entre peticiones). Si la app no pasó por el
+    lifespan (p. ej. TestClient sin `with`) usa un cliente de una sola petición.
+    """
+    url = f"{settings.NUTRIPAE_AUTH_URL}/authorization/check-authorization"
+    headers = {"Authorization": f"Bearer {token}"}
+    client = getattr(request.app.state, "auth_client", None)
+    if client is not None:
+        return await client.post(url, headers=headers, json=auth_payload)
+    async with httpx.AsyncClient(timeout=settings.AUTH_TIMEOUT_SECONDS) as client:
+        return await client.post(url, headers=headers, json=auth_payload)
+
+def build_auth_client() -> httpx.AsyncClient:
+    """Cliente compartido para el servicio de auth; lo abre y lo cierra el lifespan de la app."""
+    return httpx.AsyncClient(
+        timeout=settings.AUTH_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.AUTH_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AUTH_MAX_CONNECTIONS,
+        ),
+    )
+
 def require_permission(permission: str):
     """
     Crea una dependencia que verifica si el usuario tiene un permiso específico.
@@ -46,75 +70,73 @@ def require_permission(permission: str):
                 "required_permissions": [permission]
             }
             
-            logger.info(f"Checking authorization for user with permission '{permission}' on endpoint '{endpoint}'")
-            logger.info(f"NUTRIPAE_AUTH_URL: {settings.NUTRIPAE_AUTH_URL}")
+            # Una línea por petición: queda en DEBUG para no saturar el log en las rutas calientes
+            logger.debug("Checking permission '%s' on %s %s", permission, method, endpoint)
             
             # Hacer request al servicio de auth
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{settings.NUTRIPAE_AUTH_URL}/authorization/check-authorization",
-                    headers={"Authorization": f"Bearer {token}"},
-                    json=auth_payload
-                )
-                
-                # Manejar diferentes códigos de respuesta del servicio auth
-                if response.status_code == 401:
-                    # Token inválido, expirado, o usuario no encontrado
-                    error_detail = "Invalid or expired token"
-                    try:
-                        error_info = response.json()
-                        error_detail = error_info.get("detail", error_detail)
-                    except:
-                        pass
-                    
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail=error_detail,
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-                
-                elif response.status_code == 403:
-                    # Usuario válido pero sin permisos suficientes
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail="Access forbidden - insufficient permissions",
-                    )
-                
-                elif response.status_code == 500:
-                    # Error interno del servicio auth
-                    logger.error(f"Auth service internal error: {response.text}")
-                    raise HTTPException(
-                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                        detail="Authentication service error",
-                    )
-                
-                elif response.status_code != 200:
-                    # Cualquier otro error
-                    logger.error(f"Unexpected auth service response: {response.status_code} - {response.text}")
-                    raise HTTPException(
-                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                        detail="Authentication service unavailable",
-                    )
-                
-                # Procesar respuesta exitosa
-                auth_result = response.json()
-                
-                if not auth_result.get("authorized", False):
-                    missing_perms = auth_result.get("missing_permissions", [])
-                    logger.warning(f"User lacks permissions. Missing: {missing_perms}")
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail=f"You do not have enough permissions. Missing: {', '.join(missing_perms)}",
-                    )
-                
-                logger.info(f"Authorization successful for user {auth_result.get('user_email')}")
-                
-                # Retornamos solo la información mínima necesaria
-                return {
-                    "user_id": auth_result.get("user_id"),
-                    "user_email": auth_result.get("user_email")
-                }
+            response = await _post_check_authorization(request, token, auth_payload)
+
+            # Manejar diferentes códigos de respuesta del servicio auth
+            if response.status_code == 401:
+                # Token inválido, expirado, o usuario no encontrado
+                error_detail = "Invalid or expired token"
+                try:
+                    error_info = response.json()
+                    error_detail = error_info.get("detail", error_detail)
+                except:
+                    pass
                 
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail=error_detail,
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            
+            elif response.status_code == 403:
+                # Usuario válido pero sin permisos suficientes
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Access forbidden - insufficient permissions",
+                )
+            
+            elif response.status_code == 500:
+                # Error interno del servicio auth
+                logger.error("Auth service internal error: %s", response.text)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service error",
+                )
+            
+            elif response.status_code != 200:
+                # Cualquier otro error
+                logger.error("Unexpected auth service response: %s - %s", response.status_code, response.text)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service unavailable",
+                )
+            
+            # Procesar respuesta exitosa
+            auth_result = response.json()
+            
+            if not auth_result.get("authorized", False):
+                missing_perms = auth_result.get("missing_permissions", [])
+                logger.warning("User %s lacks permissions. Missing: %s", auth_result.get("user_id"), missing_perms)
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"You do not have enough permissions. Missing: {', '.join(missing_perms)}",
+                )
+            
+            logger.debug("Authorization successful for user %s", auth_result.get("user_id"))
+            
+            # Retornamos solo la información mínima necesaria
+            current_user = {
+                "user_id": auth_result.get("user_id"),
+                "user_email": auth_result.get("user_email")
+            }
+            # Otras dependencias (p. ej. idempotency_key) lo leen de request.state
+            request.state.current_user = current_user
+            return current_user
+            
         except httpx.TimeoutException:
             logger.error("Timeout connecting to authentication service")
             raise HTTPException(
@@ -122,7 +144,7 @@ def require_permission(permission: str):
                 detail="Authentication service timeout",
             )
         except httpx.RequestError as e:
-            logger.error(f"Request error to authentication service: {str(e)}")
+            logger.error("Request error to authentication service: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Authentication service unavailable",
@@ -131,7 +153,7 @@ def require_permission(permission: str):
             # Re-lanzar HTTPExceptions sin modificar
             raise
         except Exception as e:
-            logger.error(f"Unexpected error in authorization: {str(e)}")
+            logger.exception("Unexpected error in authorization")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal authorization error",
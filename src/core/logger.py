@@ -0,0 +1,173 @@
+import atexit
+import copy
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterable, Optional
+
+import orjson
+from opentelemetry.trace import get_current_span
+from prometheus_client import Counter
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total", "Log records discarded because the logging queue was full."
+)
+
+# Atributos propios de LogRecord: el resto (lo que llega por `extra=`) se incluye en el JSON
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "trace_id", "span_id"}
+# Loggers de uvicorn que traen su propio handler: se redirigen a la cola
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[QueueListener] = None
+
+
+class TraceContextFilter(logging.Filter):
+    """Agrega trace_id y span_id del span activo; se evalúa en el hilo que emite el registro."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = get_current_span().get_span_context()
+        if context.is_valid:
+            record.trace_id = format(context.trace_id, "032x")
+            record.span_id = format(context.span_id, "016x")
+        else:
+            record.trace_id = record.span_id = None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate: float, loggers: Iterable[str]):
+        """
+        Deja pasar solo una proporción `rate` de los registros INFO o menores de los
+        loggers dados (y sus hijos). WARNING y superiores pasan siempre.
+        La decisión se toma por trace_id, así que una petición conserva todas sus
+        líneas o ninguna; sin traza activa se decide al azar.
+        Debe ir después de TraceContextFilter.
+        """
+        super().__init__()
+        self.threshold = int(rate * 10_000)
+        self.prefixes = tuple(loggers)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.threshold >= 10_000 or record.levelno > logging.INFO:
+            return True
+        name = record.name
+        if not any(name == prefix or name.startswith(prefix + ".") for prefix in self.prefixes):
+            return True
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id is not None:
+            return int(trace_id[-8:], 16) % 10_000 < self.threshold
+        return random.random() * 10_000 < self.threshold
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler que nunca bloquea al hilo de la petición: si la cola está llena
+    descarta el registro. Solo resuelve el mensaje (%-format) antes de encolar;
+    el JSON y la escritura quedan para el hilo del QueueListener.
+    """
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            # El traceback no se puede pasar entre hilos con seguridad: se convierte a texto aquí
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def __init__(self, service: str):
+        """Una línea JSON por registro con la traza, el servicio y los campos de `extra=`."""
+        super().__init__()
+        self.service = service
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "service": self.service,
+            "trace_id": getattr(record, "trace_id", None),
+            "span_id": getattr(record, "span_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("otel"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+def setup_logging(
+    service: str,
+    *,
+    level: str = "INFO",
+    levels: Optional[dict[str, str]] = None,
+    fmt: str = "json",
+    info_sample_rate: float = 1.0,
+    sampled_loggers: Iterable[str] = (),
+    queue_size: int = 10_000,
+) -> None:
+    """
+    Configura el logging del proceso (API, worker o despachador):
+    - El root logger solo encola (NonBlockingQueueHandler); un QueueListener en
+      segundo plano formatea y escribe en stdout, así las peticiones no esperan E/S.
+    - `fmt`: "json" (una línea JSON por registro) o "text" para desarrollo local.
+    - `levels`: nivel por logger, p. ej. {"sqlalchemy.engine": "WARNING"}.
+    - `info_sample_rate` y `sampled_loggers`: muestreo de INFO en los loggers de mucho volumen.
+    Se puede llamar de nuevo: reemplaza la configuración anterior.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter(service))
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(name)s] [trace_id=%(trace_id)s span_id=%(span_id)s] - %(message)s"
+        ))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(TraceContextFilter())
+    queue_handler.addFilter(SamplingFilter(info_sample_rate, sampled_loggers))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    for name in _UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    for name, logger_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(logger_level.upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+@atexit.register
+def _stop_listener() -> None:
+    """Vacía la cola antes de salir para no perder los últimos registros."""
+    if _listener is not None:
+        _listener.stop()
@@ -0,0 +1,32 @@
+import argparse
+from datetime import date
+from db.session import SessionLocal
+from services.availabilityArchive import availability_archive_service
+
+def run_archiver(cutoff: date | None = None):
+    db_session = SessionLocal()
+
+    try:
+        print("Starting to archive daily availabilities...")
+        archived = availability_archive_service.archive_older_than(db_session, cutoff=cutoff)
+        for month, count in archived.items():
+            print(f"  {month}: {count} rows archived")
+        print("Archive completed successfully!")
+    except Exception as e:
+        print(f"An error occurred during archiving: {e}")
+        db_session.rollback()
+        raise
+    finally:
+        db_session.close()
+
+# Punto de entrada: python -m db.archiver [--cutoff YYYY-MM-DD]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archiva en Parquet las disponibilidades antiguas.")
+    parser.add_argument(
+        "--cutoff",
+        type=date.fromisoformat,
+        default=None,
+        help="Archiva los registros anteriores a esta fecha (por defecto se calcula con AVAILABILITY_HOT_RETENTION_DAYS).",
+    )
+    args = parser.parse_args()
+    run_archiver(args.cutoff)
@@ -0,0 +1,380 @@
+"""
+Generador de datos sintéticos para pruebas de carga y planeación de capacidad.
+
+    python -m db.generator --employees 200000 --days 730 [--seed 42] [--workers 8]
+
+- Determinista: cada bloque usa su propio generador aleatorio derivado de (semilla,
+  tipo de bloque, número de bloque), así que el mismo comando produce los mismos datos
+  sin importar el orden ni el número de procesos.
+- Los catálogos son los de db.seeder; roles, estados y demás se reparten con pesos
+  parecidos a la operación real.
+- Escribe con COPY en bloques de --chunk-size empleados, en paralelo (un proceso por
+  worker). Cada bloque se confirma junto con su marca en synthetic_data_chunks, por lo
+  que volver a correr el comando retoma donde quedó y nunca duplica filas.
+- Los documentos sintéticos empiezan por "SYN" y no se mezclan con datos reales.
+- Los cambios no pasan al feed de /changes (nutripae.skip_change_log) ni por el trigger
+  de contadores por rol (nutripae.skip_role_counts), que serializaría los bloques en los
+  locks de esos pocos contadores; se reconstruyen una vez al terminar los empleados.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from faker import Faker
+from sqlalchemy import text
+
+from db.seeder import AVAILABILITY_STATUSES, DOCUMENT_TYPES, GENDERS, OPERATIONAL_ROLES, seed_parametric
+from db.session import SessionLocal, get_engine
+from models import AvailabilityStatus, DocumentType, Gender, OperationalRole
+from repositories import operational_role_repo
+
+DOCUMENT_PREFIX = "SYN"
+
+# Pesos por nombre de los catálogos de db.seeder
+DOCUMENT_TYPE_WEIGHTS = {
+    "Cédula de Ciudadanía (CC)": 92,
+    "Cédula de Extranjería (CE)": 5,
+    "Permiso por Protección Temporal (PPT)": 3,
+}
+GENDER_WEIGHTS = {"Masculino": 34, "Femenino": 65, "Otro": 1}
+ROLE_WEIGHTS = {
+    "Manipulador de Alimentos": 72,
+    "Conductor": 9,
+    "Auxiliar Logístico": 13,
+    "Supervisor de Ruta": 6,
+}
+# "Inactivo" no se registra por día: los retirados simplemente dejan de tener registros
+STATUS_WEIGHTS = {
+    "Disponible": 86,
+    "Ausente por Enfermedad": 3,
+    "Vacaciones": 6,
+    "Permiso": 2,
+    "Capacitación": 3,
+}
+STATUS_NOTES = {
+    "Ausente por Enfermedad": ["Incapacidad médica", "Cita médica", "Incapacidad por EPS"],
+    "Vacaciones": ["Vacaciones programadas", "Vacaciones colectivas"],
+    "Permiso": ["Calamidad doméstica", "Permiso personal", "Diligencia familiar"],
+    "Capacitación": ["Curso de manipulación de alimentos", "Capacitación en BPM", "Inducción"],
+}
+ACTIVE_RATIO = 0.9
+TERMINATION_REASONS = ["Terminación de Contrato", "Renuncia voluntaria", "Finalización de obra o labor"]
+
+CHUNKS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS synthetic_data_chunks (
+    kind varchar(32) NOT NULL,
+    chunk integer NOT NULL,
+    rows integer NOT NULL,
+    params jsonb NOT NULL,
+    loaded_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (kind, chunk)
+)
+"""
+
+
+@dataclass(frozen=True)
+class GeneratorParams:
+    """Lo que define los datos generados; se guarda con cada bloque para detectar mezclas."""
+    seed: int
+    employees: int
+    days: int
+    start_date: str
+    chunk_size: int
+
+    @property
+    def chunks(self) -> int:
+        return -(-self.employees // self.chunk_size)
+
+    def employee_range(self, chunk: int) -> range:
+        return range(chunk * self.chunk_size, min((chunk + 1) * self.chunk_size, self.employees))
+
+
+def _document_number(n: int) -> str:
+    return f"{DOCUMENT_PREFIX}{n:09d}"
+
+
+def _weighted(ids_by_name: dict[str, int], weights: dict[str, int]) -> tuple[list[int], list[int]]:
+    names = [name for name in weights if name in ids_by_name]
+    return [ids_by_name[name] for name in names], [weights[name] for name in names]
+
+
+def _copy_value(value) -> str:
+    """Valor en el formato de texto de COPY (NULL = \\N; se escapan separadores)."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def _copy_row(*values) -> str:
+    return "\t".join(_copy_value(value) for value in values) + "\n"
+
+
+def _load_chunk(kind: str, chunk: int, params: GeneratorParams, catalogs: dict, copy_sql: str, build) -> int:
+    """
+    Genera y carga un bloque en una sola transacción con su marca; si ya estaba cargado
+    (otra corrida o otro proceso), no hace nada. Retorna las filas escritas.
+    """
+    connection = get_engine().raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            # Que otro proceso no cargue el mismo bloque a la vez
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s), %s)", (kind, chunk))
+            cursor.execute("SELECT 1 FROM synthetic_data_chunks WHERE kind = %s AND chunk = %s", (kind, chunk))
+            if cursor.fetchone() is not None:
+                connection.rollback()
+                return 0
+            cursor.execute("SET LOCAL nutripae.skip_change_log = 'on'")
+            cursor.execute("SET LOCAL nutripae.skip_role_counts = 'on'")
+            # Cada bloque confirmado queda con su marca en la misma transacción: no hace falta esperar el WAL
+            cursor.execute("SET LOCAL synchronous_commit = off")
+            buffer, rows = build(cursor, random.Random(f"{params.seed}:{kind}:{chunk}"), params, catalogs, chunk)
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+            cursor.execute(
+                "INSERT INTO synthetic_data_chunks (kind, chunk, rows, params) VALUES (%s, %s, %s, %s)",
+                (kind, chunk, rows, json.dumps(asdict(params))),
+            )
+        connection.commit()
+        return rows
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+_faker: Optional[Faker] = None
+
+
+def _build_employees(cursor, rng: random.Random, params: GeneratorParams, catalogs: dict, chunk: int):
+    global _faker
+    if _faker is None:
+        _faker = Faker("es_CO")
+    fake = _faker
+    fake.seed_instance(rng.getrandbits(64))
+
+    doc_types, doc_type_weights = _weighted(catalogs["document_types"], DOCUMENT_TYPE_WEIGHTS)
+    genders, gender_weights = _weighted(catalogs["genders"], GENDER_WEIGHTS)
+    roles, role_weights = _weighted(catalogs["operational_roles"], ROLE_WEIGHTS)
+    start = date.fromisoformat(params.start_date)
+    end = start + timedelta(days=params.days)
+
+    buffer = io.StringIO()
+    rows = 0
+    for n in params.employee_range(chunk):
+        # La mayoría ya trabajaba al empezar la ventana; el resto entra durante ella
+        if rng.random() < 0.7:
+            hire_date = start - timedelta(days=rng.randint(1, 8 * 365))
+        else:
+            hire_date = start + timedelta(days=rng.randrange(params.days))
+        is_active = rng.random() < ACTIVE_RATIO
+        termination_date = reason = None
+        if not is_active:
+            termination_date = hire_date + timedelta(days=rng.randint(30, max(31, (end - hire_date).days)))
+            termination_date = min(termination_date, end)
+            reason = rng.choice(TERMINATION_REASONS)
+        buffer.write(_copy_row(
+            _document_number(n),
+            fake.name(),
+            hire_date - timedelta(days=rng.randint(18 * 365, 60 * 365)),
+            rng.choices(doc_types, doc_type_weights)[0],
+            rng.choices(genders, gender_weights)[0],
+            rng.choices(roles, role_weights)[0],
+            hire_date,
+            fake.street_address(),
+            fake.phone_number(),
+            fake.email(),
+            fake.name(),
+            fake.phone_number(),
+            rng.choice(["Familiar", "Cónyuge", "Padre/Madre", "Hermano(a)"]),
+            is_active,
+            termination_date,
+            reason,
+        ))
+        rows += 1
+    return buffer, rows
+
+
+EMPLOYEES_COPY_SQL = (
+    "COPY employees (document_number, full_name, birth_date, document_type_id, gender_id, operational_role_id, "
+    "hire_date, address, phone_number, personal_email, emergency_contact_name, emergency_contact_phone, "
+    "emergency_contact_relation, is_active, termination_date, reason_for_termination) FROM STDIN"
+)
+
+
+def _build_availabilities(cursor, rng: random.Random, params: GeneratorParams, catalogs: dict, chunk: int):
+    employee_numbers = params.employee_range(chunk)
+    cursor.execute(
+        "SELECT id, hire_date, termination_date FROM employees "
+        "WHERE document_number >= %s AND document_number <= %s ORDER BY document_number",
+        (_document_number(employee_numbers[0]), _document_number(employee_numbers[-1])),
+    )
+    employees = cursor.fetchall()
+    statuses, status_weights = _weighted(catalogs["availability_statuses"], STATUS_WEIGHTS)
+    notes_by_status = {
+        catalogs["availability_statuses"][name]: notes
+        for name, notes in STATUS_NOTES.items() if name in catalogs["availability_statuses"]
+    }
+    start = date.fromisoformat(params.start_date)
+    end = start + timedelta(days=params.days)
+
+    buffer = io.StringIO()
+    rows = 0
+    for employee_id, hire_date, termination_date in employees:
+        day = max(start, hire_date)
+        last = min(end, termination_date) if termination_date else end
+        # Los estados vienen en rachas (vacaciones, incapacidades): se sortea un estado y su duración
+        status_id, streak = None, 0
+        while day < last:
+            if day.weekday() != 6:  # sin registros los domingos
+                if streak == 0:
+                    status_id = rng.choices(statuses, status_weights)[0]
+                    streak = 1 if status_id not in notes_by_status else rng.randint(1, 10)
+                notes = rng.choice(notes_by_status[status_id]) if status_id in notes_by_status else None
+                buffer.write(_copy_row(employee_id, day, status_id, notes))
+                streak -= 1
+                rows += 1
+            day += timedelta(days=1)
+    return buffer, rows
+
+
+AVAILABILITIES_COPY_SQL = "COPY daily_availabilities (employee_id, date, status_id, notes) FROM STDIN"
+
+PHASES = (
+    ("employees", EMPLOYEES_COPY_SQL, _build_employees),
+    ("availabilities", AVAILABILITIES_COPY_SQL, _build_availabilities),
+)
+BUILDERS = {kind: (copy_sql, build) for kind, copy_sql, build in PHASES}
+
+
+def _run_chunk(kind: str, chunk: int, params: GeneratorParams, catalogs: dict) -> tuple[int, int]:
+    copy_sql, build = BUILDERS[kind]
+    return chunk, _load_chunk(kind, chunk, params, catalogs, copy_sql, build)
+
+
+def prepare(params: GeneratorParams) -> dict[str, dict[str, int]]:
+    """
+    Siembra los catálogos si faltan, crea la tabla de bloques y valida que los bloques ya
+    cargados sean de los mismos parámetros. Retorna los ids por nombre de cada catálogo.
+    """
+    db = SessionLocal()
+    try:
+        catalogs = {}
+        for model, data in (
+            (DocumentType, DOCUMENT_TYPES),
+            (Gender, GENDERS),
+            (OperationalRole, OPERATIONAL_ROLES),
+            (AvailabilityStatus, AVAILABILITY_STATUSES),
+        ):
+            seed_parametric(db, model, data)
+            catalogs[model.__tablename__] = {record.name: record.id for record in db.query(model).all()}
+        db.execute(text(CHUNKS_TABLE_SQL))
+        previous = db.execute(text("SELECT params FROM synthetic_data_chunks LIMIT 1")).scalar()
+        db.commit()
+    finally:
+        db.close()
+    for table, weights in (
+        ("document_types", DOCUMENT_TYPE_WEIGHTS),
+        ("genders", GENDER_WEIGHTS),
+        ("operational_roles", ROLE_WEIGHTS),
+        ("availability_statuses", STATUS_WEIGHTS),
+    ):
+        if not any(name in catalogs[table] for name in weights):
+            raise SystemExit(f"{table} has none of the values seeded by db.seeder; cannot generate data.")
+    if previous is not None and previous != asdict(params):
+        raise SystemExit(
+            f"synthetic_data_chunks already has data generated with {previous}; "
+            "run with the same parameters to resume or start from an empty database."
+        )
+    return catalogs
+
+
+def stored_params() -> Optional[dict]:
+    """Parámetros de una carga anterior, para retomarla sin repetirlos en la línea de comandos."""
+    db = SessionLocal()
+    try:
+        if db.execute(text("SELECT to_regclass('synthetic_data_chunks')")).scalar() is None:
+            return None
+        return db.execute(text("SELECT params FROM synthetic_data_chunks LIMIT 1")).scalar()
+    finally:
+        db.close()
+
+
+def rebuild_role_counts() -> None:
+    """Contadores por rol desde employees: los bloques los cargan con el trigger desactivado."""
+    db = SessionLocal()
+    try:
+        print("Rebuilding employee counts per operational role...")
+        operational_role_repo.rebuild_employee_counts(db)
+    finally:
+        db.close()
+
+
+def generate(params: GeneratorParams, workers: int) -> None:
+    catalogs = prepare(params)
+    # spawn: cada proceso abre su propio engine (no se heredan conexiones del padre)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        for kind, _, _ in PHASES:
+            started = time.monotonic()
+            futures = [executor.submit(_run_chunk, kind, chunk, params, catalogs) for chunk in range(params.chunks)]
+            done = rows = 0
+            for future in as_completed(futures):
+                _, chunk_rows = future.result()
+                done += 1
+                rows += chunk_rows
+                if done % max(1, params.chunks // 20) == 0 or done == params.chunks:
+                    elapsed = time.monotonic() - started
+                    print(f"  {kind}: {done}/{params.chunks} chunks, {rows} new rows, {rows / max(elapsed, 1e-9):,.0f} rows/s")
+            if kind == "employees":
+                rebuild_role_counts()
+
+    db = SessionLocal()
+    try:
+        print("Updating planner statistics...")
+        db.execute(text("ANALYZE employees"))
+        db.execute(text("ANALYZE daily_availabilities"))
+        db.commit()
+    finally:
+        db.close()
+
+
+# Punto de entrada: python -m db.generator --employees N --days N
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos de empleados y disponibilidades con COPY.")
+    parser.add_argument("--employees", type=int, help="Empleados a generar (por defecto, los de la carga anterior).")
+    parser.add_argument("--days", type=int, help="Días de disponibilidad por empleado (por defecto, los de la carga anterior).")
+    parser.add_argument("--start-date", type=date.fromisoformat, help="Primer día de la ventana (por defecto, hoy - días).")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla (por defecto 42).")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Empleados por bloque (por defecto 1000).")
+    parser.add_argument("--workers", type=int, default=max(1, (multiprocessing.cpu_count() or 2) - 1))
+    args = parser.parse_args()
+
+    previous = stored_params() or {}
+    employees = args.employees or previous.get("employees")
+    days = args.days or previous.get("days")
+    if not employees or not days:
+        parser.error("--employees and --days are required for a new load")
+    start_date = args.start_date or (
+        date.fromisoformat(previous["start_date"]) if "start_date" in previous else date.today() - timedelta(days=days)
+    )
+    params = GeneratorParams(
+        seed=args.seed if args.seed is not None else previous.get("seed", 42),
+        employees=employees,
+        days=days,
+        start_date=start_date.isoformat(),
+        chunk_size=args.chunk_size or previous.get("chunk_size", 1000),
+    )
+    print(f"Generating {params.employees} employees x {params.days} days with {args.workers} workers...")
+    started = time.monotonic()
+    generate(params, workers=args.workers)
+    print(f"Synthetic data generated in {time.monotonic() - started:.1f}s")
@@ -0,0 +1,20 @@
+from db.session import SessionLocal
+from services import operational_role_service
+
+def run_reconciliation():
+    db_session = SessionLocal()
+
+    try:
+        print("Rebuilding employee counts per operational role...")
+        roles = operational_role_service.rebuild_employee_counts(db_session)
+        print(f"Counts rebuilt successfully for {roles} roles!")
+    except Exception as e:
+        print(f"An error occurred during reconciliation: {e}")
+        db_session.rollback()
+        raise
+    finally:
+        db_session.close()
+
+# Punto de entrada: python -m db.reconcile_role_counts
+if __name__ == "__main__":
+    run_reconciliation()
@@ -19,6 +19,28 @@ logger = logging.getLogger(__name__)
 # Inicializar Faker para datos de prueba en español
 fake = Faker("es_CO")
 
+# Valores de las tablas paramétricas (también los usa el generador de carga, db.generator)
+DOCUMENT_TYPES = [
+    {"name": "Cédula de Ciudadanía (CC)"},
+    {"name": "Cédula de Extranjería (CE)"},
+    {"name": "Permiso por Protección Temporal (PPT)"},
+]
+GENDERS = [{"name": "Masculino"}, {"name": "Femenino"}, {"name": "Otro"}]
+OPERATIONAL_ROLES = [
+    {"name": "Manipulador de Alimentos", "description": "Encargado de la preparación y servicio de alimentos."},
+    {"name": "Conductor", "description": "Responsable del transporte de insumos y alimentos."},
+    {"name": "Auxiliar Logístico", "description": "Apoyo en bodega, cargue y descargue."},
+    {"name": "Supervisor de Ruta", "description": "Coordina y verifica las entregas en las instituciones."},
+]
+AVAILABILITY_STATUSES = [
+    {"name": "Disponible"},
+    {"name": "Ausente por Enfermedad"},
+    {"name": "Vacaciones"},
+    {"name": "Permiso"},
+    {"name": "Capacitación"},
+    {"name": "Inactivo"},
+]
+
 
 def seed_db(db: Session):
     """
@@ -29,38 +51,10 @@ def seed_db(db: Session):
 
     # 1. Sembrar Tablas Paramétricas
     logger.info("Sembrando tablas paramétricas...")
-    doc_types = seed_parametric(
-        db,
-        DocumentType,
-        [
-            {"name": "Cédula de Ciudadanía (CC)"},
-            {"name": "Cédula de Extranjería (CE)"},
-            {"name": "Permiso por Protección Temporal (PPT)"},
-        ],
-    )
-    genders = seed_parametric(db, Gender, [{"name": "Masculino"}, {"name": "Femenino"}, {"name": "Otro"}])
-    roles = seed_parametric(
-        db,
-        OperationalRole,
-        [
-            {"name": "Manipulador de Alimentos", "description": "Encargado de la preparación y servicio de alimentos."},
-            {"name": "Conductor", "description": "Responsable del transporte de insumos y alimentos."},
-            {"name": "Auxiliar Logístico", "description": "Apoyo en bodega, cargue y descargue."},
-            {"name": "Supervisor de Ruta", "description": "Coordina y verifica las entregas en las instituciones."},
-        ],
-    )
-    statuses = seed_parametric(
-        db,
-        AvailabilityStatus,
-        [
-            {"name": "Disponible"},
-            {"name": "Ausente por Enfermedad"},
-            {"name": "Vacaciones"},
-            {"name": "Permiso"},
-            {"name": "Capacitación"},
-            {"name": "Inactivo"},
-        ],
-    )
+    doc_types = seed_parametric(db, DocumentType, DOCUMENT_TYPES)
+    genders = seed_parametric(db, Gender, GENDERS)
+    roles = seed_parametric(db, OperationalRole, OPERATIONAL_ROLES)
+    statuses = seed_parametric(db, AvailabilityStatus, AVAILABILITY_STATUSES)
     logger.info("Tablas paramétricas sembradas con éxito.")
 
     # 2. Sembrar Empleados
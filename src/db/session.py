@@ -1,9 +1,100 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_engine: Optional[Engine] = None
+_lock_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker que se liga al engine en la primera sesión que no trae su propio bind."""
+
+    def __call__(self, **local_kw):
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
+
+def get_engine() -> Engine:
+    """
+    Crea el engine en el primer uso (no al importar el módulo): el arranque de la
+    API lo crea en el lifespan y los scripts que no tocan la base no lo pagan.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    settings.DATABASE_URL,
+                    pool_pre_ping=True,
+                    pool_size=settings.DB_POOL_SIZE,
+                    max_overflow=settings.DB_MAX_OVERFLOW,
+                    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+                )
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def get_lock_engine() -> Engine:
+    """
+    Engine aparte, con su propio pool pequeño, para las conexiones que sostienen un
+    advisory lock de sesión durante toda una petición (Idempotency-Key). Así esas
+    conexiones no le quitan cupo al pool de get_db: con el mismo pool, N escrituras
+    con llave en paralelo lo agotaban y sus propios handlers esperaban pool_timeout.
+    Si se llena, la espera máxima es la del lock (IDEMPOTENCY_LOCK_TIMEOUT_SECONDS).
+    """
+    global _lock_engine
+    if _lock_engine is None:
+        with _engine_lock:
+            if _lock_engine is None:
+                _lock_engine = create_engine(
+                    settings.DATABASE_URL,
+                    pool_pre_ping=True,
+                    pool_size=settings.IDEMPOTENCY_LOCK_POOL_SIZE,
+                    max_overflow=0,
+                    pool_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS,
+                )
+    return _lock_engine
+
+
+def __getattr__(name: str):
+    # `from db.session import engine` sigue funcionando, pero crea el engine en ese momento
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def warm_up_pool(connections: int) -> None:
+    """
+    Abre `connections` conexiones en paralelo y las devuelve al pool, para que las
+    primeras peticiones no paguen la conexión (TCP, TLS y autenticación de Postgres).
+    """
+    engine = get_engine()
+    with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="db-warm-up") as executor:
+        futures = [executor.submit(engine.connect) for _ in range(connections)]
+    errors = [future.exception() for future in futures if future.exception() is not None]
+    for future in futures:
+        if future.exception() is None:
+            future.result().close()
+    if errors:
+        raise errors[0]
+
+
+def dispose_engine() -> None:
+    """Cierra las conexiones de los pools al apagar el proceso."""
+    for engine in (_engine, _lock_engine):
+        if engine is not None:
+            engine.dispose()
+
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,70 @@
+import argparse
+import signal
+import threading
+import time
+
+from prometheus_client import start_http_server
+
+from core.config import settings
+from core.logger import setup_logging
+from db.session import SessionLocal
+from services.outbox import outbox_service
+from services.outboxSinks import build_sink
+import logging
+
+logger = logging.getLogger(__name__)
+
+# La purga de eventos entregados no necesita correr en cada lote
+PURGE_INTERVAL_SECONDS = 300
+
+def run_dispatcher(once: bool = False):
+    """
+    Vacía el outbox en lotes hacia el destino configurado (OUTBOX_SINK).
+    Mientras haya lotes completos sigue sin esperar; si no, duerme
+    OUTBOX_POLL_INTERVAL_SECONDS. Se pueden correr varias instancias en paralelo.
+    Cada PURGE_INTERVAL_SECONDS borra los eventos entregados vencidos.
+    """
+    sink = build_sink()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    if not once:
+        start_http_server(settings.OUTBOX_METRICS_PORT)
+    print(f"Dispatching outbox events to {sink.name} sink...")
+
+    next_purge = time.monotonic()
+    while not stop.is_set():
+        db_session = SessionLocal()
+        try:
+            claimed = outbox_service.dispatch_batch(db_session, sink)
+            outbox_service.update_backlog_metrics(db_session)
+            db_session.commit()
+            if time.monotonic() >= next_purge:
+                next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+                outbox_service.purge_dispatched(db_session)
+        except Exception:
+            logger.exception("Outbox dispatch loop failed")
+            db_session.rollback()
+            claimed = 0
+        finally:
+            db_session.close()
+
+        if once and claimed < settings.OUTBOX_BATCH_SIZE:
+            break
+        if claimed < settings.OUTBOX_BATCH_SIZE:
+            stop.wait(settings.OUTBOX_POLL_INTERVAL_SECONDS)
+    print("Outbox dispatcher stopped.")
+
+# Punto de entrada: python -m dispatcher [--once]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entrega los eventos del outbox a su destino.")
+    parser.add_argument("--once", action="store_true", help="Vacía lo pendiente y termina (sin servidor de métricas).")
+    args = parser.parse_args()
+    setup_logging(
+        settings.APP_NAME,
+        level=settings.LOG_LEVEL,
+        levels=settings.LOG_LEVELS,
+        fmt=settings.LOG_FORMAT,
+        queue_size=settings.LOG_QUEUE_SIZE,
+    )
+    run_dispatcher(once=args.once)
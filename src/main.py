@@ -1,12 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.openapi.utils import get_openapi
-from routes import employees, dailyAvalabilities, parametrics
+from routes import employees, dailyAvalabilities, parametrics, changes, jobs
 from core.config import settings
-from utils.telemetrics import PrometheusMiddleware, metrics, setting_otlp
+from core.logger import setup_logging
+from core.dependencies import build_auth_client
+from db.session import SessionLocal, dispose_engine, get_engine, warm_up_pool
+from services.parametricCache import parametric_cache
+from starlette.concurrency import run_in_threadpool
+from utils.concurrency import AdaptiveLimiter, ConcurrencyLimitMiddleware, route_classifier
+from utils.sqlStatements import SqlStatementCountMiddleware
+from utils.telemetrics import PrometheusMiddleware, instrument_app, metrics, setting_otlp
+from utils.threadpool import configure_handler_threadpool
 import logging
 import uvicorn
 
+logger = logging.getLogger(__name__)
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
@@ -30,16 +42,108 @@ def custom_openapi():
     app.openapi_schema = openapi_schema
     return app.openapi_schema
 
+setup_logging(
+    settings.APP_NAME,
+    level=settings.LOG_LEVEL,
+    levels=settings.LOG_LEVELS,
+    fmt=settings.LOG_FORMAT,
+    info_sample_rate=settings.LOG_INFO_SAMPLE_RATE,
+    sampled_loggers=settings.LOG_SAMPLED_LOGGERS,
+    queue_size=settings.LOG_QUEUE_SIZE,
+)
+
+# Hilos para los handlers síncronos, a la medida del pool de conexiones
+configure_handler_threadpool(settings.THREADPOOL_CAPACITY or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+
+def warm_up() -> None:
+    """
+    Abre las conexiones del pool y carga la caché paramétrica antes de recibir tráfico.
+    Si la base no responde se registra y se sigue: pool_pre_ping reconecta después.
+    """
+    try:
+        warm_up_pool(settings.DB_WARMUP_CONNECTIONS or settings.DB_POOL_SIZE)
+        with SessionLocal() as db:
+            parametric_cache.get(db)
+    except Exception:
+        logger.exception("Warm-up failed, starting with a cold pool")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Arranque: engine, trazas (exportador OTLP e instrumentación de SQLAlchemy y httpx),
+    cliente compartido de auth y precalentamiento; uvicorn no acepta peticiones hasta
+    que termina. Apagado: cierra el cliente, el pool y vacía los spans pendientes.
+    """
+    tracer_provider = setting_otlp(
+        settings.APP_NAME,
+        settings.OTLP_GRPC_ENDPOINT,
+        # trace_id y span_id ya los agrega setup_logging
+        log_correlation=False,
+        engine=get_engine(),
+        sample_ratio=settings.OTEL_TRACES_SAMPLE_RATIO,
+        slow_request_seconds=settings.OTEL_SLOW_REQUEST_SECONDS,
+        max_queue_size=settings.OTEL_BSP_MAX_QUEUE_SIZE,
+        max_export_batch_size=settings.OTEL_BSP_MAX_EXPORT_BATCH_SIZE,
+        schedule_delay_millis=settings.OTEL_BSP_SCHEDULE_DELAY_MILLIS,
+        export_timeout_millis=settings.OTEL_BSP_EXPORT_TIMEOUT_MILLIS,
+        tail_buffer_max_traces=settings.OTEL_TAIL_BUFFER_MAX_TRACES,
+    )
+    app.state.auth_client = build_auth_client()
+    await run_in_threadpool(warm_up)
+    logger.info("Application ready")
+    try:
+        yield
+    finally:
+        await app.state.auth_client.aclose()
+        app.state.auth_client = None
+        await run_in_threadpool(dispose_engine)
+        tracer_provider.shutdown()
+
 app = FastAPI(
     title=settings.APP_NAME,
     description="Backend para la gestión del personal y su disponibilidad.",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+# Limitador de concurrencia: queda dentro de PrometheusMiddleware para que los 503 también se midan
+if settings.CONCURRENCY_LIMITER_ENABLED:
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        limiters={
+            name: AdaptiveLimiter(
+                name,
+                min_limit=settings.CONCURRENCY_MIN_LIMIT,
+                max_limit=max_limit,
+                target_latency=settings.CONCURRENCY_TARGET_LATENCY_SECONDS[name],
+                queue_size=settings.CONCURRENCY_QUEUE_SIZE,
+                queue_timeout=settings.CONCURRENCY_QUEUE_TIMEOUT_SECONDS,
+            )
+            for name, max_limit in settings.CONCURRENCY_MAX_LIMITS.items()
+        },
+        classify=route_classifier(
+            # Salud, métricas, documentación y el stream SSE (conexiones largas) nunca se limitan
+            exempt={
+                "/", "/metrics", "/docs", "/redoc", "/openapi.json", settings.API_PREFIX_STR,
+                f"{settings.API_PREFIX_STR}/availabilities/stream",
+            },
+            overrides={
+                ("GET", f"{settings.API_PREFIX_STR}/availabilities"): "reports",
+                ("GET", f"{settings.API_PREFIX_STR}/changes"): "reports",
+                ("POST", f"{settings.API_PREFIX_STR}/employees/lookup"): "reads",
+            },
+        ),
+        retry_after_seconds=settings.CONCURRENCY_RETRY_AFTER_SECONDS,
+    )
 app.add_middleware(PrometheusMiddleware, app_name=settings.APP_NAME)
+# Sentencias SQL por petición en X-SQL-Statement-Count (pruebas de carga, benchmarks/loadtest)
+if settings.SQL_STATEMENT_COUNT_HEADER:
+    app.add_middleware(SqlStatementCountMiddleware)
 app.add_route("/metrics", metrics)
-# Setting OpenTelemetry exporter
-setting_otlp(app, settings.APP_NAME, settings.OTLP_GRPC_ENDPOINT)
+# OpenTelemetry: el middleware se agrega aquí; el proveedor y el exportador, en el lifespan
+instrument_app(app)
 
 class EndpointFilter(logging.Filter):
     # Uvicorn endpoint access log filter
@@ -59,6 +163,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permite todos los métodos
     allow_headers=["*"],  # Permite todos los headers
+    # Total de registros para paginar y marca de respuesta repetida por Idempotency-Key
+    expose_headers=["X-Total-Count", "X-Total-Count-Estimated", "Idempotent-Replayed"],
 )
 
 # Incluimos los routers en la aplicación principal con prefijo de API
@@ -77,6 +183,16 @@ app.include_router(
     prefix=settings.API_PREFIX_STR,
     tags=["Parametrics"]
 )
+app.include_router(
+    changes.router,
+    prefix=settings.API_PREFIX_STR,
+    tags=["Changes"]
+)
+app.include_router(
+    jobs.router,
+    prefix=settings.API_PREFIX_STR,
+    tags=["Jobs"]
+)
 
 @app.get(f"{settings.API_PREFIX_STR}", tags=["Root"])
 def api_root():
@@ -102,9 +218,6 @@ def root():
 
 
 if __name__ == "__main__":
-    # update uvicorn access logger format
-    log_config = uvicorn.config.LOGGING_CONFIG
-    log_config["formatters"]["access"][
-        "fmt"
-    ] = "%(asctime)s %(levelname)s [%(name)s] [%(filename)s:%(lineno)d] [trace_id=%(otelTraceID)s span_id=%(otelSpanID)s resource.service.name=%(otelServiceName)s] - %(message)s"
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_config=log_config)
\ No newline at end of file
+    # Un solo proceso, para desarrollo; en producción: python -m server
+    # setup_logging ya dejó los loggers de uvicorn en la cola (JSON con trace_id)
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_config=None)
\ No newline at end of file
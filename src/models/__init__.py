@@ -2,3 +2,9 @@ from .base import Base
 from .parametric import DocumentType, Gender, OperationalRole, AvailabilityStatus
 from .employee import Employee
 from .dailyAvailability import DailyAvailability
+from .roleEmployeeCount import OperationalRoleEmployeeCount
+from .collectionVersion import CollectionVersion
+from .changeLog import ChangeLog
+from .outbox import OutboxEvent
+from .job import Job
+from .idempotencyKey import IdempotencyKey
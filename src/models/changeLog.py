@@ -0,0 +1,91 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Index, TIMESTAMP, DDL, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.expression import text
+
+from .base import Base
+
+class ChangeLog(Base):
+    """
+    Registro de cambios de employees y daily_availabilities para sincronización
+    incremental (GET /changes). Lo llenan triggers por sentencia; las filas
+    eliminadas quedan como tombstones (operation = 'delete', data = NULL).
+
+    tx_id es el id de la transacción que hizo el cambio. El feed solo entrega
+    filas de transacciones ya terminadas y las ordena por (tx_id, id), así que
+    un cambio confirmado tarde nunca queda detrás del cursor de un cliente.
+    """
+    __tablename__ = "change_log"
+
+    id = Column(BigInteger, primary_key=True)
+    tx_id = Column(BigInteger, nullable=False)
+    entity = Column(String(32), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String(8), nullable=False)
+    data = Column(JSONB, nullable=True)
+    changed_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+
+    __table_args__ = (
+        Index('ix_change_log_tx_id_id', 'tx_id', 'id'),
+        # Para la purga por antigüedad (CHANGE_LOG_RETENTION_DAYS)
+        Index('ix_change_log_changed_at', 'changed_at'),
+    )
+
+    def __repr__(self):
+        return f"<ChangeLog(id={self.id}, entity='{self.entity}', entity_id={self.entity_id}, operation='{self.operation}')>"
+
+
+# --- Triggers que alimentan el registro (compartidos con la migración) ---
+
+# Tablas observadas -> nombre de la entidad en el feed
+TRACKED_TABLES = {
+    "employees": "employee",
+    "daily_availabilities": "daily_availability",
+}
+
+# Procesos masivos que no representan cambios de negocio (p. ej. el archivado)
+# pueden desactivar el registro con SET LOCAL nutripae.skip_change_log = 'on'.
+CHANGE_LOG_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION record_row_changes() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('nutripae.skip_change_log', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO change_log (tx_id, entity, entity_id, operation)
+        SELECT pg_current_xact_id()::text::bigint, TG_ARGV[0], (to_jsonb(o) ->> 'id')::integer, 'delete'
+          FROM old_rows o
+         ORDER BY 3;
+    ELSE
+        INSERT INTO change_log (tx_id, entity, entity_id, operation, data)
+        SELECT pg_current_xact_id()::text::bigint, TG_ARGV[0], (to_jsonb(n) ->> 'id')::integer, lower(TG_OP), to_jsonb(n)
+          FROM new_rows n
+         ORDER BY 3;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+def change_log_trigger_sql(table: str, entity: str) -> list[str]:
+    """Un trigger por operación: las tablas de transición no admiten varios eventos por trigger."""
+    return [
+        f"CREATE TRIGGER {table}_change_log_insert AFTER INSERT ON {table} "
+        f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION record_row_changes('{entity}')",
+        f"CREATE TRIGGER {table}_change_log_update AFTER UPDATE ON {table} "
+        f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION record_row_changes('{entity}')",
+        f"CREATE TRIGGER {table}_change_log_delete AFTER DELETE ON {table} "
+        f"REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION record_row_changes('{entity}')",
+    ]
+
+# Los triggers abarcan varias tablas, así que se instalan cuando ya existen todas.
+event.listen(Base.metadata, "after_create", DDL(CHANGE_LOG_FUNCTION_SQL).execute_if(dialect="postgresql"))
+for _table, _entity in TRACKED_TABLES.items():
+    for _statement in change_log_trigger_sql(_table, _entity):
+        event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(
+    Base.metadata,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS record_row_changes()").execute_if(dialect="postgresql"),
+)
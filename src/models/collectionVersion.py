@@ -0,0 +1,57 @@
+from sqlalchemy import Column, BigInteger, SmallInteger, String, DDL, event
+
+from .base import Base
+from .employee import Employee
+
+# Fragmentos del contador por colección; cada conexión escribe siempre en el mismo
+COLLECTION_VERSION_SHARDS = 64
+
+class CollectionVersion(Base):
+    """
+    Fragmento del contador de versión de una colección completa (p. ej. "employees")
+    para los ETag de sus listados; la versión es la suma de sus fragmentos.
+    Un trigger por sentencia incrementa el fragmento mod(pg_backend_pid(), COLLECTION_VERSION_SHARDS).
+    A diferencia de max(updated_at) (la hora de inicio de la transacción) o de max(id)
+    de una secuencia, la suma crece con cada commit visible: una transacción que empezó
+    antes pero confirma después igual la cambia. Al repartir el contador, cada transacción
+    toma a lo sumo el lock de un fragmento y solo compite con las conexiones que caen en
+    el mismo, en lugar de serializar todas las escrituras sobre employees en una fila.
+    """
+    __tablename__ = "collection_versions"
+
+    name = Column(String(64), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CollectionVersion(name='{self.name}', shard={self.shard}, version={self.version})>"
+
+
+# --- Trigger que incrementa la versión (compartido con la migración) ---
+
+# Por sentencia y al final de ella: el lock del fragmento se toma lo más tarde posible y
+# una carga masiva (un solo COPY) lo pide una vez.
+BUMP_VERSION_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO collection_versions (name, shard, version)
+    VALUES (TG_ARGV[0], mod(pg_backend_pid(), {COLLECTION_VERSION_SHARDS}), 1)
+    ON CONFLICT (name, shard) DO UPDATE SET version = collection_versions.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+EMPLOYEES_VERSION_TRIGGER_SQL = """
+CREATE TRIGGER employees_collection_version
+AFTER INSERT OR UPDATE OR DELETE ON employees
+FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version('employees')
+"""
+
+event.listen(Employee.__table__, "after_create", DDL(BUMP_VERSION_FUNCTION_SQL).execute_if(dialect="postgresql"))
+event.listen(Employee.__table__, "after_create", DDL(EMPLOYEES_VERSION_TRIGGER_SQL).execute_if(dialect="postgresql"))
+event.listen(
+    Employee.__table__,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS bump_collection_version()").execute_if(dialect="postgresql"),
+)
@@ -1,7 +1,7 @@
 
 from datetime import date
 from sqlalchemy import (
-    Column, Integer, Date, Text, ForeignKey, UniqueConstraint, TIMESTAMP
+    Column, Integer, Date, Text, ForeignKey, UniqueConstraint, Index, TIMESTAMP
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.expression import text
@@ -12,11 +12,11 @@ class DailyAvailability(Base):
     __tablename__ = "daily_availabilities"
 
     id = Column(Integer, primary_key=True, index=True)
-    date = Column(Date, nullable=False, index=True)
+    date = Column(Date, nullable=False)
     notes = Column(Text, nullable=True)
     
     # --- Foreign Keys ---
-    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
     status_id = Column(Integer, ForeignKey("availability_statuses.id"), nullable=False)
     
     # --- SQLAlchemy Relationships ---
@@ -27,8 +27,13 @@ class DailyAvailability(Base):
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
     updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
 
-    # --- Constraint ---
-    __table_args__ = (UniqueConstraint('employee_id', 'date', name='_employee_date_uc'),)
+    # --- Constraints & Indexes ---
+    # La restricción única (employee_id, date) también sirve el listado por empleado ordenado por fecha.
+    # El índice por fecha incluye employee_id y status_id para el reporte por rango de fechas.
+    __table_args__ = (
+        UniqueConstraint('employee_id', 'date', name='_employee_date_uc'),
+        Index('ix_daily_availabilities_date_covering', 'date', postgresql_include=['employee_id', 'status_id']),
+    )
 
     def __repr__(self):
         return f"<DailyAvailability(employee_id={self.employee_id}, date='{self.date}')>"
\ No newline at end of file
@@ -2,7 +2,7 @@
 
 from datetime import date
 from sqlalchemy import (
-    Column, Integer, String, Date, Boolean, ForeignKey, TIMESTAMP
+    Column, Integer, String, Date, Boolean, ForeignKey, Index, TIMESTAMP
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.expression import text
@@ -53,7 +53,21 @@ class Employee(Base):
     updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
 
     # --- Relationship to DailyAvailability ---
-    availabilities = relationship("DailyAvailability", back_populates="employee", cascade="all, delete-orphan")
+    # La FK tiene ON DELETE CASCADE: al borrar un empleado la base de datos elimina
+    # sus disponibilidades, sin cargarlas en la sesión (passive_deletes).
+    # Ordenadas por fecha: la respuesta (y su ETag) no depende del orden físico de las filas.
+    availabilities = relationship(
+        "DailyAvailability",
+        back_populates="employee",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="DailyAvailability.date",
+    )
+
+    # --- Indexes ---
+    __table_args__ = (
+        Index('ix_employees_operational_role_id_is_active', 'operational_role_id', 'is_active'),
+    )
 
     def __repr__(self):
         return f"<Employee(id={self.id}, name='{self.full_name}')>"
\ No newline at end of file
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, Index, TIMESTAMP
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.expression import text
+
+from .base import Base
+
+class IdempotencyKey(Base):
+    """
+    Respuesta guardada de una petición POST con encabezado Idempotency-Key.
+    Los reintentos con la misma llave y el mismo usuario reciben esta respuesta
+    sin volver a ejecutar el endpoint, hasta expires_at.
+    """
+    __tablename__ = "idempotency_keys"
+
+    owner = Column(String(255), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # sha256 del método, la ruta y el cuerpo: la misma llave con otra petición es un error
+    request_hash = Column(String(64), nullable=False)
+
+    # --- Respuesta guardada ---
+    status_code = Column(Integer, nullable=False)
+    headers = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    body = Column(LargeBinary, nullable=False)
+
+    # --- Auditoría ---
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    # --- Indexes ---
+    # Para purgar las llaves vencidas
+    __table_args__ = (
+        Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey(owner='{self.owner}', key='{self.key}', status_code={self.status_code})>"
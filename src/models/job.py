@@ -0,0 +1,48 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, Boolean, Index, TIMESTAMP
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.expression import text
+
+from .base import Base
+
+class Job(Base):
+    """
+    Trabajo en segundo plano (exportaciones, generación de horarios, archivado...).
+    La API los encola y el proceso `python -m worker` los ejecuta.
+    Estados: queued -> running -> succeeded | failed | cancelled.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(BigInteger, primary_key=True)
+    job_type = Column(String(64), nullable=False)
+    status = Column(String(16), nullable=False, server_default=text("'queued'"))
+    params = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    created_by = Column(String(255), nullable=True)
+
+    # --- Progreso ---
+    progress_done = Column(Integer, nullable=False, server_default=text('0'))
+    progress_total = Column(Integer, nullable=True)
+    progress_message = Column(String(255), nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, server_default=text('false'))
+
+    # --- Resultado ---
+    result = Column(JSONB, nullable=True)
+    result_path = Column(String(500), nullable=True)
+    result_content_type = Column(String(100), nullable=True)
+    error = Column(Text, nullable=True)
+
+    # --- Auditoría ---
+    worker_id = Column(String(100), nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    started_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    heartbeat_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    # --- Indexes ---
+    # La cola: solo los trabajos en espera, en orden de llegada por tipo.
+    __table_args__ = (
+        Index('ix_jobs_queued', 'job_type', 'id', postgresql_where=text("status = 'queued'")),
+        Index('ix_jobs_running_heartbeat', 'heartbeat_at', postgresql_where=text("status = 'running'")),
+    )
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, job_type='{self.job_type}', status='{self.status}')>"
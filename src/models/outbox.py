@@ -0,0 +1,52 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, Index, TIMESTAMP
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.expression import text
+
+from .base import Base
+
+class OutboxEvent(Base):
+    """
+    Eventos de dominio pendientes de publicar (patrón transactional outbox).
+    Se insertan en la misma transacción que el cambio que describen y los
+    entrega el proceso `python -m dispatcher`, en orden por agregado.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True)
+    aggregate_type = Column(String(32), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    event_type = Column(String(64), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+
+    # --- Estado de entrega ---
+    attempts = Column(Integer, nullable=False, server_default=text('0'))
+    next_attempt_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    dispatched_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    # Se agotaron los reintentos; el evento deja de bloquear a los siguientes de su agregado
+    failed_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    # --- Indexes ---
+    # Índices parciales: los de pendientes cubren pocos eventos; el de entregados
+    # sirve para purgarlos (OUTBOX_DISPATCHED_RETENTION_HOURS).
+    __table_args__ = (
+        Index(
+            'ix_outbox_events_pending',
+            'next_attempt_at', 'id',
+            postgresql_where=text('dispatched_at IS NULL AND failed_at IS NULL'),
+        ),
+        Index(
+            'ix_outbox_events_pending_aggregate',
+            'aggregate_type', 'aggregate_id', 'id',
+            postgresql_where=text('dispatched_at IS NULL AND failed_at IS NULL'),
+        ),
+        Index(
+            'ix_outbox_events_dispatched_at',
+            'dispatched_at',
+            postgresql_where=text('dispatched_at IS NOT NULL'),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, event_type='{self.event_type}', aggregate_id={self.aggregate_id})>"
@@ -0,0 +1,105 @@
+from sqlalchemy import Column, Integer, ForeignKey, DDL, event
+
+from .base import Base
+from .employee import Employee
+
+class OperationalRoleEmployeeCount(Base):
+    """
+    Contadores de empleados por rol operativo.
+    Los mantiene un trigger sobre `employees`; se pueden reconstruir con
+    `python -m db.reconcile_role_counts`.
+    """
+    __tablename__ = "operational_role_employee_counts"
+
+    operational_role_id = Column(Integer, ForeignKey("operational_roles.id", ondelete="CASCADE"), primary_key=True)
+    total_count = Column(Integer, nullable=False, default=0)
+    active_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<OperationalRoleEmployeeCount(role_id={self.operational_role_id}, total={self.total_count}, active={self.active_count})>"
+
+
+# --- Triggers que mantienen los contadores (compartidos con la migración) ---
+
+# Son triggers por sentencia con tablas de transición: cada sentencia suma sus cambios
+# por rol y los aplica en un único upsert ordenado por operational_role_id. Así dos
+# transacciones que mueven empleados entre los mismos roles toman los locks de los
+# contadores en el mismo orden (sin deadlocks), y las filas que no cambian de rol ni
+# de estado no bloquean ningún contador.
+# Las cargas masivas (db.generator) los desactivan con SET LOCAL nutripae.skip_role_counts = 'on'
+# y al terminar reconstruyen los contadores (rebuild_employee_counts).
+ROLE_COUNTS_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION employees_update_role_counts() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('nutripae.skip_role_counts', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO operational_role_employee_counts AS counts (operational_role_id, total_count, active_count)
+        SELECT operational_role_id, count(*), count(*) FILTER (WHERE is_active)
+          FROM new_rows
+         GROUP BY operational_role_id
+         ORDER BY operational_role_id
+        ON CONFLICT (operational_role_id) DO UPDATE
+           SET total_count = counts.total_count + EXCLUDED.total_count,
+               active_count = counts.active_count + EXCLUDED.active_count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO operational_role_employee_counts AS counts (operational_role_id, total_count, active_count)
+        SELECT operational_role_id, -count(*), -count(*) FILTER (WHERE is_active)
+          FROM old_rows
+         GROUP BY operational_role_id
+         ORDER BY operational_role_id
+        ON CONFLICT (operational_role_id) DO UPDATE
+           SET total_count = counts.total_count + EXCLUDED.total_count,
+               active_count = counts.active_count + EXCLUDED.active_count;
+    ELSE
+        INSERT INTO operational_role_employee_counts AS counts (operational_role_id, total_count, active_count)
+        SELECT operational_role_id, sum(total_delta), sum(active_delta)
+          FROM (
+                SELECT operational_role_id, 1 AS total_delta, CASE WHEN is_active THEN 1 ELSE 0 END AS active_delta
+                  FROM new_rows
+                 UNION ALL
+                SELECT operational_role_id, -1, CASE WHEN is_active THEN -1 ELSE 0 END
+                  FROM old_rows
+               ) AS deltas
+         GROUP BY operational_role_id
+        HAVING sum(total_delta) <> 0 OR sum(active_delta) <> 0
+         ORDER BY operational_role_id
+        ON CONFLICT (operational_role_id) DO UPDATE
+           SET total_count = counts.total_count + EXCLUDED.total_count,
+               active_count = counts.active_count + EXCLUDED.active_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Una tabla de transición no admite varios eventos ni lista de columnas: un trigger por evento.
+ROLE_COUNTS_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER employees_role_counts_insert
+    AFTER INSERT ON employees REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION employees_update_role_counts()
+    """,
+    """
+    CREATE TRIGGER employees_role_counts_update
+    AFTER UPDATE ON employees REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION employees_update_role_counts()
+    """,
+    """
+    CREATE TRIGGER employees_role_counts_delete
+    AFTER DELETE ON employees REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION employees_update_role_counts()
+    """,
+]
+
+event.listen(Employee.__table__, "after_create", DDL(ROLE_COUNTS_FUNCTION_SQL).execute_if(dialect="postgresql"))
+for trigger_sql in ROLE_COUNTS_TRIGGERS_SQL:
+    event.listen(Employee.__table__, "after_create", DDL(trigger_sql).execute_if(dialect="postgresql"))
+event.listen(
+    Employee.__table__,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS employees_update_role_counts()").execute_if(dialect="postgresql"),
+)
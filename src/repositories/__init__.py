@@ -1,8 +1,13 @@
 from .employee import employee_repo
 from .dailyAvailability import availability_repo
+from .availabilityArchive import availability_archive_repo
 from .parametric import (
     document_type_repo,
     gender_repo,
     operational_role_repo,
     availability_status_repo
-)
\ No newline at end of file
+)
+from .changeLog import change_log_repo
+from .outbox import outbox_repo
+from .job import job_repo
+from .idempotencyKey import idempotency_key_repo
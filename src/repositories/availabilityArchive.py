@@ -0,0 +1,200 @@
+import json
+import os
+import re
+from datetime import date
+from typing import Iterable, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from core.config import settings
+
+# Esquema columnar de los archivos históricos (mismas columnas que daily_availabilities)
+ARCHIVE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("date", pa.date32()),
+    ("notes", pa.string()),
+    ("employee_id", pa.int64()),
+    ("status_id", pa.int64()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("updated_at", pa.timestamp("us", tz="UTC")),
+])
+
+# Clave de los metadatos Parquet con las filas por empleado del mes ({"employee_id": n})
+_EMPLOYEE_COUNTS_KEY = "nutripae.employee_counts"
+
+_FILE_PATTERN = re.compile(r"^daily_availabilities_(\d{4})_(\d{2})\.parquet$")
+
+
+def _month_end(year: int, month: int) -> date:
+    """Último día del mes indicado."""
+    if month == 12:
+        return date(year, 12, 31)
+    return date.fromordinal(date(year, month + 1, 1).toordinal() - 1)
+
+
+class AvailabilityArchiveRepository:
+    def __init__(self, base_dir: str):
+        """
+        Repositorio de disponibilidades archivadas en disco.
+        Guarda un archivo Parquet comprimido por cada mes archivado.
+        :param base_dir: Directorio donde viven los archivos mensuales
+        """
+        self.base_dir = base_dir
+        # Conteos por empleado de cada archivo, invalidados por fecha de modificación
+        self._counts_cache: dict[str, tuple[int, Optional[dict[int, int]]]] = {}
+
+    def _month_path(self, year: int, month: int) -> str:
+        return os.path.join(self.base_dir, f"daily_availabilities_{year:04d}_{month:02d}.parquet")
+
+    def archived_months(self) -> list[tuple[int, int]]:
+        """Lista ordenada de los meses (año, mes) que tienen archivo."""
+        if not os.path.isdir(self.base_dir):
+            return []
+        months = []
+        for name in os.listdir(self.base_dir):
+            match = _FILE_PATTERN.match(name)
+            if match:
+                months.append((int(match.group(1)), int(match.group(2))))
+        return sorted(months)
+
+    def last_archived_date(self) -> Optional[date]:
+        """Último día cubierto por el archivo, o None si no hay nada archivado."""
+        months = self.archived_months()
+        if not months:
+            return None
+        return _month_end(*months[-1])
+
+    def write_month(self, year: int, month: int, batches: Iterable[list[dict]]) -> int:
+        """
+        Escribe (o amplía) el archivo de un mes a partir de lotes de filas.
+        Si un id ya estaba archivado se conserva la versión nueva, de modo que repetir
+        un archivado interrumpido no genera duplicados ni pierde cambios.
+        Guarda en los metadatos del archivo cuántas filas tiene cada empleado.
+        El archivo se escribe a disco (fsync) y se reemplaza de forma atómica al terminar.
+        """
+        os.makedirs(self.base_dir, exist_ok=True)
+        path = self._month_path(year, month)
+        tmp_path = f"{path}.tmp"
+
+        tables = [pa.Table.from_pylist(rows, schema=ARCHIVE_SCHEMA) for rows in batches]
+        written = sum(table.num_rows for table in tables)
+        if os.path.exists(path):
+            existing = pq.read_table(path, schema=ARCHIVE_SCHEMA)
+            if tables:
+                new_ids = pa.concat_arrays([table.column("id").combine_chunks() for table in tables])
+                existing = existing.filter(pc.invert(pc.is_in(existing.column("id"), value_set=new_ids)))
+            tables.insert(0, existing)
+
+        counts: dict[str, int] = {}
+        for table in tables:
+            for item in pc.value_counts(table.column("employee_id")).to_pylist():
+                key = str(item["values"])
+                counts[key] = counts.get(key, 0) + item["counts"]
+        schema = ARCHIVE_SCHEMA.with_metadata({_EMPLOYEE_COUNTS_KEY: json.dumps(counts)})
+
+        with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+            for table in tables:
+                writer.write_table(table)
+        with open(tmp_path, "rb") as tmp_file:
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, path)
+        dir_fd = os.open(self.base_dir, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        return written
+
+    def _employee_counts(self, year: int, month: int) -> Optional[dict[int, int]]:
+        """
+        Filas por empleado de un mes, leídas solo del pie del archivo (sin tocar los datos).
+        None si el archivo es anterior a estos metadatos.
+        """
+        path = self._month_path(year, month)
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._counts_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        metadata = pq.read_schema(path).metadata or {}
+        raw = metadata.get(_EMPLOYEE_COUNTS_KEY.encode())
+        counts = {int(key): value for key, value in json.loads(raw).items()} if raw else None
+        self._counts_cache[path] = (mtime, counts)
+        return counts
+
+    def read(
+        self,
+        *,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        employee_id: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Lee las filas archivadas que cumplen los filtros, ordenadas por fecha.
+        Solo se abren los archivos de los meses que se cruzan con el rango.
+        """
+        filters = []
+        if start_date is not None:
+            filters.append(("date", ">=", start_date))
+        if end_date is not None:
+            filters.append(("date", "<=", end_date))
+        if employee_id is not None:
+            filters.append(("employee_id", "=", employee_id))
+
+        rows: list[dict] = []
+        for year, month in self.archived_months():
+            if start_date is not None and _month_end(year, month) < start_date:
+                continue
+            if end_date is not None and date(year, month, 1) > end_date:
+                continue
+            table = pq.read_table(self._month_path(year, month), filters=filters or None, schema=ARCHIVE_SCHEMA)
+            rows.extend(table.to_pylist())
+
+        rows.sort(key=lambda row: (row["date"], row["id"]))
+        return rows
+
+
+    def read_employee_page(
+        self,
+        employee_id: int,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> tuple[list[dict], int]:
+        """
+        Página [skip, skip + limit) de las filas archivadas de un empleado, ordenadas por fecha,
+        y el total de sus filas archivadas en el rango.
+        Los meses se recorren en orden; los que quedan completos antes de la página o después
+        de llenarla se cuentan con los metadatos del archivo, sin leer sus datos.
+        """
+        filters = [("employee_id", "=", employee_id)]
+        if start_date is not None:
+            filters.append(("date", ">=", start_date))
+        if end_date is not None:
+            filters.append(("date", "<=", end_date))
+
+        rows: list[dict] = []
+        total = 0
+        for year, month in self.archived_months():
+            first_day, last_day = date(year, month, 1), _month_end(year, month)
+            if (start_date is not None and last_day < start_date) or (end_date is not None and first_day > end_date):
+                continue
+            whole_month = (start_date is None or first_day >= start_date) and (end_date is None or last_day <= end_date)
+            counts = self._employee_counts(year, month) if whole_month else None
+            if counts is not None:
+                count = counts.get(employee_id, 0)
+                if count == 0 or total + count <= skip or len(rows) >= limit:
+                    total += count
+                    continue
+
+            table = pq.read_table(self._month_path(year, month), filters=filters, schema=ARCHIVE_SCHEMA)
+            month_rows = sorted(table.to_pylist(), key=lambda row: (row["date"], row["id"]))
+            offset = max(skip - total, 0)
+            rows.extend(month_rows[offset : offset + limit - len(rows)])
+            total += len(month_rows)
+        return rows, total
+
+availability_archive_repo = AvailabilityArchiveRepository(settings.AVAILABILITY_ARCHIVE_DIR)
@@ -28,11 +28,19 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> list[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
 
-    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
+    def get_all(self, db: Session) -> list[ModelType]:
+        """Obtiene todos los registros ordenados por id (pensado para tablas pequeñas)."""
+        return db.query(self.model).order_by(self.model.id).all()
+
+    def create(self, db: Session, *, obj_in: CreateSchemaType, commit: bool = True) -> ModelType:
+        """Con commit=False solo hace flush (asigna el id): el llamador confirma después."""
         # Pydantic v2 usa model_dump() en lugar de dict()
         obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data)  # Desempaqueta el diccionario
         db.add(db_obj)
+        if not commit:
+            db.flush()
+            return db_obj
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -42,7 +50,8 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: Session,
         *,
         db_obj: ModelType,
-        obj_in: UpdateSchemaType | dict[str, Any]
+        obj_in: UpdateSchemaType | dict[str, Any],
+        commit: bool = True,
     ) -> ModelType:
         if isinstance(obj_in, dict):
             update_data = obj_in
@@ -55,14 +64,27 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 setattr(db_obj, field, update_data[field])
         
         db.add(db_obj)
+        if not commit:
+            db.flush()
+            return db_obj
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
-    def remove(self, db: Session, *, id: int, options: Optional[Callable[[Query], Query]] = None) -> Optional[ModelType]:
+    def remove(
+        self,
+        db: Session,
+        *,
+        id: int,
+        options: Optional[Callable[[Query], Query]] = None,
+        commit: bool = True,
+    ) -> Optional[ModelType]:
         # Usamos get para poder aplicar las mismas opciones de carga
         obj = self.get(db, id, options=options)
         if obj:
             db.delete(obj)
-            db.commit()
+            if commit:
+                db.commit()
+            else:
+                db.flush()
         return obj
\ No newline at end of file
@@ -0,0 +1,74 @@
+from datetime import timedelta
+from sqlalchemy import delete, func, select, text, tuple_
+from sqlalchemy.orm import Session
+from typing import Optional
+from models.changeLog import ChangeLog
+
+# Transacciones ya terminadas (confirmadas o abortadas) para cualquier lector:
+# sus filas no pueden aparecer después con un (tx_id, id) menor al ya entregado.
+# Las de la transacción actual también son visibles para ella misma.
+_FINISHED_TX = text(
+    "(change_log.tx_id < pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+    " OR change_log.tx_id = pg_current_xact_id_if_assigned()::text::bigint)"
+)
+
+class ChangeLogRepository:
+
+    def get_batch(
+        self, db: Session, *, after: tuple[int, int], limit: int
+    ) -> list[ChangeLog]:
+        """
+        Cambios posteriores al cursor (tx_id, id), en orden, con keyset pagination
+        sobre el índice (tx_id, id). Solo incluye cambios de transacciones terminadas.
+        """
+        return (
+            db.query(ChangeLog)
+            .filter(tuple_(ChangeLog.tx_id, ChangeLog.id) > tuple_(*after))
+            .filter(_FINISHED_TX)
+            .order_by(ChangeLog.tx_id, ChangeLog.id)
+            .limit(limit)
+            .all()
+        )
+
+    def get_head(self, db: Session) -> Optional[tuple[int, int]]:
+        """Último (tx_id, id) visible, o None si el registro está vacío."""
+        row = (
+            db.query(ChangeLog.tx_id, ChangeLog.id)
+            .filter(_FINISHED_TX)
+            .order_by(ChangeLog.tx_id.desc(), ChangeLog.id.desc())
+            .first()
+        )
+        return tuple(row) if row else None
+
+    def get_oldest_tx_id(self, db: Session) -> Optional[int]:
+        """tx_id del cambio más antiguo que se conserva, o None si el registro está vacío."""
+        return db.query(func.min(ChangeLog.tx_id)).scalar()
+
+    def purge_expired(self, db: Session, *, retention_days: int) -> int:
+        """
+        Borra los cambios de más de `retention_days` días. Borra un prefijo en orden
+        (tx_id, id) hasta el último cambio vencido: todo lo que queda es posterior a lo
+        borrado, así que un cursor con tx_id menor al más antiguo que queda está vencido.
+        Nunca borra la última transacción terminada, para que el registro no quede
+        vacío y se puedan seguir detectando esos cursores.
+        """
+        last_tx_id = select(func.max(ChangeLog.tx_id)).where(_FINISHED_TX).scalar_subquery()
+        last_expired = (
+            db.query(ChangeLog.tx_id, ChangeLog.id)
+            .filter(ChangeLog.changed_at < func.now() - timedelta(days=retention_days))
+            .filter(_FINISHED_TX)
+            .filter(ChangeLog.tx_id < last_tx_id)
+            .order_by(ChangeLog.tx_id.desc(), ChangeLog.id.desc())
+            .first()
+        )
+        if last_expired is None:
+            return 0
+        deleted = db.execute(
+            delete(ChangeLog)
+            .where(tuple_(ChangeLog.tx_id, ChangeLog.id) <= tuple_(*last_expired))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return deleted
+
+change_log_repo = ChangeLogRepository()
@@ -1,9 +1,11 @@
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session, joinedload
-from models import DailyAvailability, Employee
+from models import AvailabilityStatus, DailyAvailability, Employee, OperationalRole
 from schemas.dailyAvailability import DailyAvailabilityCreate, DailyAvailabilityUpdate
 from .base import BaseRepository
 from datetime import date
-from typing import Optional
+from typing import Iterator, Optional
 
 class DailyAvailabilityRepository(BaseRepository[DailyAvailability, DailyAvailabilityCreate, DailyAvailabilityUpdate]):
     
@@ -34,4 +36,152 @@ class DailyAvailabilityRepository(BaseRepository[DailyAvailability, DailyAvailab
 
         return query.order_by(DailyAvailability.date, Employee.full_name).all()
 
+    def count_in_range(
+        self, db: Session, *, start_date: date, end_date: date, employee_id: Optional[int] = None
+    ) -> int:
+        query = db.query(func.count(DailyAvailability.id)).filter(
+            DailyAvailability.date >= start_date, DailyAvailability.date <= end_date
+        )
+        if employee_id:
+            query = query.filter(DailyAvailability.employee_id == employee_id)
+        return query.scalar()
+
+    def iter_report_rows(
+        self,
+        db: Session,
+        *,
+        start_date: date,
+        end_date: date,
+        employee_id: Optional[int] = None,
+        batch_size: int = 5000,
+    ) -> Iterator[tuple]:
+        """
+        Filas planas del reporte detallado, ordenadas como get_by_date_range:
+        (id, date, employee_id, nombre del empleado, rol, estado, notas).
+        Se leen por lotes con un cursor del servidor, sin crear objetos del ORM.
+        """
+        query = (
+            select(
+                DailyAvailability.id,
+                DailyAvailability.date,
+                DailyAvailability.employee_id,
+                Employee.full_name,
+                OperationalRole.name,
+                AvailabilityStatus.name,
+                DailyAvailability.notes,
+            )
+            .join(Employee, DailyAvailability.employee_id == Employee.id)
+            .join(OperationalRole, Employee.operational_role_id == OperationalRole.id)
+            .join(AvailabilityStatus, DailyAvailability.status_id == AvailabilityStatus.id)
+            .where(DailyAvailability.date >= start_date, DailyAvailability.date <= end_date)
+            .order_by(DailyAvailability.date, Employee.full_name)
+            .execution_options(yield_per=batch_size)
+        )
+        if employee_id:
+            query = query.where(DailyAvailability.employee_id == employee_id)
+        for row in db.execute(query):
+            yield tuple(row)
+
+    def create_missing(self, db: Session, *, rows: list[dict]) -> list:
+        """
+        Inserta en una sola sentencia las filas cuyo (employee_id, date) aún no existe.
+        ON CONFLICT DO NOTHING: una alta concurrente del mismo día no hace fallar la carga.
+        Retorna las filas creadas (id, employee_id, date, status_id, notes).
+        """
+        if not rows:
+            return []
+        return list(db.execute(
+            insert(DailyAvailability)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[DailyAvailability.employee_id, DailyAvailability.date])
+            .returning(
+                DailyAvailability.id,
+                DailyAvailability.employee_id,
+                DailyAvailability.date,
+                DailyAvailability.status_id,
+                DailyAvailability.notes,
+            )
+        ))
+
+    def get_range_version(
+        self,
+        db: Session,
+        *,
+        start_date: date,
+        end_date: date,
+        employee_id: Optional[int] = None
+    ) -> tuple:
+        """
+        Versión del reporte por rango: último updated_at y cantidad de disponibilidades,
+        más el último updated_at de los empleados involucrados.
+        """
+        query = (
+            db.query(
+                func.max(DailyAvailability.updated_at),
+                func.count(DailyAvailability.id),
+                func.max(Employee.updated_at),
+            )
+            .join(Employee)
+            .filter(DailyAvailability.date >= start_date, DailyAvailability.date <= end_date)
+        )
+        if employee_id:
+            query = query.filter(DailyAvailability.employee_id == employee_id)
+        return tuple(query.one())
+
+    def get_employee_version(self, db: Session, *, employee_id: int) -> tuple:
+        """Versión de las disponibilidades de un empleado: (max updated_at, cantidad)."""
+        return tuple(
+            db.query(func.max(DailyAvailability.updated_at), func.count(DailyAvailability.id))
+            .filter(DailyAvailability.employee_id == employee_id)
+            .one()
+        )
+
+    def get_by_employee(
+        self,
+        db: Session,
+        *,
+        employee_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> list[DailyAvailability]:
+        query = db.query(DailyAvailability).filter(DailyAvailability.employee_id == employee_id)
+        if start_date is not None:
+            query = query.filter(DailyAvailability.date >= start_date)
+        if end_date is not None:
+            query = query.filter(DailyAvailability.date <= end_date)
+        return query.order_by(DailyAvailability.date).offset(skip).limit(limit).all()
+
+    def get_months_before(self, db: Session, *, cutoff: date) -> list[date]:
+        """Primer día de cada mes que tiene registros anteriores a la fecha de corte."""
+        month = func.date_trunc("month", DailyAvailability.date)
+        results = (
+            db.query(month)
+            .filter(DailyAvailability.date < cutoff)
+            .distinct()
+            .order_by(month)
+            .all()
+        )
+        return [row[0].date() for row in results]
+
+    def delete_in_range_returning(
+        self, db: Session, *, start_date: date, end_date: date, batch_size: int = 10000
+    ) -> Iterator[list[dict]]:
+        """
+        Elimina las filas con fecha en [start_date, end_date) y las devuelve en lotes.
+        No hace commit: quien llama decide cuándo confirmar (p. ej. después de persistir
+        las filas en otro lado), así lo eliminado es exactamente lo devuelto.
+        No genera tombstones en el feed de cambios.
+        """
+        table = DailyAvailability.__table__
+        db.execute(text("SET LOCAL nutripae.skip_change_log = 'on'"))
+        result = db.execute(
+            delete(table)
+            .where(table.c.date >= start_date, table.c.date < end_date)
+            .returning(*table.c)
+        )
+        for partition in result.mappings().partitions(batch_size):
+            yield [dict(row) for row in partition]
+
 availability_repo = DailyAvailabilityRepository(DailyAvailability)
\ No newline at end of file
@@ -1,26 +1,46 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, String, any_, bindparam, delete, false, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session, Query, joinedload
 from typing import Optional
+from datetime import date
 from models.employee import Employee
+from models.dailyAvailability import DailyAvailability
+from models.parametric import DocumentType, Gender, OperationalRole
+from models.roleEmployeeCount import OperationalRoleEmployeeCount
+from models.collectionVersion import CollectionVersion
 from schemas.employee import EmployeeCreate, EmployeeUpdate
 from .base import BaseRepository
 
+# Campo proyectable -> (columna, catálogo al que hay que hacer JOIN o None)
+PROJECTABLE_FIELDS = {
+    **{
+        column.key: (getattr(Employee, column.key), None)
+        for column in Employee.__table__.columns
+    },
+    "document_type_name": (DocumentType.name, DocumentType),
+    "gender_name": (Gender.name, Gender),
+    "operational_role_name": (OperationalRole.name, OperationalRole),
+}
+
+_CATALOG_JOINS = {
+    DocumentType: Employee.document_type_id == DocumentType.id,
+    Gender: Employee.gender_id == Gender.id,
+    OperationalRole: Employee.operational_role_id == OperationalRole.id,
+}
+
 class EmployeeRepository(BaseRepository[Employee, EmployeeCreate, EmployeeUpdate]):
     
     def get_by_document_number(self, db: Session, *, document_number: str) -> Employee | None:
         return db.query(Employee).filter(Employee.document_number == document_number).first()
-    
-    def search_and_filter(
-        self, 
-        db: Session, 
-        *, 
+
+    def _apply_filters(
+        self,
+        query: Query,
+        *,
         search: Optional[str] = None,
         role_id: Optional[int] = None,
         is_active: Optional[bool] = None,
-        skip: int = 0, 
-        limit: int = 100
-    ) -> list[Employee]:
-        query = db.query(Employee)
-        
+    ) -> Query:
         if search:
             query = query.filter(
                 (Employee.full_name.ilike(f"%{search}%")) |
@@ -32,8 +52,236 @@ class EmployeeRepository(BaseRepository[Employee, EmployeeCreate, EmployeeUpdate
             
         if is_active is not None:
             query = query.filter(Employee.is_active == is_active)
-            
-        return query.offset(skip).limit(limit).all()
+
+        return query
+    
+    def search_and_filter(
+        self, 
+        db: Session, 
+        *, 
+        search: Optional[str] = None,
+        role_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        skip: int = 0, 
+        limit: int = 100,
+        with_total: bool = False,
+    ) -> tuple[list[Employee], Optional[int]]:
+        """
+        Página de empleados filtrados con sus catálogos cargados. Con with_total retorna
+        además el total del conjunto filtrado (ver _page); si no, (empleados, None).
+        """
+        query = db.query(Employee).options(
+            joinedload(Employee.document_type),
+            joinedload(Employee.gender),
+            joinedload(Employee.operational_role),
+        )
+        query = self._apply_filters(query, search=search, role_id=role_id, is_active=is_active)
+        employees, total = self._page(query, skip=skip, limit=limit, with_total=with_total)
+        return [row[0] for row in employees] if with_total else employees, total
+
+    def search_and_filter_fields(
+        self,
+        db: Session,
+        *,
+        fields: tuple[str, ...],
+        search: Optional[str] = None,
+        role_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 100,
+        with_total: bool = False,
+    ) -> tuple[list, Optional[int]]:
+        """
+        Igual que search_and_filter, pero selecciona solo las columnas de `fields`
+        (ver PROJECTABLE_FIELDS) y hace JOIN únicamente con los catálogos necesarios.
+        Retorna filas cuyos atributos se llaman como los campos pedidos (con
+        with_total traen además la columna _total, que los esquemas ignoran).
+        """
+        columns = [PROJECTABLE_FIELDS[name][0].label(name) for name in fields]
+        query = db.query(*columns).select_from(Employee)
+        catalogs = {PROJECTABLE_FIELDS[name][1] for name in fields} - {None}
+        for catalog, onclause in _CATALOG_JOINS.items():
+            if catalog in catalogs:
+                query = query.join(catalog, onclause)
+        query = self._apply_filters(query, search=search, role_id=role_id, is_active=is_active)
+        return self._page(query, skip=skip, limit=limit, with_total=with_total)
+
+    def _page(self, query: Query, *, skip: int, limit: int, with_total: bool) -> tuple[list, Optional[int]]:
+        """
+        Aplica la paginación. Con with_total agrega count(*) OVER (), que PostgreSQL
+        calcula sobre el conjunto filtrado antes de OFFSET/LIMIT: el total sale en la
+        misma consulta. Es None si la página viene vacía (no hay fila que lo traiga).
+        Ordena por id: sin ORDER BY el plan con la ventana puede devolver otro orden
+        y OFFSET/LIMIT repetiría o saltaría filas entre páginas.
+        """
+        query = query.order_by(Employee.id)
+        if not with_total:
+            return query.offset(skip).limit(limit).all(), None
+        rows = query.add_columns(func.count().over().label("_total")).offset(skip).limit(limit).all()
+        return rows, rows[0]._total if rows else None
+
+    def get_version(
+        self, db: Session, *, id: int, availability_range: Optional[tuple[date, date]] = None
+    ) -> Optional[tuple]:
+        """
+        Versión barata de un empleado: su updated_at y, si se pide un rango,
+        el último updated_at y el número de sus disponibilidades en ese rango.
+        Retorna None si el empleado no existe.
+        """
+        if availability_range is None:
+            updated_at = db.query(Employee.updated_at).filter(Employee.id == id).scalar()
+            return (updated_at,) if updated_at is not None else None
+
+        start_date, end_date = availability_range
+        return (
+            db.query(Employee.updated_at, func.max(DailyAvailability.updated_at), func.count(DailyAvailability.id))
+            .outerjoin(
+                DailyAvailability,
+                (DailyAvailability.employee_id == Employee.id)
+                & (DailyAvailability.date >= start_date)
+                & (DailyAvailability.date <= end_date),
+            )
+            .filter(Employee.id == id)
+            .group_by(Employee.id)
+            .first()
+        )
+
+    def get_collection_version(self, db: Session) -> tuple:
+        """
+        Versión de toda la tabla, sin recorrerla: la suma de los fragmentos de collection_versions
+        que incrementa el trigger employees_collection_version en cada sentencia sobre employees.
+        """
+        version = (
+            db.query(func.sum(CollectionVersion.version))
+            .filter(CollectionVersion.name == Employee.__tablename__)
+            .scalar()
+        )
+        return (version or 0,)
+
+    def count_from_role_counts(
+        self, db: Session, *, role_id: Optional[int] = None, is_active: Optional[bool] = None
+    ) -> int:
+        """
+        Total exacto para filtros por rol y estado sin tocar employees: suma los
+        contadores por rol que mantienen los triggers employees_role_counts_*.
+        """
+        if is_active is None:
+            column = OperationalRoleEmployeeCount.total_count
+        elif is_active:
+            column = OperationalRoleEmployeeCount.active_count
+        else:
+            column = OperationalRoleEmployeeCount.total_count - OperationalRoleEmployeeCount.active_count
+        query = db.query(func.coalesce(func.sum(column), 0))
+        if role_id is not None:
+            query = query.filter(OperationalRoleEmployeeCount.operational_role_id == role_id)
+        return int(query.scalar())
+
+    def estimate_count(
+        self,
+        db: Session,
+        *,
+        search: Optional[str] = None,
+        role_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+    ) -> int:
+        """Filas que el planificador estima para los filtros, con EXPLAIN (no ejecuta la consulta)."""
+        query = self._apply_filters(db.query(Employee.id), search=search, role_id=role_id, is_active=is_active)
+        compiled = query.statement.compile(dialect=db.get_bind().dialect)
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def count(
+        self,
+        db: Session,
+        *,
+        search: Optional[str] = None,
+        role_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+    ) -> int:
+        query = db.query(func.count(Employee.id))
+        return self._apply_filters(query, search=search, role_id=role_id, is_active=is_active).scalar()
+
+    def get_many(self, db: Session, *, ids: list[int], document_numbers: list[str]) -> list[Employee]:
+        """
+        Obtiene en una sola consulta los empleados cuyos id o número de documento
+        estén en las listas dadas, con sus catálogos cargados.
+        Las listas viajan como arreglos (`= ANY(:ids)`), así que la sentencia es la
+        misma sin importar cuántas claves se pidan.
+        """
+        condition = false()
+        if ids:
+            condition |= Employee.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+        if document_numbers:
+            condition |= Employee.document_number == any_(
+                bindparam("document_numbers", document_numbers, type_=ARRAY(String))
+            )
+        return (
+            db.query(Employee)
+            .options(
+                joinedload(Employee.document_type),
+                joinedload(Employee.gender),
+                joinedload(Employee.operational_role),
+            )
+            .filter(condition)
+            .all()
+        )
+
+    def get_active_roles(
+        self, db: Session, *, role_id: Optional[int] = None, ids: Optional[list[int]] = None
+    ) -> dict[int, int]:
+        """{id de empleado: id de rol} de los empleados activos, ordenados por id."""
+        query = db.query(Employee.id, Employee.operational_role_id).filter(Employee.is_active.is_(True))
+        if role_id is not None:
+            query = query.filter(Employee.operational_role_id == role_id)
+        if ids is not None:
+            query = query.filter(Employee.id.in_(ids))
+        return dict(query.order_by(Employee.id).all())
+
+    def terminate_many(
+        self,
+        db: Session,
+        *,
+        ids: list[int],
+        termination_date: date,
+        reason_for_termination: Optional[str] = None,
+    ) -> tuple[dict[int, int], list[int], list[dict]]:
+        """
+        Retira varios empleados con dos sentencias: un UPDATE que desactiva solo a los
+        activos y un DELETE de sus disponibilidades con fecha posterior al retiro.
+        Los ya inactivos no se tocan: conservan su fecha y motivo de retiro originales.
+        Retorna ({id de empleado: id de rol}, ids que ya estaban inactivos, disponibilidades
+        eliminadas como dicts con id, employee_id y date). No confirma: el servicio agrega
+        los eventos del outbox en la misma transacción y luego hace commit.
+        """
+        terminated = dict(db.execute(
+            update(Employee)
+            .where(Employee.id.in_(ids), Employee.is_active.is_(True))
+            .values(
+                is_active=False,
+                termination_date=termination_date,
+                reason_for_termination=reason_for_termination,
+            )
+            .returning(Employee.id, Employee.operational_role_id)
+            .execution_options(synchronize_session=False)
+        ).tuples().all())
+        skipped = [employee_id for employee_id in ids if employee_id not in terminated]
+        already_inactive = []
+        if skipped:
+            already_inactive = db.scalars(select(Employee.id).where(Employee.id.in_(skipped))).all()
+        removed = []
+        if terminated:
+            removed = [
+                dict(row) for row in db.execute(
+                    delete(DailyAvailability)
+                    .where(
+                        DailyAvailability.employee_id.in_(list(terminated)),
+                        DailyAvailability.date > termination_date,
+                    )
+                    .returning(DailyAvailability.id, DailyAvailability.employee_id, DailyAvailability.date)
+                    .execution_options(synchronize_session=False)
+                ).mappings()
+            ]
+        return terminated, sorted(already_inactive), removed
 
 # Creamos una instancia del repositorio que importaremos en los endpoints
 employee_repo = EmployeeRepository(Employee)
@@ -0,0 +1,90 @@
+import zlib
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from models.idempotencyKey import IdempotencyKey
+
+# Primer entero de la llave de los advisory locks de idempotencia (crc32 como int4 con signo)
+_LOCK_NAMESPACE = zlib.crc32(b"idempotency")
+if _LOCK_NAMESPACE >= 2**31:
+    _LOCK_NAMESPACE -= 2**32
+
+
+def _lock_key(owner: str, key: str):
+    return func.hashtext(f"{owner}:{key}")
+
+
+class IdempotencyKeyRepository:
+
+    def lock(self, db: Session, *, owner: str, key: str, timeout_seconds: float) -> bool:
+        """
+        Toma un advisory lock de sesión para la llave, esperando hasta `timeout_seconds`
+        si otra petición con la misma llave está en curso. `db` debe estar atado a una
+        sola conexión: el lock se suelta con unlock en esa misma conexión.
+        Retorna False si se agotó la espera.
+        """
+        try:
+            # lock_timeout local a esta transacción; el lock de sesión sobrevive al commit
+            db.execute(select(func.set_config("lock_timeout", f"{int(timeout_seconds * 1000)}ms", True)))
+            db.execute(select(func.pg_advisory_lock(_LOCK_NAMESPACE, _lock_key(owner, key))))
+            db.commit()
+            return True
+        except OperationalError:
+            db.rollback()
+            return False
+
+    def unlock(self, db: Session, *, owner: str, key: str) -> None:
+        db.execute(select(func.pg_advisory_unlock(_LOCK_NAMESPACE, _lock_key(owner, key))))
+        db.commit()
+
+    def get_active(self, db: Session, *, owner: str, key: str) -> Optional[IdempotencyKey]:
+        """Respuesta guardada para la llave, si existe y no ha vencido."""
+        return db.scalars(
+            select(IdempotencyKey).where(
+                IdempotencyKey.owner == owner,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at > func.now(),
+            )
+        ).first()
+
+    def save(
+        self,
+        db: Session,
+        *,
+        owner: str,
+        key: str,
+        request_hash: str,
+        status_code: int,
+        headers: dict[str, str],
+        body: bytes,
+        ttl_seconds: int,
+    ) -> None:
+        """Guarda la respuesta; reemplaza la de una llave vencida que aún no se haya purgado."""
+        values = {
+            "request_hash": request_hash,
+            "status_code": status_code,
+            "headers": headers,
+            "body": body,
+            "created_at": func.now(),
+            "expires_at": func.now() + timedelta(seconds=ttl_seconds),
+        }
+        db.execute(
+            insert(IdempotencyKey)
+            .values(owner=owner, key=key, **values)
+            .on_conflict_do_update(index_elements=[IdempotencyKey.owner, IdempotencyKey.key], set_=values)
+        )
+        db.commit()
+
+    def purge_expired(self, db: Session) -> int:
+        deleted = db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.expires_at <= func.now())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return deleted
+
+idempotency_key_repo = IdempotencyKeyRepository()
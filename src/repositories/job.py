@@ -0,0 +1,153 @@
+import zlib
+from typing import Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from models.job import Job
+
+
+def _lock_namespace(job_type: str) -> int:
+    """Primer entero de la llave del advisory lock: crc32 del tipo como int4 con signo."""
+    value = zlib.crc32(job_type.encode())
+    return value - 2**32 if value >= 2**31 else value
+
+
+class JobRepository:
+
+    def create(self, db: Session, *, job_type: str, params: dict, created_by: Optional[str] = None) -> Job:
+        job = Job(job_type=job_type, params=params, created_by=created_by)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def get(self, db: Session, id: int) -> Optional[Job]:
+        return db.get(Job, id)
+
+    # --- Límite de concurrencia por tipo ---
+
+    def try_acquire_slot(self, db: Session, *, job_type: str, max_concurrency: int) -> Optional[int]:
+        """
+        Intenta tomar uno de los `max_concurrency` cupos del tipo de trabajo con un
+        advisory lock de sesión. El lock vive en la conexión: si el worker muere,
+        PostgreSQL lo libera solo. Retorna el cupo tomado o None si están todos ocupados.
+        """
+        namespace = _lock_namespace(job_type)
+        for slot in range(max_concurrency):
+            if db.execute(select(func.pg_try_advisory_lock(namespace, slot))).scalar_one():
+                return slot
+        return None
+
+    def release_slot(self, db: Session, *, job_type: str, slot: int) -> None:
+        db.execute(select(func.pg_advisory_unlock(_lock_namespace(job_type), slot)))
+        db.commit()
+
+    # --- Ciclo de vida ---
+
+    def claim(self, db: Session, *, job_type: str, worker_id: str) -> Optional[Job]:
+        """Toma el trabajo en espera más antiguo del tipo y lo marca como running."""
+        job = db.scalars(
+            select(Job)
+            .where(Job.job_type == job_type, Job.status == "queued")
+            .order_by(Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).first()
+        if job is None:
+            db.commit()
+            return None
+        job.status = "running"
+        job.worker_id = worker_id
+        job.started_at = func.now()
+        job.heartbeat_at = func.now()
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def report_progress(
+        self,
+        db: Session,
+        *,
+        id: int,
+        worker_id: str,
+        done: int,
+        total: Optional[int],
+        message: Optional[str],
+    ) -> bool:
+        """
+        Guarda el avance y el latido del trabajo si sigue en ejecución a nombre de este worker.
+        Retorna True si el worker debe detenerlo: se pidió cancelarlo o ya no le pertenece
+        (p. ej. fail_stale lo dio por caído).
+        """
+        cancel_requested = db.execute(
+            update(Job)
+            .where(Job.id == id, Job.status == "running", Job.worker_id == worker_id)
+            .values(progress_done=done, progress_total=total, progress_message=message, heartbeat_at=func.now())
+            .returning(Job.cancel_requested)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        db.commit()
+        return cancel_requested is None or cancel_requested
+
+    def finish(self, db: Session, *, id: int, worker_id: str, status: str, **values) -> bool:
+        """
+        Cierra el trabajo con su estado final, solo si sigue en ejecución a nombre de este
+        worker: uno que fail_stale ya dio por fallido no pasa después a succeeded.
+        Retorna False si ya no le pertenecía.
+        """
+        finished = db.execute(
+            update(Job)
+            .where(Job.id == id, Job.status == "running", Job.worker_id == worker_id)
+            .values(status=status, finished_at=func.now(), heartbeat_at=func.now(), **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return finished > 0
+
+    def request_cancel(self, db: Session, *, id: int) -> Optional[Job]:
+        """
+        Cancela un trabajo en espera de inmediato; a uno en ejecución le marca
+        cancel_requested para que el worker lo detenga en su próximo reporte.
+        """
+        job = db.scalars(select(Job).where(Job.id == id).with_for_update()).first()
+        if job is None:
+            return None
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = func.now()
+        elif job.status == "running":
+            job.cancel_requested = True
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def heartbeat(self, db: Session, *, worker_ids: list[str]) -> None:
+        """Renueva el latido de los trabajos que siguen ejecutando estos workers."""
+        db.execute(
+            update(Job)
+            .where(Job.worker_id.in_(worker_ids), Job.status == "running")
+            .values(heartbeat_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def fail_stale(self, db: Session, *, stale_seconds: int) -> int:
+        """Marca como fallidos los trabajos running sin latido reciente (worker caído)."""
+        failed = db.execute(
+            update(Job)
+            .where(
+                Job.status == "running",
+                Job.heartbeat_at < func.now() - func.make_interval(0, 0, 0, 0, 0, 0, stale_seconds),
+            )
+            .values(status="failed", error="Worker stopped responding", finished_at=func.now())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return failed
+
+    def count_queued_by_type(self, db: Session) -> dict[str, int]:
+        rows = db.execute(
+            select(Job.job_type, func.count()).where(Job.status == "queued").group_by(Job.job_type)
+        ).all()
+        return {job_type: count for job_type, count in rows}
+
+job_repo = JobRepository()
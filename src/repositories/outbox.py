@@ -0,0 +1,96 @@
+from datetime import timedelta
+from sqlalchemy import and_, case, delete, exists, func, select, update
+from sqlalchemy.orm import Session, aliased
+from models.outbox import OutboxEvent
+
+_PENDING = and_(OutboxEvent.dispatched_at.is_(None), OutboxEvent.failed_at.is_(None))
+
+class OutboxRepository:
+
+    def add(self, db: Session, *, aggregate_type: str, aggregate_id: int, event_type: str, payload: dict) -> OutboxEvent:
+        """Agrega un evento a la sesión, sin confirmar: se guarda con la transacción del cambio."""
+        event = OutboxEvent(
+            aggregate_type=aggregate_type,
+            aggregate_id=aggregate_id,
+            event_type=event_type,
+            payload=payload,
+        )
+        db.add(event)
+        return event
+
+    def claim_batch(self, db: Session, *, limit: int) -> list[OutboxEvent]:
+        """
+        Bloquea hasta `limit` eventos listos para enviar, tomando solo el más antiguo
+        pendiente de cada agregado (así se respeta el orden por agregado).
+        SKIP LOCKED permite varios despachadores en paralelo sin repartir un mismo evento.
+        """
+        earlier = aliased(OutboxEvent)
+        has_earlier_pending = exists().where(
+            earlier.aggregate_type == OutboxEvent.aggregate_type,
+            earlier.aggregate_id == OutboxEvent.aggregate_id,
+            earlier.id < OutboxEvent.id,
+            earlier.dispatched_at.is_(None),
+            earlier.failed_at.is_(None),
+        )
+        return list(db.scalars(
+            select(OutboxEvent)
+            .where(_PENDING, OutboxEvent.next_attempt_at <= func.now(), ~has_earlier_pending)
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ))
+
+    def mark_dispatched(self, db: Session, *, ids: list[int]) -> None:
+        db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(ids))
+            .values(dispatched_at=func.now(), attempts=OutboxEvent.attempts + 1, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    def mark_failed(
+        self,
+        db: Session,
+        *,
+        ids: list[int],
+        error: str,
+        base_delay_seconds: float,
+        max_delay_seconds: float,
+        max_attempts: int,
+    ) -> None:
+        """
+        Registra un intento fallido y programa el siguiente con espera exponencial
+        (base * 2^intentos, hasta max_delay). Al llegar a max_attempts el evento
+        queda en failed_at y deja de bloquear a su agregado.
+        """
+        attempts = OutboxEvent.attempts + 1
+        delay = func.least(base_delay_seconds * func.power(2, OutboxEvent.attempts), max_delay_seconds)
+        db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(ids))
+            .values(
+                attempts=attempts,
+                last_error=error[:2000],
+                next_attempt_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, delay),
+                failed_at=case((attempts >= max_attempts, func.now()), else_=None),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def purge_dispatched(self, db: Session, *, retention_hours: int) -> int:
+        """Borra los eventos entregados hace más de `retention_hours` horas. Retorna cuántos borró."""
+        return db.execute(
+            delete(OutboxEvent)
+            .where(OutboxEvent.dispatched_at < func.now() - timedelta(hours=retention_hours))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def count_pending(self, db: Session) -> tuple[int, float]:
+        """(eventos pendientes, segundos desde el pendiente más antiguo)."""
+        count, age = db.execute(
+            select(func.count(), func.extract("epoch", func.now() - func.min(OutboxEvent.created_at)))
+            .where(_PENDING)
+        ).one()
+        return count, float(age or 0)
+
+outbox_repo = OutboxRepository()
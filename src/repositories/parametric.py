@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, insert, select, text
 from .base import BaseRepository
 from models.parametric import DocumentType, Gender, OperationalRole, AvailabilityStatus
 from models.employee import Employee
+from models.roleEmployeeCount import OperationalRoleEmployeeCount
 
 # --- Repositorios para tablas paramétricas simples ---
 
@@ -18,24 +19,38 @@ class AvailabilityStatusRepository(BaseRepository[AvailabilityStatus, Availabili
 # --- Repositorio para Roles Operativos con lógica adicional ---
 
 class OperationalRoleRepository(BaseRepository[OperationalRole, OperationalRole, OperationalRole]):
-    def get_with_employee_count(self, db: Session) -> list:
-        """Obtiene los roles y el número de empleados asociados a cada uno."""
-        results = (
-            db.query(
-                OperationalRole,
-                func.count(Employee.id).label("employee_count")
+    def get_employee_counts(self, db: Session) -> dict[int, tuple[int, int]]:
+        """
+        Obtiene (total, activos) de empleados por id de rol.
+        Los conteos se leen de la tabla de contadores que mantiene el trigger de employees.
+        """
+        results = db.query(
+            OperationalRoleEmployeeCount.operational_role_id,
+            OperationalRoleEmployeeCount.total_count,
+            OperationalRoleEmployeeCount.active_count,
+        ).all()
+        return {role_id: (total, active) for role_id, total, active in results}
+
+    def rebuild_employee_counts(self, db: Session) -> int:
+        """
+        Reconstruye los contadores desde cero a partir de la tabla employees.
+        Bloquea las escrituras sobre employees mientras dura la transacción.
+        Retorna el número de roles con contador.
+        """
+        db.execute(text("LOCK TABLE employees IN SHARE MODE"))
+        db.query(OperationalRoleEmployeeCount).delete(synchronize_session=False)
+        db.execute(
+            insert(OperationalRoleEmployeeCount).from_select(
+                ["operational_role_id", "total_count", "active_count"],
+                select(
+                    Employee.operational_role_id,
+                    func.count(Employee.id),
+                    func.count(Employee.id).filter(Employee.is_active.is_(True)),
+                ).group_by(Employee.operational_role_id),
             )
-            .outerjoin(Employee, Employee.operational_role_id == OperationalRole.id)
-            .group_by(OperationalRole.id)
-            .order_by(OperationalRole.name)
-            .all()
         )
-        # Mapeamos el resultado a un formato que el schema pueda entender
-        roles_with_count = []
-        for role, count in results:
-            role.employee_count = count
-            roles_with_count.append(role)
-        return roles_with_count
+        db.commit()
+        return db.query(OperationalRoleEmployeeCount).count()
 
 # --- Instancias de los repositorios ---
 
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+import schemas
+from db.session import get_db
+from services import change_feed_service
+from utils.serialization import serialize_response
+from utils.threadpool import TimedRoute
+from core.dependencies import require_list
+from utils.exceptions import ExpiredCursorError
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/changes",
+    route_class=TimedRoute,
+    tags=["Changes"],
+)
+
+@router.get("", response_model=schemas.ChangeFeed, summary="Get changes to employees and availabilities since a cursor")
+def read_changes_endpoint(
+    since: Optional[str] = Query(None, description="Cursor returned as `next_cursor` by the previous call"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_list()),
+):
+    """
+    Incremental sync feed for employees and daily availabilities.
+    - Returns inserts and updates with the full row in `data`, and deletions as tombstones (`data` is null).
+    - Keep calling with `since=next_cursor` while `has_more` is true; later calls only return newer changes.
+    - Without `since`, starts from the oldest kept change. To bootstrap, get `/changes/cursor`,
+      download the full data, then follow the feed from that cursor.
+    - Changes are kept for a limited time. Raises 410 if `since` is older than the oldest kept change:
+      the client must bootstrap again.
+    - Requires 'nutripae-rh:list' permission.
+    """
+    try:
+        feed = change_feed_service.get_changes(db=db, since=since, limit=limit)
+    except ExpiredCursorError as e:
+        logger.warning("Expired change cursor: %s", e)
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except ValueError as e:
+        logger.error("Error getting changes: %s", e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return serialize_response(schemas.ChangeFeed, feed)
+
+@router.get("/cursor", response_model=schemas.ChangeCursor, summary="Get the cursor of the latest change")
+def read_change_cursor_endpoint(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_list()),
+):
+    """
+    Returns the cursor of the most recent visible change, to start following the feed after a full download.
+    - Requires 'nutripae-rh:list' permission.
+    """
+    return {"cursor": change_feed_service.get_head_cursor(db=db)}
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
@@ -6,15 +8,26 @@ from datetime import date
 import schemas
 from db.session import get_db
 from services import availability_service
+from services.availabilityEvents import availability_event_service
+from core.config import settings
+from utils.eventHub import RESET
 from utils.exceptions import RecordNotFoundError, DuplicateRecordError
+from utils.idempotency import IdempotentRoute, idempotency_key
+from utils.serialization import serialize_response
 from core.dependencies import (
     require_create,
     require_read,
-    require_list
+    require_list,
+    require_update,
+    require_delete
 )
 import logging
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/availabilities",
+    route_class=IdempotentRoute,
     tags=["Availabilities"],
 )
 
@@ -23,27 +36,30 @@ def create_availability_endpoint(
     availability_in: schemas.DailyAvailabilityCreate,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_create()),
+    idempotency: Optional[str] = Depends(idempotency_key),
 ):
     """
     Creates a new daily availability record for an employee.
     - Raises 404 if the employee does not exist or is inactive.
     - Raises 409 if an availability record for that employee and date already exists.
+    - Send an `Idempotency-Key` header to make retries safe: a repeated key returns the first response.
     - Requires 'nutripae-rh:create' permission.
     """
-    logging.info(f"Creating availability: {availability_in}")
+    logger.debug("Creating availability for employee %s on %s", availability_in.employee_id, availability_in.date)
     try:
         return availability_service.create_availability(db=db, availability_in=availability_in)
     except (RecordNotFoundError, ValueError) as e:
-        logging.error(f"Error creating availability: {e}")
+        logger.error("Error creating availability: %s", e)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except DuplicateRecordError as e:
-        logging.error(f"Error creating availability: {e}")
+        logger.error("Error creating availability: %s", e)
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 @router.get("/", response_model=List[schemas.DailyAvailabilityDetails], summary="Get detailed availabilities by date range")
 def get_detailed_availabilities_endpoint(
     start_date: date,
     end_date: date,
+    request: Request,
     employee_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_list()),
@@ -51,35 +67,184 @@ def get_detailed_availabilities_endpoint(
     """
     Retrieves detailed availability records within a date range.
     - Optionally filters by a specific employee.
+    - Supports `If-None-Match`: returns 304 when nothing in the range changed.
     - Requires 'nutripae-rh:list' permission.
     """
-    logging.info(f"Getting detailed availabilities: {start_date}, {end_date}, {employee_id}")
+    logger.debug("Getting detailed availabilities: %s, %s, %s", start_date, end_date, employee_id)
     try:
-        return availability_service.get_detailed_availabilities(
+        validators = availability_service.get_detailed_availabilities_validators(
             db=db, start_date=start_date, end_date=end_date, employee_id=employee_id
         )
+        if validators.is_not_modified(request):
+            return validators.not_modified_response()
+        availabilities = availability_service.get_detailed_availabilities(
+            db=db, start_date=start_date, end_date=end_date, employee_id=employee_id
+        )
+        return serialize_response(List[schemas.DailyAvailabilityDetails], availabilities, headers=validators.headers)
     except ValueError as e:
-        logging.error(f"Error getting detailed availabilities: {e}")
+        logger.error("Error getting detailed availabilities: %s", e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/employee/{employee_id}", response_model=List[schemas.DailyAvailability], summary="Get all availabilities for an employee")
 def get_availabilities_for_employee_endpoint(
     employee_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    start_date: Optional[date] = Query(None, description="Only availabilities on or after this date"),
+    end_date: Optional[date] = Query(None, description="Only availabilities on or before this date"),
     current_user: dict = Depends(require_read()),
 ):
     """
     Retrieves all availability records for a specific employee.
+    - Optionally limited to `start_date`/`end_date`. Archived history is only read when the
+      range reaches it, so recent ranges avoid the cold storage entirely.
     - Raises 404 if the employee does not exist.
+    - Supports `If-None-Match`: returns 304 when the employee's availabilities are unchanged.
     - Requires 'nutripae-rh:read' permission.
     """
     try:
-        return availability_service.get_availabilities_by_employee(db=db, employee_id=employee_id, skip=skip, limit=limit)
+        validators = availability_service.get_availabilities_by_employee_validators(
+            db=db, employee_id=employee_id, skip=skip, limit=limit, start_date=start_date, end_date=end_date
+        )
+        if validators.is_not_modified(request):
+            return validators.not_modified_response()
+        availabilities = availability_service.get_availabilities_by_employee(
+            db=db, employee_id=employee_id, skip=skip, limit=limit, start_date=start_date, end_date=end_date
+        )
+        return serialize_response(List[schemas.DailyAvailability], availabilities, headers=validators.headers)
+    except RecordNotFoundError as e:
+        logger.error("Error getting availabilities for employee: %s", e)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get(
+    "/stream",
+    summary="Stream availability changes (Server-Sent Events)",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_availabilities_endpoint(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    role_id: Optional[int] = Query(None, description="Only changes of employees with this operational role"),
+    current_user: dict = Depends(require_list()),
+):
+    """
+    Pushes `availability.created`, `availability.updated` and `availability.deleted` events,
+    plus `employee.removed` when an employee and all their availabilities are deleted.
+    - Bulk schedule jobs send one `availability.bulk_created` event per group of employees, with
+      `start_date`, `end_date`, `employee_ids` and `operational_role_ids` instead of one event per
+      row: reload that range with `GET /availabilities`. Jobs run in the worker process, so these
+      events only arrive with `AVAILABILITY_EVENTS_BACKEND=postgres`.
+    - Bulk terminations likewise send one `availability.bulk_deleted` event per group of employees,
+      covering the availabilities deleted from `start_date` to `end_date`.
+    - Filter by `start_date`/`end_date` (availability date) and `role_id`.
+    - Sends a `: ping` comment every few seconds as heartbeat.
+    - Reconnects with `Last-Event-ID` receive the events missed meanwhile. If they are no
+      longer buffered, or the client falls too far behind, a `reset` event is sent and the
+      client should reload the range with `GET /availabilities`.
+    - Requires 'nutripae-rh:list' permission.
+    """
+    def matches(event) -> bool:
+        data = event.data
+        if role_id is not None:
+            if "operational_role_ids" in data:
+                if role_id not in data["operational_role_ids"]:
+                    return False
+            elif data.get("operational_role_id") != role_id:
+                return False
+        if "start_date" in data:
+            # Evento de un rango (bulk_created/bulk_deleted): basta con que se cruce con el pedido
+            if start_date is not None and data["end_date"] < start_date.isoformat():
+                return False
+            if end_date is not None and data["start_date"] > end_date.isoformat():
+                return False
+        if "date" in data:
+            if start_date is not None and data["date"] < start_date.isoformat():
+                return False
+            if end_date is not None and data["date"] > end_date.isoformat():
+                return False
+        return True
+
+    subscription, replay = availability_event_service.subscribe(
+        matches, last_event_id=request.headers.get("last-event-id")
+    )
+
+    def reset_frame() -> bytes:
+        last_id = availability_event_service.hub.last_event_id()
+        return (f"id: {last_id}\n" if last_id else "").encode() + b"event: reset\ndata: {}\n\n"
+
+    async def event_stream():
+        try:
+            yield b"retry: 3000\n\n"
+            if replay is None:
+                yield reset_frame()
+            else:
+                for event in replay:
+                    yield event.encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": ping\n\n"
+                    continue
+                if event is RESET:
+                    yield reset_frame()
+                    break
+                yield event.encode()
+        finally:
+            availability_event_service.hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.put("/{availability_id}", response_model=schemas.DailyAvailability, summary="Update an availability record")
+def update_availability_endpoint(
+    availability_id: int,
+    availability_in: schemas.DailyAvailabilityUpdate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_update()),
+):
+    """
+    Updates the status or notes of an availability record.
+    - Raises 404 if the record or the new status does not exist.
+    - Requires 'nutripae-rh:update' permission.
+    """
+    logger.debug("Updating availability: %s", availability_id)
+    try:
+        return availability_service.update_availability(
+            db=db, availability_id=availability_id, availability_in=availability_in
+        )
+    except RecordNotFoundError as e:
+        logger.error("Error updating availability: %s", e)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.delete("/{availability_id}", response_model=schemas.DailyAvailability, summary="Delete an availability record")
+def delete_availability_endpoint(
+    availability_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_delete()),
+):
+    """
+    Deletes an availability record.
+    - Raises 404 if the record does not exist.
+    - Requires 'nutripae-rh:delete' permission.
+    """
+    logger.debug("Deleting availability: %s", availability_id)
+    try:
+        return availability_service.delete_availability(db=db, availability_id=availability_id)
     except RecordNotFoundError as e:
-        logging.error(f"Error getting availabilities for employee: {e}")
+        logger.error("Error deleting availability: %s", e)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
-# Aquí irían los endpoints para GET (por ID), PUT y DELETE para una disponibilidad específica,
+# Aquí iría el endpoint GET por ID para una disponibilidad específica,
 # siguiendo el mismo patrón que el controlador de empleados.
\ No newline at end of file
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 
 import schemas
 from db.session import get_db
 from services import employee_service
 from utils.exceptions import RecordNotFoundError, DuplicateRecordError
+from utils.idempotency import IdempotentRoute, idempotency_key
+from utils.serialization import serialize_response
 from core.dependencies import (
     require_create,
     require_read,
@@ -14,47 +16,164 @@ from core.dependencies import (
     require_list
 )
 import logging
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/employees",
+    route_class=IdempotentRoute,
     tags=["Employees"],
 )
 
+MAX_AVAILABILITY_WINDOW_DAYS = 366
+
+def employee_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated fields to return instead of the full employee, e.g. "
+                    "`full_name,document_number,operational_role_name`. `id` is always included.",
+    ),
+) -> Optional[tuple[str, ...]]:
+    """Valida `fields` contra EmployeeListItem; None si se pide el empleado completo."""
+    if not fields:
+        return None
+    requested = ["id"] + [part.strip() for part in fields.split(",") if part.strip()]
+    unknown = set(requested) - set(schemas.EmployeeListItem.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    # Orden canónico del esquema: el orden o las repeticiones de la petición no crean esquemas nuevos
+    return tuple(name for name in schemas.EmployeeListItem.model_fields if name in requested)
+
+def availability_window_days(
+    include: Optional[str] = Query(
+        None, description="Comma separated relations to embed. Supported: `availabilities`."
+    ),
+    availability_window: str = Query(
+        "30d",
+        pattern=r"^\d{1,3}d$",
+        description=f"Days around today of embedded availabilities, e.g. `30d` (max {MAX_AVAILABILITY_WINDOW_DAYS}d).",
+    ),
+) -> Optional[int]:
+    """Traduce `include`/`availability_window` a una ventana en días, o None si no se piden disponibilidades."""
+    includes = {part.strip() for part in include.split(",") if part.strip()} if include else set()
+    unknown = includes - {"availabilities"}
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported include: {', '.join(sorted(unknown))}",
+        )
+    if "availabilities" not in includes:
+        return None
+    days = int(availability_window[:-1])
+    if days > MAX_AVAILABILITY_WINDOW_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"availability_window cannot exceed {MAX_AVAILABILITY_WINDOW_DAYS}d",
+        )
+    return days
+
 @router.post("/", response_model=schemas.Employee, status_code=status.HTTP_201_CREATED, summary="Create a new employee")
 def create_employee_endpoint(
     employee_in: schemas.EmployeeCreate,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_create()),
+    idempotency: Optional[str] = Depends(idempotency_key),
 ):
     """
     Creates a new employee in the system.
     - **document_number**: Must be unique.
     - Raises a 409 Conflict error if the document number already exists.
+    - Raises a 404 Not Found error if a referenced parametric record does not exist.
+    - Send an `Idempotency-Key` header to make retries safe: a repeated key returns the first response.
     - Requires 'nutripae-rh:create' permission.
     """
-    logging.info(f"Creating employee: {employee_in}")
+    logger.debug("Creating employee with operational role %s", employee_in.operational_role_id)
     try:
         return employee_service.create_employee(db=db, employee_in=employee_in)
     except DuplicateRecordError as e:
-        logging.error(f"Error creating employee: {e}")
+        logger.error("Error creating employee: %s", e)
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except RecordNotFoundError as e:
+        logger.error("Error creating employee: %s", e)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.post("/lookup", response_model=schemas.EmployeeLookupResult, summary="Get many employees by ids or document numbers")
+def lookup_employees_endpoint(
+    lookup_in: schemas.EmployeeLookup,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_read()),
+):
+    """
+    Resolves up to 500 employee ids and/or document numbers in a single query.
+    - Matches are returned in request order (ids first, then document numbers), without duplicates.
+    - Keys without a match are listed in `not_found_ids` / `not_found_document_numbers`.
+    - Requires 'nutripae-rh:read' permission.
+    """
+    result = employee_service.lookup_employees(db=db, lookup_in=lookup_in)
+    return serialize_response(schemas.EmployeeLookupResult, result)
+
+@router.post("/terminations", response_model=schemas.EmployeeTerminationResult, summary="Terminate many employees")
+def terminate_employees_endpoint(
+    termination_in: schemas.EmployeeTermination,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_update()),
+    idempotency: Optional[str] = Depends(idempotency_key),
+):
+    """
+    Deactivates several employees at once and deletes their availabilities dated
+    after `termination_date`, using two set-based statements.
+    - Unknown ids are reported in `not_found_ids`; the rest are still terminated.
+    - Employees that are already inactive are left untouched and reported in `already_inactive_ids`.
+    - Send an `Idempotency-Key` header to make retries safe: a repeated key returns the first response.
+    - Requires 'nutripae-rh:update' permission.
+    """
+    logger.debug("Terminating %s employees", len(termination_in.employee_ids))
+    return employee_service.terminate_employees(db=db, termination_in=termination_in)
 
-@router.get("/", response_model=List[schemas.Employee], summary="Get a list of all employees with filters")
+@router.get(
+    "/",
+    response_model=Union[List[schemas.Employee], List[schemas.EmployeeListItem]],
+    summary="Get a list of all employees with filters",
+)
 def read_employees_endpoint(
+    request: Request,
     db: Session = Depends(get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=200),
     search: Optional[str] = Query(None, description="Search by name or document number"),
     role_id: Optional[int] = Query(None, description="Filter by operational role ID"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    fields: Optional[tuple[str, ...]] = Depends(employee_fields),
     current_user: dict = Depends(require_list()),
 ):
     """
     Retrieves a paginated list of employees. 
     It can be filtered by name, document, role, and active status.
+    - Use `fields=` to get only those columns: each item is an `EmployeeListItem` with just the
+      requested fields (including `document_type_name`, `gender_name` and `operational_role_name`).
+      Without `fields=` each item is a full `Employee`.
+    - The `X-Total-Count` header carries the number of employees matching the filters. For
+      searches matching many rows it is the planner's estimate and `X-Total-Count-Estimated: true` is set.
+    - Supports `If-None-Match`: returns 304 when the filtered set has not changed.
     - Requires 'nutripae-rh:list' permission.
     """
-    logging.info(f"Getting employees: {search}, {role_id}, {is_active}, {skip}, {limit}")
-    return employee_service.get_all_employees(
+    logger.debug("Getting employees: search=%s, role_id=%s, is_active=%s, skip=%s, limit=%s", bool(search), role_id, is_active, skip, limit)
+    validators = employee_service.get_employees_validators(
+        db=db, search=search, role_id=role_id, is_active=is_active, skip=skip, limit=limit, fields=fields
+    )
+    if validators.is_not_modified(request):
+        return validators.not_modified_response()
+    if fields is not None:
+        rows, total = employee_service.get_employee_fields(
+            db=db, fields=fields, search=search, role_id=role_id, is_active=is_active, skip=skip, limit=limit
+        )
+        return serialize_response(
+            List[schemas.employee_fields_schema(fields)], rows, headers={**validators.headers, **total.headers}
+        )
+    employees, total = employee_service.get_all_employees(
         db=db, 
         search=search, 
         role_id=role_id, 
@@ -62,22 +181,44 @@ def read_employees_endpoint(
         skip=skip, 
         limit=limit
     )
+    return serialize_response(List[schemas.Employee], employees, headers={**validators.headers, **total.headers})
 
-@router.get("/{employee_id}", response_model=schemas.Employee, summary="Get an employee by ID")
+@router.get(
+    "/{employee_id}",
+    response_model=Union[schemas.EmployeeWithAvailabilities, schemas.Employee],
+    summary="Get an employee by ID",
+)
 def read_employee_endpoint(
     employee_id: int,
+    request: Request,
+    window_days: Optional[int] = Depends(availability_window_days),
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_read()),
 ):
     """
     Retrieves a single employee by their unique ID.
+    - Use `?include=availabilities&availability_window=30d` to embed the employee's
+      availabilities dated within that many days of today (`EmployeeWithAvailabilities`).
     - Raises a 404 Not Found error if the employee does not exist.
+    - Supports `If-None-Match` / `If-Modified-Since`: returns 304 when unchanged.
     - Requires 'nutripae-rh:read' permission.
     """
     try:
-        return employee_service.get_employee(db=db, employee_id=employee_id)
+        validators = employee_service.get_employee_validators(
+            db=db, employee_id=employee_id, availability_window_days=window_days
+        )
+        if validators.is_not_modified(request):
+            return validators.not_modified_response()
+        employee = employee_service.get_employee(
+            db=db, employee_id=employee_id, availability_window_days=window_days
+        )
+        # Se serializa con el esquema exacto: validar el ORM contra la unión cargaría
+        # las disponibilidades del empleado aunque no se pidieran
+        if window_days is not None:
+            return serialize_response(schemas.EmployeeWithAvailabilities, employee, headers=validators.headers)
+        return serialize_response(schemas.Employee, employee, headers=validators.headers)
     except RecordNotFoundError as e:
-        logging.error(f"Error getting employee: {e}")
+        logger.error("Error getting employee: %s", e)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 @router.put("/{employee_id}", response_model=schemas.Employee, summary="Update an employee")
@@ -92,11 +233,11 @@ def update_employee_endpoint(
     - Raises a 404 Not Found error if the employee does not exist.
     - Requires 'nutripae-rh:update' permission.
     """
-    logging.info(f"Updating employee: {employee_id}")
+    logger.debug("Updating employee: %s", employee_id)
     try:
         return employee_service.update_employee(db=db, employee_id=employee_id, employee_in=employee_in)
     except RecordNotFoundError as e:
-        logging.error(f"Error updating employee: {e}")
+        logger.error("Error updating employee: %s", e)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 @router.delete("/{employee_id}", response_model=schemas.Employee, summary="Delete an employee")
@@ -111,9 +252,9 @@ def delete_employee_endpoint(
     - Returns the deleted employee's data upon success.
     - Requires 'nutripae-rh:delete' permission.
     """
-    logging.info(f"Deleting employee: {employee_id}")
+    logger.debug("Deleting employee: %s", employee_id)
     try:
         return employee_service.delete_employee(db=db, employee_id=employee_id)
     except RecordNotFoundError as e:
-        logging.error(f"Error deleting employee: {e}")
+        logger.error("Error deleting employee: %s", e)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
\ No newline at end of file
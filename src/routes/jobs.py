@@ -0,0 +1,143 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+import schemas
+from db.session import get_db
+from services import job_service
+from utils.exceptions import RecordNotFoundError
+from utils.idempotency import IdempotentRoute, idempotency_key
+from core.dependencies import (
+    require_create,
+    require_read,
+    require_list,
+    require_update,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/jobs",
+    route_class=IdempotentRoute,
+    tags=["Jobs"],
+)
+
+def submit_job(db: Session, request: Request, response: Response, job_type: str, params, current_user: dict):
+    job = job_service.submit(
+        db=db, job_type=job_type, params=params.model_dump(mode="json"), created_by=current_user.get("user_email")
+    )
+    response.headers["Location"] = str(request.url_for("read_job_endpoint", job_id=job.id))
+    return job
+
+@router.post("/availability-exports", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED, summary="Export availabilities to CSV in the background")
+def submit_availability_export_endpoint(
+    params: schemas.AvailabilityExportParams,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_list()),
+    idempotency: Optional[str] = Depends(idempotency_key),
+):
+    """
+    Queues a CSV export of the detailed availability report for a date range.
+    - Poll `GET /jobs/{id}` and download the file from `GET /jobs/{id}/result` when it succeeds.
+    - Send an `Idempotency-Key` header to make retries safe: a repeated key returns the first response.
+    - Requires 'nutripae-rh:list' permission.
+    """
+    return submit_job(db, request, response, "availability_export", params, current_user)
+
+@router.post("/availability-schedules", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED, summary="Create availabilities in bulk in the background")
+def submit_availability_schedule_endpoint(
+    params: schemas.AvailabilityScheduleParams,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_create()),
+    idempotency: Optional[str] = Depends(idempotency_key),
+):
+    """
+    Queues the creation of one availability per day in the range for every active employee
+    (or those of `role_id`, or `employee_ids`). Days that already have a record are skipped.
+    - Work is committed in groups of employees: cancelling keeps what was already created.
+    - Send an `Idempotency-Key` header to make retries safe: a repeated key returns the first response.
+    - Requires 'nutripae-rh:create' permission.
+    """
+    return submit_job(db, request, response, "availability_schedule", params, current_user)
+
+@router.post("/availability-archives", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED, summary="Archive old availabilities in the background")
+def submit_availability_archive_endpoint(
+    params: schemas.AvailabilityArchiveParams,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_update()),
+    idempotency: Optional[str] = Depends(idempotency_key),
+):
+    """
+    Queues moving availabilities older than `cutoff` (default: the configured retention) to the Parquet archive.
+    - Send an `Idempotency-Key` header to make retries safe: a repeated key returns the first response.
+    - Requires 'nutripae-rh:update' permission.
+    """
+    return submit_job(db, request, response, "availability_archive", params, current_user)
+
+@router.get("/{job_id}", response_model=schemas.Job, summary="Get the status and progress of a job")
+def read_job_endpoint(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_read()),
+):
+    """
+    Retrieves a job: status, progress (`progress_done` of `progress_total`), result or error.
+    - Raises 404 if the job does not exist.
+    - Requires 'nutripae-rh:read' permission.
+    """
+    try:
+        return job_service.get_job(db=db, job_id=job_id)
+    except RecordNotFoundError as e:
+        logger.error("Error reading job: %s", e)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.get("/{job_id}/result", summary="Download the file produced by a job")
+def read_job_result_endpoint(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_read()),
+):
+    """
+    Downloads the file produced by a succeeded job (e.g. the CSV of an export).
+    - Raises 404 if the job does not exist, 409 if it has not succeeded or produces no file.
+    - Requires 'nutripae-rh:read' permission.
+    """
+    try:
+        path, media_type = job_service.get_result_file(db=db, job_id=job_id)
+    except RecordNotFoundError as e:
+        logger.error("Error reading job result: %s", e)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        logger.error("Error reading job result: %s", e)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not path.exists():
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=f"Result file of job {job_id} is no longer available.")
+    return FileResponse(path, media_type=media_type, filename=path.name)
+
+@router.post("/{job_id}/cancel", response_model=schemas.Job, summary="Cancel a job")
+def cancel_job_endpoint(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_update()),
+):
+    """
+    Cancels a queued job right away; a running job stops at its next progress report.
+    - Raises 404 if the job does not exist, 409 if it already finished.
+    - Requires 'nutripae-rh:update' permission.
+    """
+    try:
+        return job_service.cancel_job(db=db, job_id=job_id)
+    except RecordNotFoundError as e:
+        logger.error("Error cancelling job: %s", e)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        logger.error("Error cancelling job: %s", e)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 import logging
@@ -9,20 +9,51 @@ from services import (
     gender_service,
     operational_role_service,
     availability_status_service,
+    parametric_catalog_service,
 )
+from utils.threadpool import TimedRoute
 from core.dependencies import require_read
+from utils.conditional import etag_matches
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/options",
+    route_class=TimedRoute,
     tags=["Options"],
 )
 
+@router.get(
+    "",
+    response_model=schemas.ParametricCatalogs,
+    summary="Get all parametric catalogs at once",
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Catalogs unchanged since the given ETag"}},
+)
+def get_all_options_endpoint(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_read()),
+):
+    """
+    Get document types, genders, operational roles and availability statuses in one call.
+    - Returns an `ETag`; send it back in `If-None-Match` to get a 304 when nothing changed.
+    - Requires 'nutripae-rh:read' permission.
+    """
+    logger.debug("Getting all parametric catalogs")
+    snapshot = parametric_catalog_service.get_snapshot(db=db)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return snapshot.catalogs
+
 @router.get("/document-types", response_model=List[schemas.DocumentType], summary="Get all available document types")
 def get_document_types_endpoint(
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_read()),
 ):
-    logging.info(f"Getting document types")
+    logger.debug("Getting document types")
     """
     Get all available document types.
     - Requires 'nutripae-rh:read' permission.
@@ -34,7 +65,7 @@ def get_genders_endpoint(
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_read()),
 ):
-    logging.info(f"Getting genders")
+    logger.debug("Getting genders")
     """
     Get all available genders.
     - Requires 'nutripae-rh:read' permission.
@@ -46,7 +77,7 @@ def get_operational_roles_endpoint(
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_read()),
 ):
-    logging.info(f"Getting operational roles")
+    logger.debug("Getting operational roles")
     """
     Get all available operational roles with employee count.
     - Requires 'nutripae-rh:read' permission.
@@ -58,7 +89,7 @@ def get_availability_statuses_endpoint(
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_read()),
 ):
-    logging.info(f"Getting availability statuses")
+    logger.debug("Getting availability statuses")
     """
     Get all available availability statuses.
     - Requires 'nutripae-rh:read' permission.
@@ -1,3 +1,8 @@
-from .parametric import DocumentType, Gender, OperationalRole, AvailabilityStatus, OperationalRoleWithCount
-from .employee import Employee, EmployeeCreate, EmployeeUpdate
-from .dailyAvailability import DailyAvailability, DailyAvailabilityCreate, DailyAvailabilityUpdate, DailyAvailabilityDetails
\ No newline at end of file
+from .parametric import DocumentType, Gender, OperationalRole, AvailabilityStatus, OperationalRoleWithCount, ParametricCatalogs
+from .employee import (
+    Employee, EmployeeCreate, EmployeeUpdate, EmployeeWithAvailabilities, EmployeeListItem, employee_fields_schema,
+    EmployeeTermination, EmployeeTerminationResult, EmployeeLookup, EmployeeLookupResult
+)
+from .dailyAvailability import DailyAvailability, DailyAvailabilityCreate, DailyAvailabilityUpdate, DailyAvailabilityDetails
+from .changeFeed import Change, ChangeFeed, ChangeCursor
+from .job import Job, AvailabilityExportParams, AvailabilityScheduleParams, AvailabilityArchiveParams
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Any, Literal
+
+class Change(BaseModel):
+    seq: int
+    entity: Literal["employee", "daily_availability"]
+    entity_id: int
+    operation: Literal["insert", "update", "delete"]
+    changed_at: datetime
+    # Fila completa tras el cambio; None en los tombstones (operation = "delete")
+    data: dict[str, Any] | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ChangeFeed(BaseModel):
+    changes: list[Change]
+    # Cursor opaco para la siguiente llamada (?since=next_cursor)
+    next_cursor: str
+    has_more: bool
+
+class ChangeCursor(BaseModel):
+    cursor: str
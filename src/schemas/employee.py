@@ -1,5 +1,6 @@
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, create_model, model_validator
 from datetime import date, datetime
 
 from .parametric import DocumentType, Gender, OperationalRole
@@ -58,8 +59,89 @@ class Employee(EmployeeBase):
     document_type: DocumentType
     gender: Gender
     operational_role: OperationalRole
-    
-    # También podemos incluir las disponibilidades relacionadas
+
+    model_config = ConfigDict(from_attributes=True)
+
+class EmployeeWithAvailabilities(Employee):
+    """Empleado con sus disponibilidades dentro de una ventana de fechas (opt-in)."""
     availabilities: list[DailyAvailability] = []
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class EmployeeTermination(BaseModel):
+    # Retiro masivo: desactiva los empleados y borra sus disponibilidades posteriores a la fecha
+    employee_ids: list[int] = Field(..., min_length=1, max_length=1000)
+    termination_date: date
+    reason_for_termination: str | None = None
+
+class EmployeeTerminationResult(BaseModel):
+    terminated_ids: list[int]
+    # Ya estaban retirados: no se modifican
+    already_inactive_ids: list[int]
+    not_found_ids: list[int]
+    removed_availabilities: int
+
+MAX_LOOKUP_KEYS = 500
+
+class EmployeeLookup(BaseModel):
+    # Búsqueda por lotes para otros servicios: ids y/o números de documento
+    ids: list[int] = Field(default_factory=list, max_length=MAX_LOOKUP_KEYS)
+    document_numbers: list[str] = Field(default_factory=list, max_length=MAX_LOOKUP_KEYS)
+
+    @model_validator(mode="after")
+    def check_keys(self):
+        total = len(self.ids) + len(self.document_numbers)
+        if total == 0:
+            raise ValueError("Provide at least one id or document number")
+        if total > MAX_LOOKUP_KEYS:
+            raise ValueError(f"At most {MAX_LOOKUP_KEYS} ids and document numbers per request")
+        return self
+
+class EmployeeLookupResult(BaseModel):
+    # Empleados encontrados en el orden de la petición (primero por id, luego por documento)
+    employees: list[Employee]
+    not_found_ids: list[int]
+    not_found_document_numbers: list[str]
+
+class EmployeeListItem(BaseModel):
+    """
+    Todos los campos que se pueden pedir con `fields=` en el listado de empleados.
+    Los *_name son los nombres de los catálogos, resueltos con JOIN en la misma consulta.
+    """
+    id: int
+    document_number: str
+    full_name: str
+    birth_date: date
+    hire_date: date
+    address: str | None = None
+    phone_number: str | None = None
+    personal_email: str | None = None
+    emergency_contact_name: str | None = None
+    emergency_contact_phone: str | None = None
+    emergency_contact_relation: str | None = None
+    document_type_id: int
+    gender_id: int
+    operational_role_id: int
+    identity_document_path: str | None = None
+    is_active: bool
+    termination_date: date | None = None
+    reason_for_termination: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    document_type_name: str
+    gender_name: str
+    operational_role_name: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+@lru_cache(maxsize=256)
+def employee_fields_schema(fields: tuple[str, ...]) -> type[BaseModel]:
+    """Esquema reducido con solo los campos pedidos, uno por combinación (en el orden de EmployeeListItem)."""
+    return create_model(
+        "EmployeeFields",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (EmployeeListItem.model_fields[name].annotation, ...)
+            for name in fields
+        },
+    )
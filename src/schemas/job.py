@@ -0,0 +1,64 @@
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
+from datetime import date, datetime
+from typing import Any, Literal
+
+MAX_SCHEDULE_DAYS = 366
+
+class Job(BaseModel):
+    id: int
+    job_type: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    params: dict[str, Any]
+    created_by: str | None = None
+    progress_done: int
+    progress_total: int | None = None
+    progress_message: str | None = None
+    cancel_requested: bool
+    # Resultado JSON del trabajo; los que generan un archivo se descargan en /jobs/{id}/result
+    result: dict[str, Any] | None = None
+    result_path: str | None = Field(default=None, exclude=True)
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def has_result_file(self) -> bool:
+        return self.result_path is not None
+
+class AvailabilityExportParams(BaseModel):
+    # Exporta a CSV el reporte detallado de disponibilidades del rango
+    start_date: date
+    end_date: date
+    employee_id: int | None = None
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.start_date > self.end_date:
+            raise ValueError("Start date cannot be after end date.")
+        return self
+
+class AvailabilityScheduleParams(BaseModel):
+    # Crea la disponibilidad de cada día del rango para los empleados activos
+    # (todos, los de un rol o los indicados); los días que ya tienen registro no se tocan.
+    start_date: date
+    end_date: date
+    status_id: int
+    notes: str | None = None
+    role_id: int | None = None
+    employee_ids: list[int] | None = Field(default=None, min_length=1, max_length=1000)
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.start_date > self.end_date:
+            raise ValueError("Start date cannot be after end date.")
+        if (self.end_date - self.start_date).days >= MAX_SCHEDULE_DAYS:
+            raise ValueError(f"At most {MAX_SCHEDULE_DAYS} days per schedule")
+        return self
+
+class AvailabilityArchiveParams(BaseModel):
+    # Sin fecha de corte se usa la retención configurada (AVAILABILITY_HOT_RETENTION_DAYS)
+    cutoff: date | None = None
@@ -24,4 +24,12 @@ class AvailabilityStatus(ParametricBase):
     model_config = ConfigDict(from_attributes=True)
 
 class OperationalRoleWithCount(OperationalRole):
-    employee_count: int
\ No newline at end of file
+    employee_count: int
+    active_employee_count: int
+
+class ParametricCatalogs(BaseModel):
+    """Todos los catálogos paramétricos en una sola respuesta."""
+    document_types: list[DocumentType]
+    genders: list[Gender]
+    operational_roles: list[OperationalRole]
+    availability_statuses: list[AvailabilityStatus]
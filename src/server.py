@@ -0,0 +1,72 @@
+import argparse
+import logging
+import os
+import shutil
+
+import uvicorn
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def reset_multiprocess_dir() -> None:
+    """
+    Vacía PROMETHEUS_MULTIPROC_DIR antes de arrancar los workers: los archivos de una
+    ejecución anterior sumarían contadores de procesos que ya no existen.
+    """
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    # Se borra el contenido y no el directorio, que puede ser un volumen montado
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+def run_server(workers: int, max_requests: int) -> None:
+    """
+    Arranca la API con varios procesos de uvicorn detrás del mismo socket.
+    - Cada worker corre el lifespan (engine, trazas, precalentamiento) antes de aceptar peticiones.
+    - Con max_requests > 0 un worker se reinicia tras atender esa cantidad (libera memoria
+      fragmentada); el supervisor de uvicorn levanta otro en su lugar. Con un solo
+      worker no hay supervisor: el proceso termina y lo reinicia el orquestador.
+    - Ante SIGTERM se dejan de aceptar conexiones y se esperan las peticiones en curso
+      hasta SERVER_GRACEFUL_SHUTDOWN_SECONDS.
+    - Con varios workers el stream SSE necesita el backend postgres: con "memory" cada
+      cliente vería solo los cambios atendidos por su propio worker. Se cambia aquí, por
+      variable de entorno, que los workers heredan y tiene prioridad sobre el .env.
+    La app se pasa como "main:app" para que cada worker la importe en su propio proceso.
+    """
+    if workers > 1 and settings.AVAILABILITY_EVENTS_BACKEND == "memory":
+        logger.warning(
+            "AVAILABILITY_EVENTS_BACKEND=memory cannot fan out events across %s workers; using postgres",
+            workers,
+        )
+        os.environ["AVAILABILITY_EVENTS_BACKEND"] = "postgres"
+    reset_multiprocess_dir()
+    uvicorn.run(
+        "main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        limit_max_requests=max_requests or None,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        # Detrás del balanceador: IP real del cliente desde X-Forwarded-For, solo si
+        # la conexión viene de un proxy de SERVER_FORWARDED_ALLOW_IPS
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        # setup_logging (en main) configura los loggers de uvicorn en cada worker
+        log_config=None,
+    )
+
+# Punto de entrada: python -m server [--workers N] [--max-requests N]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arranca la API en producción con varios workers.")
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS or os.cpu_count() or 1)
+    parser.add_argument("--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS, help="Peticiones por worker antes de reciclarlo (0 = nunca).")
+    args = parser.parse_args()
+    run_server(workers=args.workers, max_requests=args.max_requests)
@@ -1,8 +1,13 @@
 from .employee import employee_service
 from .dailyAvailability import availability_service
+from .availabilityArchive import availability_archive_service
 from .parametric import (
     document_type_service,
     gender_service,
     operational_role_service,
-    availability_status_service
-)
\ No newline at end of file
+    availability_status_service,
+    parametric_catalog_service
+)
+from .changeFeed import change_feed_service
+from .outbox import outbox_service
+from .jobs import job_service
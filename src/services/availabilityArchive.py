@@ -0,0 +1,146 @@
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from datetime import date, timedelta
+from typing import Callable, Optional
+from models import DailyAvailability, Employee, AvailabilityStatus
+from repositories import availability_repo, availability_archive_repo
+from repositories.availabilityArchive import AvailabilityArchiveRepository
+from core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AvailabilityArchiveService:
+    def __init__(self, archive: AvailabilityArchiveRepository, retention_days: int):
+        """
+        Servicio que mueve el histórico de disponibilidades a almacenamiento frío
+        y lo vuelve a leer cuando una consulta llega más atrás de la fecha de corte.
+        :param archive: Repositorio de archivos Parquet mensuales
+        :param retention_days: Días que se conservan en la tabla caliente
+        """
+        self.archive = archive
+        self.retention_days = retention_days
+
+    def get_cutoff(self, today: Optional[date] = None) -> date:
+        """
+        Fecha de corte: primer día del mes que contiene (hoy - retención).
+        Así solo se archivan meses completos.
+        """
+        today = today or date.today()
+        return (today - timedelta(days=self.retention_days)).replace(day=1)
+
+    def archive_older_than(
+        self,
+        db: Session,
+        cutoff: Optional[date] = None,
+        on_month: Optional[Callable[[int, int], None]] = None,
+    ) -> dict[str, int]:
+        """
+        Archiva, mes a mes, las disponibilidades anteriores a la fecha de corte.
+        Cada mes se elimina con DELETE ... RETURNING, las filas devueltas se escriben
+        en disco y solo entonces se confirma la transacción: lo que sale de la tabla es
+        exactamente lo archivado, aunque haya escrituras concurrentes sobre el mes.
+        :param on_month: Se llama tras confirmar cada mes con (meses archivados, total de meses);
+            si lanza una excepción, los meses ya confirmados se conservan
+        Retorna el número de filas archivadas por mes ("YYYY-MM").
+        """
+        cutoff = cutoff or self.get_cutoff()
+        logger.info("Archiving availabilities before %s", cutoff)
+        archived: dict[str, int] = {}
+        months = list(availability_repo.get_months_before(db, cutoff=cutoff))
+        for month_start in months:
+            next_month = (month_start + timedelta(days=32)).replace(day=1)
+            month_end = min(next_month, cutoff)
+            try:
+                written = self.archive.write_month(
+                    month_start.year,
+                    month_start.month,
+                    availability_repo.delete_in_range_returning(db, start_date=month_start, end_date=month_end),
+                )
+            except Exception:
+                db.rollback()
+                raise
+            # El archivo ya está en disco: recién ahora se confirma el borrado
+            db.commit()
+            archived[f"{month_start:%Y-%m}"] = written
+            logger.info("Archived %s availabilities for %s", written, f"{month_start:%Y-%m}")
+            if on_month is not None:
+                on_month(len(archived), len(months))
+        return archived
+
+    def covers(self, start_date: date) -> bool:
+        """Indica si una consulta que empieza en start_date debe leer el archivo."""
+        last_archived = self.archive.last_archived_date()
+        return last_archived is not None and start_date <= last_archived
+
+    def get_by_date_range(
+        self, db: Session, start_date: date, end_date: date, employee_id: Optional[int] = None
+    ) -> list[DailyAvailability]:
+        """Disponibilidades archivadas en el rango, con empleado y estado cargados."""
+        rows = self.archive.read(start_date=start_date, end_date=end_date, employee_id=employee_id)
+        return self._hydrate(db, rows)
+
+    def get_by_employee(
+        self,
+        db: Session,
+        employee_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> tuple[list[DailyAvailability], int]:
+        """
+        Página de las disponibilidades archivadas de un empleado en el rango (abierto si
+        no se da), ordenadas por fecha, y el total archivado del empleado en ese rango.
+        Si el rango empieza después de lo archivado no se toca el archivo.
+        """
+        last_archived = self.archive.last_archived_date()
+        if last_archived is None or (start_date is not None and start_date > last_archived):
+            return [], 0
+        end_date = last_archived if end_date is None else min(end_date, last_archived)
+        rows, total = self.archive.read_employee_page(
+            employee_id, skip=skip, limit=limit, start_date=start_date, end_date=end_date
+        )
+        return self._hydrate(db, rows), total
+
+    def _hydrate(self, db: Session, rows: list[dict]) -> list[DailyAvailability]:
+        """
+        Convierte filas archivadas en objetos DailyAvailability transitorios
+        (nunca se agregan a la sesión). Empleados y estados se cargan con una
+        consulta cada uno; las filas de empleados ya eliminados, o cuyo estado ya no
+        existe en el catálogo, se omiten.
+        """
+        if not rows:
+            return []
+        employee_ids = {row["employee_id"] for row in rows}
+        status_ids = {row["status_id"] for row in rows}
+        employees = {
+            employee.id: employee
+            for employee in db.query(Employee)
+            .options(joinedload(Employee.operational_role))
+            .filter(Employee.id.in_(employee_ids))
+        }
+        statuses = {
+            status.id: status
+            for status in db.query(AvailabilityStatus).filter(AvailabilityStatus.id.in_(status_ids))
+        }
+
+        availabilities = []
+        for row in rows:
+            employee = employees.get(row["employee_id"])
+            if employee is None:
+                continue
+            status = statuses.get(row["status_id"])
+            if status is None:
+                logger.warning("Skipping archived availability %s: status %s no longer exists", row["id"], row["status_id"])
+                continue
+            availability = DailyAvailability(**row)
+            set_committed_value(availability, "employee", employee)
+            set_committed_value(availability, "status", status)
+            availabilities.append(availability)
+        return availabilities
+
+
+availability_archive_service = AvailabilityArchiveService(
+    availability_archive_repo, retention_days=settings.AVAILABILITY_HOT_RETENTION_DAYS
+)
@@ -0,0 +1,186 @@
+import select
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import func, select as sql_select
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models import DailyAvailability
+from utils.eventHub import Event, EventHub
+import logging
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "availability_events"
+# Eventos del backend memory que esperan el commit de la sesión (en Session.info)
+_PENDING_EVENTS = "availability_events"
+# Empleados por evento agregado: el payload de NOTIFY no puede pasar de 8000 bytes
+BULK_EVENT_MAX_EMPLOYEES = 200
+
+
+class PostgresEventListener:
+    def __init__(self, hub: EventHub, channel: str):
+        """
+        Hilo que escucha LISTEN/NOTIFY y reenvía los eventos al hub local.
+        Así todos los workers ven los eventos publicados por cualquiera de ellos,
+        en el mismo orden (el de confirmación de las transacciones).
+        """
+        self.hub = hub
+        self.channel = channel
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="availability-events-listener", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        import psycopg2
+        from db.session import engine
+
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            connection = None
+            try:
+                connection = psycopg2.connect(dsn)
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                logger.info("Listening for availability events on channel %s", self.channel)
+                while True:
+                    if select.select([connection], [], [], 5.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self.hub.dispatch(Event.from_json(notify.payload))
+            except Exception:
+                logger.exception("Availability events listener failed, reconnecting")
+                if connection is not None:
+                    connection.close()
+                time.sleep(2)
+
+
+class AvailabilityEventService:
+    def __init__(self, hub: EventHub, backend: str):
+        """
+        Publica los cambios de disponibilidades para el stream SSE.
+        :param backend: "memory" (un solo proceso) o "postgres" (NOTIFY entre workers)
+        """
+        self.hub = hub
+        self.backend = backend
+        self.listener = PostgresEventListener(hub, NOTIFY_CHANNEL) if backend == "postgres" else None
+
+    def _availability_payload(self, availability: DailyAvailability) -> dict:
+        return {
+            "id": availability.id,
+            "employee_id": availability.employee_id,
+            "date": availability.date.isoformat(),
+            "status_id": availability.status_id,
+            "operational_role_id": availability.employee.operational_role_id,
+        }
+
+    def publish(self, db: Session, *events: Event) -> None:
+        """
+        Publica los eventos de un cambio en la transacción de `db` que lo hace: se llama
+        antes del commit y salen solo si se confirma.
+        - postgres: pg_notify en esa misma transacción (PostgreSQL lo entrega al confirmar)
+          y llega a todos los workers, incluido este, por el listener.
+        - memory: se entregan al hub local después del commit; con rollback se descartan.
+        """
+        if not events:
+            return
+        if self.backend == "postgres":
+            for event in events:
+                db.execute(sql_select(func.pg_notify(NOTIFY_CHANNEL, event.to_json())))
+        else:
+            db.info.setdefault(_PENDING_EVENTS, []).extend(events)
+
+    def availability_created(self, db: Session, availability: DailyAvailability) -> None:
+        self.publish(db, Event("availability.created", self._availability_payload(availability)))
+
+    def availability_updated(self, db: Session, availability: DailyAvailability) -> None:
+        self.publish(db, Event("availability.updated", self._availability_payload(availability)))
+
+    def availabilities_scheduled(
+        self, db: Session, *, start_date, end_date, status_id: int, roles: dict[int, int], count: int
+    ) -> None:
+        """
+        Un solo evento (availability.bulk_created) por grupo de disponibilidades creadas
+        en bloque, en vez de uno por fila: un grupo llega a miles de filas y cada evento
+        es un NOTIFY. Trae el rango, el estado y los empleados ({id: rol}); los clientes
+        recargan ese rango con GET /availabilities.
+        Lo publica el worker de trabajos, otro proceso: solo llega al stream con el
+        backend postgres.
+        """
+        self.publish(db, Event("availability.bulk_created", {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "status_id": status_id,
+            "count": count,
+            "employee_ids": sorted(roles),
+            "operational_role_ids": sorted(set(roles.values())),
+        }))
+
+    def availability_deleted(self, db: Session, deleted: dict) -> None:
+        """Trae id, employee_id, date y operational_role_id de la disponibilidad eliminada."""
+        self.publish(db, Event("availability.deleted", {**deleted, "date": deleted["date"].isoformat()}))
+
+    def availabilities_terminated(self, db: Session, *, start_date, removed: list[dict], roles: dict[int, int]) -> None:
+        """
+        Eventos availability.bulk_deleted de un retiro masivo: uno por cada grupo de hasta
+        BULK_EVENT_MAX_EMPLOYEES empleados, en vez de uno por fila eliminada (un retiro
+        borra miles y cada evento es un NOTIFY). Cada uno trae el rango borrado, la cantidad
+        y los empleados y roles afectados; los clientes recargan ese rango.
+        :param removed: Disponibilidades eliminadas (employee_id y date)
+        :param roles: {id de empleado: id de rol} de los empleados retirados
+        """
+        by_employee: dict[int, list] = {}
+        for row in removed:
+            by_employee.setdefault(row["employee_id"], []).append(row["date"])
+        employee_ids = sorted(by_employee)
+        events = []
+        for start in range(0, len(employee_ids), BULK_EVENT_MAX_EMPLOYEES):
+            chunk = employee_ids[start : start + BULK_EVENT_MAX_EMPLOYEES]
+            events.append(Event("availability.bulk_deleted", {
+                "start_date": start_date.isoformat(),
+                "end_date": max(max(by_employee[employee_id]) for employee_id in chunk).isoformat(),
+                "count": sum(len(by_employee[employee_id]) for employee_id in chunk),
+                "employee_ids": chunk,
+                "operational_role_ids": sorted({roles[employee_id] for employee_id in chunk}),
+            }))
+        self.publish(db, *events)
+
+    def employee_removed(self, db: Session, *, employee_id: int, operational_role_id: int) -> None:
+        """El empleado se eliminó y la base de datos borró en cascada todas sus disponibilidades."""
+        self.publish(db, Event("employee.removed", {
+            "employee_id": employee_id,
+            "operational_role_id": operational_role_id,
+        }))
+
+    def subscribe(self, predicate, last_event_id: Optional[str] = None):
+        if self.listener is not None:
+            self.listener.ensure_started()
+        return self.hub.subscribe(predicate, last_event_id=last_event_id)
+
+
+availability_event_hub = EventHub(buffer_size=settings.AVAILABILITY_EVENTS_BUFFER_SIZE)
+availability_event_service = AvailabilityEventService(
+    availability_event_hub, backend=settings.AVAILABILITY_EVENTS_BACKEND
+)
+
+
+@listens_for(Session, "after_commit")
+def _dispatch_pending_events(session: Session) -> None:
+    for event in session.info.pop(_PENDING_EVENTS, ()):
+        availability_event_service.hub.dispatch(event)
+
+
+@listens_for(Session, "after_soft_rollback")
+def _discard_pending_events(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_EVENTS, None)
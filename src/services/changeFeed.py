@@ -0,0 +1,70 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from schemas import Change, ChangeFeed
+from repositories import change_log_repo
+from utils.exceptions import ExpiredCursorError
+import logging
+
+logger = logging.getLogger(__name__)
+
+START_CURSOR = (0, 0)
+
+class ChangeFeedService:
+
+    def encode_cursor(self, position: tuple[int, int]) -> str:
+        tx_id, seq = position
+        return f"{tx_id}-{seq}"
+
+    def decode_cursor(self, cursor: Optional[str]) -> tuple[int, int]:
+        """
+        Traduce el cursor opaco a (tx_id, id). Sin cursor se empieza desde el inicio.
+        Lanza ValueError si el cursor no es válido.
+        """
+        if not cursor:
+            return START_CURSOR
+        tx_id, sep, seq = cursor.partition("-")
+        if not sep or not tx_id.isdigit() or not seq.isdigit():
+            raise ValueError(f"Invalid change cursor: {cursor!r}")
+        return int(tx_id), int(seq)
+
+    def get_changes(self, db: Session, since: Optional[str] = None, limit: int = 500) -> ChangeFeed:
+        """
+        Retorna el siguiente lote de cambios después de `since` y el cursor para continuar.
+        El costo depende del número de cambios, no del tamaño de las tablas.
+        Lanza ValueError si el cursor no es válido y ExpiredCursorError si es anterior
+        al cambio más antiguo que se conserva (ver CHANGE_LOG_RETENTION_DAYS).
+        """
+        after = self.decode_cursor(since)
+        logger.info("Getting changes after %s (limit %s)", after, limit)
+        oldest_tx_id = change_log_repo.get_oldest_tx_id(db) if since else None
+        if oldest_tx_id is not None and after[0] < oldest_tx_id:
+            raise ExpiredCursorError(f"Change cursor {since!r} is older than the oldest kept change")
+        rows = change_log_repo.get_batch(db, after=after, limit=limit + 1)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        position = (rows[-1].tx_id, rows[-1].id) if rows else after
+        return ChangeFeed(
+            changes=[
+                Change(
+                    seq=row.id,
+                    entity=row.entity,
+                    entity_id=row.entity_id,
+                    operation=row.operation,
+                    changed_at=row.changed_at,
+                    data=row.data,
+                )
+                for row in rows
+            ],
+            next_cursor=self.encode_cursor(position),
+            has_more=has_more,
+        )
+
+    def get_head_cursor(self, db: Session) -> str:
+        """
+        Cursor del último cambio visible. Un cliente nuevo lo toma antes de la
+        descarga completa inicial y luego sigue el feed desde ahí.
+        """
+        return self.encode_cursor(change_log_repo.get_head(db) or START_CURSOR)
+
+change_feed_service = ChangeFeedService()
@@ -1,35 +1,87 @@
-from sqlalchemy.orm import Session
+import heapq
+from sqlalchemy.orm import Session, joinedload
 from datetime import date
+from typing import Iterator, Optional
 from models import DailyAvailability
 from schemas import DailyAvailabilityCreate, DailyAvailabilityUpdate
 from repositories import availability_repo, employee_repo
+from services.availabilityArchive import availability_archive_service
+from services.availabilityEvents import availability_event_service
+from services.parametric import availability_status_service
+from services.parametricCache import parametric_cache
+from utils.conditional import Validators, make_validators
 from utils.exceptions import RecordNotFoundError, DuplicateRecordError
 import logging
+
+logger = logging.getLogger(__name__)
+
 class DailyAvailabilityService:
     def get_availability(self, db: Session, availability_id: int) -> DailyAvailability:
         """
         Obtiene un registro de disponibilidad por su ID.
         Lanza RecordNotFoundError si no existe.
         """
-        logging.info(f"Getting availability: {availability_id}")
+        logger.info("Getting availability: %s", availability_id)
         availability = availability_repo.get(db, id=availability_id)
         if not availability:
-            logging.error(f"Availability record with id {availability_id} not found.")
+            logger.error("Availability record with id %s not found.", availability_id)
             raise RecordNotFoundError(f"Availability record with id {availability_id} not found.")
         return availability
 
     def get_availabilities_by_employee(
-        self, db: Session, employee_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        employee_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
     ) -> list[DailyAvailability]:
-        """Obtiene todos los registros de disponibilidad para un empleado específico."""
-        # Nota: Este método podría vivir en el repositorio para una consulta más optimizada.
-        # Por ahora, lo mantenemos simple.
-        logging.info(f"Getting availabilities by employee: {employee_id}, {skip}, {limit}")
+        """
+        Obtiene los registros de disponibilidad de un empleado, ordenados por fecha,
+        opcionalmente dentro de un rango. Los registros archivados (siempre más antiguos)
+        van antes que los de la tabla; el archivo solo se lee si el rango lo alcanza.
+        """
+        logger.info("Getting availabilities by employee: %s, %s, %s", employee_id, skip, limit)
+        if start_date is not None and end_date is not None and start_date > end_date:
+            logger.error("Start date cannot be after end date: %s, %s", start_date, end_date)
+            raise ValueError("Start date cannot be after end date.")
         employee = employee_repo.get(db, id=employee_id)
         if not employee:
-            logging.error(f"Employee with id {employee_id} not found.")
+            logger.error("Employee with id %s not found.", employee_id)
             raise RecordNotFoundError(f"Employee with id {employee_id} not found.")
-        return employee.availabilities[skip : skip + limit]
+
+        page, archived_total = availability_archive_service.get_by_employee(
+            db, employee_id, skip=skip, limit=limit, start_date=start_date, end_date=end_date
+        )
+        remaining = limit - len(page)
+        if remaining > 0:
+            page += availability_repo.get_by_employee(
+                db,
+                employee_id=employee_id,
+                skip=max(skip - archived_total, 0),
+                limit=remaining,
+                start_date=start_date,
+                end_date=end_date,
+            )
+        return page
+
+    def get_availabilities_by_employee_validators(
+        self,
+        db: Session,
+        employee_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Validators:
+        """Calcula el ETag del listado de disponibilidades de un empleado sin cargarlas."""
+        version = availability_repo.get_employee_version(db, employee_id=employee_id)
+        return make_validators(
+            "employee-availabilities", employee_id, skip, limit, start_date, end_date, *version,
+            availability_archive_service.archive.last_archived_date(),
+            parametric_cache.get(db).etag,
+        )
 
     def create_availability(self, db: Session, availability_in: DailyAvailabilityCreate) -> DailyAvailability:
         """
@@ -38,40 +90,96 @@ class DailyAvailabilityService:
         Valida que no exista ya un registro para esa fecha y empleado.
         """
         # Regla de Negocio 1: Validar que el empleado exista y esté activo.
-        logging.info(f"Creating availability: {availability_in}")
+        logger.info("Creating availability for employee %s on %s", availability_in.employee_id, availability_in.date)
         employee = employee_repo.get(db, id=availability_in.employee_id)
         if not employee:
-            logging.error(f"Employee with id {availability_in.employee_id} not found.")
+            logger.error("Employee with id %s not found.", availability_in.employee_id)
             raise RecordNotFoundError(f"Employee with id {availability_in.employee_id} not found.")
         if not employee.is_active:
-            logging.error(f"Cannot register availability for inactive employee {employee.full_name}.")
+            logger.error("Cannot register availability for inactive employee %s.", employee.id)
             raise ValueError(f"Cannot register availability for inactive employee {employee.full_name}.")
 
         # Regla de Negocio 2: Validar que la fecha no sea en el pasado.
         if availability_in.date < date.today():
-            logging.error(f"Cannot register availability for a past date: {availability_in.date}")
+            logger.error("Cannot register availability for a past date: %s", availability_in.date)
             raise ValueError("Cannot register availability for a past date.")
             
-        # Regla de Negocio 3: Evitar duplicados.
+        # Regla de Negocio 3: El estado debe existir (se resuelve desde la caché paramétrica).
+        availability_status_service.get_by_id(db, availability_in.status_id)
+            
+        # Regla de Negocio 4: Evitar duplicados.
         existing_availability = availability_repo.get_by_employee_and_date(
             db, employee_id=availability_in.employee_id, target_date=availability_in.date
         )
         if existing_availability:
-            logging.error(f"Availability for this employee on {availability_in.date} already exists.")
+            logger.error("Availability for this employee on %s already exists.", availability_in.date)
             raise DuplicateRecordError(f"Availability for this employee on {availability_in.date} already exists.")
 
-        return availability_repo.create(db, obj_in=availability_in)
+        availability = availability_repo.create(db, obj_in=availability_in, commit=False)
+        availability_event_service.availability_created(db, availability)
+        db.commit()
+        db.refresh(availability)
+        return availability
 
     def update_availability(
         self, db: Session, availability_id: int, availability_in: DailyAvailabilityUpdate
     ) -> DailyAvailability:
         """Actualiza un registro de disponibilidad."""
-        logging.info(f"Updating availability: {availability_id}")
+        logger.info("Updating availability: %s", availability_id)
         db_availability = self.get_availability(db, availability_id)
-        return availability_repo.update(db, db_obj=db_availability, obj_in=availability_in)
+        if availability_in.status_id is not None:
+            availability_status_service.get_by_id(db, availability_in.status_id)
+        availability = availability_repo.update(db, db_obj=db_availability, obj_in=availability_in, commit=False)
+        availability_event_service.availability_updated(db, availability)
+        db.commit()
+        db.refresh(availability)
+        return availability
+
+    def delete_availability(self, db: Session, availability_id: int) -> DailyAvailability:
+        """
+        Elimina un registro de disponibilidad.
+        Lanza RecordNotFoundError si no existe.
+        """
+        logger.info("Deleting availability: %s", availability_id)
+        availability = availability_repo.remove(
+            db, id=availability_id, options=lambda query: query.options(
+                joinedload(DailyAvailability.status), joinedload(DailyAvailability.employee)
+            ), commit=False
+        )
+        if not availability:
+            logger.error("Availability record with id %s not found.", availability_id)
+            raise RecordNotFoundError(f"Availability record with id {availability_id} not found.")
+        availability_event_service.availability_deleted(db, {
+            "id": availability.id,
+            "employee_id": availability.employee_id,
+            "date": availability.date,
+            "operational_role_id": availability.employee.operational_role_id,
+        })
+        db.commit()
+        return availability
 
     from typing import Optional
 
+    def get_detailed_availabilities_validators(
+        self,
+        db: Session,
+        start_date: date,
+        end_date: date,
+        employee_id: Optional[int] = None
+    ) -> Validators:
+        """Calcula el ETag del reporte por rango de fechas con una consulta de versión."""
+        if start_date > end_date:
+            logger.error("Start date cannot be after end date: %s, %s", start_date, end_date)
+            raise ValueError("Start date cannot be after end date.")
+        version = availability_repo.get_range_version(
+            db, start_date=start_date, end_date=end_date, employee_id=employee_id
+        )
+        return make_validators(
+            "availabilities", start_date, end_date, employee_id, *version,
+            availability_archive_service.archive.last_archived_date(),
+            parametric_cache.get(db).etag,
+        )
+
     def get_detailed_availabilities(
         self, 
         db: Session, 
@@ -80,13 +188,62 @@ class DailyAvailabilityService:
         employee_id: Optional[int] = None
     ) -> list[DailyAvailability]:
         """Obtiene una lista detallada de disponibilidades por rango de fecha y opcionalmente por empleado."""
-        logging.info(f"Getting detailed availabilities: {start_date}, {end_date}, {employee_id}")
+        logger.info("Getting detailed availabilities: %s, %s, %s", start_date, end_date, employee_id)
         if start_date > end_date:
-            logging.error(f"Start date cannot be after end date: {start_date}, {end_date}")
+            logger.error("Start date cannot be after end date: %s, %s", start_date, end_date)
             raise ValueError("Start date cannot be after end date.")
-        return availability_repo.get_by_date_range(
+        availabilities = availability_repo.get_by_date_range(
             db, start_date=start_date, end_date=end_date, employee_id=employee_id
         )
+        if availability_archive_service.covers(start_date):
+            archived = availability_archive_service.get_by_date_range(
+                db, start_date=start_date, end_date=end_date, employee_id=employee_id
+            )
+            availabilities = sorted(
+                archived + availabilities, key=lambda a: (a.date, a.employee.full_name)
+            )
+        return availabilities
+
+
+    def iter_detailed_rows(
+        self,
+        db: Session,
+        start_date: date,
+        end_date: date,
+        employee_id: Optional[int] = None
+    ) -> tuple[int, Iterator[tuple]]:
+        """
+        Lo mismo que get_detailed_availabilities, como filas planas para exportar
+        (ver DailyAvailabilityRepository.iter_report_rows): la tabla se recorre con un
+        cursor del servidor y lo archivado del rango se intercala por fecha.
+        Retorna (cantidad estimada al empezar, filas).
+        """
+        logger.info("Streaming detailed availabilities: %s, %s, %s", start_date, end_date, employee_id)
+        if start_date > end_date:
+            logger.error("Start date cannot be after end date: %s, %s", start_date, end_date)
+            raise ValueError("Start date cannot be after end date.")
+        total = availability_repo.count_in_range(db, start_date=start_date, end_date=end_date, employee_id=employee_id)
+        rows = availability_repo.iter_report_rows(db, start_date=start_date, end_date=end_date, employee_id=employee_id)
+        if availability_archive_service.covers(start_date):
+            archived = [
+                (
+                    availability.id,
+                    availability.date,
+                    availability.employee_id,
+                    availability.employee.full_name,
+                    availability.employee.operational_role.name,
+                    availability.status.name,
+                    availability.notes,
+                )
+                for availability in availability_archive_service.get_by_date_range(
+                    db, start_date=start_date, end_date=end_date, employee_id=employee_id
+                )
+            ]
+            total += len(archived)
+            # Mismo orden que la consulta caliente, (date, full_name): el archivo viene por (date, id)
+            archived.sort(key=lambda row: (row[1], row[3]))
+            rows = heapq.merge(archived, rows, key=lambda row: (row[1], row[3]))
+        return total, rows
 
 
 availability_service = DailyAvailabilityService()
\ No newline at end of file
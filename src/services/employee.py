@@ -1,34 +1,123 @@
 # app/services/employee.py
 
-from sqlalchemy.orm import Session, joinedload
-from models import Employee
-from schemas import EmployeeCreate, EmployeeUpdate
+from sqlalchemy.orm import Session, joinedload, selectinload
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+from core.config import settings
+from models import Employee, DailyAvailability
+from schemas import EmployeeCreate, EmployeeUpdate, EmployeeTermination, EmployeeTerminationResult, EmployeeLookup
 from repositories import employee_repo
+from services.availabilityEvents import availability_event_service
+from services.outbox import outbox_service
+from services.parametric import document_type_service, gender_service, operational_role_service
+from services.parametricCache import parametric_cache
+from utils.conditional import Validators, make_validators
 from utils.exceptions import RecordNotFoundError, DuplicateRecordError
 import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class EmployeeTotal:
+    """Total de empleados que cumplen los filtros de un listado (exacto o estimado)."""
+    count: int
+    estimated: bool = False
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"X-Total-Count": str(self.count)}
+        if self.estimated:
+            headers["X-Total-Count-Estimated"] = "true"
+        return headers
+
+
 class EmployeeService:
-    def get_employee(self, db: Session, employee_id: int) -> Employee:
+    def _validate_parametric_ids(self, db: Session, data: dict) -> None:
+        """
+        Valida contra la caché paramétrica que los ids referenciados existan
+        (sin SQL salvo que un id falte en la caché, ver ParametricService.get_by_id).
+        Lanza RecordNotFoundError si alguno no existe.
+        """
+        for field, service in (
+            ("document_type_id", document_type_service),
+            ("gender_id", gender_service),
+            ("operational_role_id", operational_role_service),
+        ):
+            if data.get(field) is not None:
+                service.get_by_id(db, data[field])
+
+    def _availability_range(self, window_days: int) -> tuple[date, date]:
+        """Rango [hoy - ventana, hoy + ventana] para las disponibilidades anidadas."""
+        today = date.today()
+        return today - timedelta(days=window_days), today + timedelta(days=window_days)
+
+    def get_employee(
+        self, db: Session, employee_id: int, availability_window_days: Optional[int] = None
+    ) -> Employee:
         """
         Obtiene un empleado por su ID.
+        Si se indica una ventana en días, carga también sus disponibilidades en
+        [hoy - ventana, hoy + ventana] (con su estado) en una sola consulta adicional.
         Lanza RecordNotFoundError si no existe.
         """
-        logging.info(f"Getting employee: {employee_id}")
+        logger.info("Getting employee: %s", employee_id)
+        load_options = [
+            joinedload(Employee.document_type),
+            joinedload(Employee.gender),
+            joinedload(Employee.operational_role),
+        ]
+        if availability_window_days is not None:
+            start_date, end_date = self._availability_range(availability_window_days)
+            load_options.append(
+                selectinload(
+                    Employee.availabilities.and_(DailyAvailability.date.between(start_date, end_date))
+                ).joinedload(DailyAvailability.status)
+            )
         employee = employee_repo.get(
             db, 
             id=employee_id,
-            options=lambda query: query.options(
-                joinedload(Employee.document_type),
-                joinedload(Employee.gender),
-                joinedload(Employee.operational_role)
-            )
+            options=lambda query: query.options(*load_options)
         )
         if not employee:
-            logging.error(f"Employee with id {employee_id} not found.")
+            logger.error("Employee with id %s not found.", employee_id)
             raise RecordNotFoundError(f"Employee with id {employee_id} not found.")
         return employee
 
     from typing import Optional
 
+    def _total_before_page(
+        self, db: Session, search: Optional[str], role_id: Optional[int], is_active: Optional[bool]
+    ) -> Optional[EmployeeTotal]:
+        """
+        Total que se resuelve sin recorrer el conjunto filtrado, o None si conviene
+        contarlo con count(*) OVER () en la consulta de la página:
+        - Sin búsqueda: exacto, de los contadores por rol (operational_role_employee_counts).
+        - Con búsqueda y más de EMPLOYEE_EXACT_COUNT_LIMIT filas estimadas: la estimación.
+        """
+        if not search:
+            return EmployeeTotal(employee_repo.count_from_role_counts(db, role_id=role_id, is_active=is_active))
+        estimate = employee_repo.estimate_count(db, search=search, role_id=role_id, is_active=is_active)
+        if estimate > settings.EMPLOYEE_EXACT_COUNT_LIMIT:
+            return EmployeeTotal(estimate, estimated=True)
+        return None
+
+    def _total_after_page(
+        self,
+        db: Session,
+        window_total: Optional[int],
+        search: Optional[str],
+        role_id: Optional[int],
+        is_active: Optional[bool],
+        skip: int,
+    ) -> EmployeeTotal:
+        if window_total is not None:
+            return EmployeeTotal(window_total)
+        if skip == 0:
+            return EmployeeTotal(0)
+        # Página más allá del final: no hubo fila con el total, pero el conjunto es pequeño
+        return EmployeeTotal(employee_repo.count(db, search=search, role_id=role_id, is_active=is_active))
+
     def get_all_employees(
         self, 
         db: Session, 
@@ -37,16 +126,108 @@ class EmployeeService:
         is_active: Optional[bool] = None,
         skip: int = 0, 
         limit: int = 100
-    ) -> list[Employee]:
-        """Obtiene una lista de todos los empleados con filtros opcionales."""
-        logging.info(f"Getting all employees: {search}, {role_id}, {is_active}, {skip}, {limit}")
-        return employee_repo.search_and_filter(
+    ) -> tuple[list[Employee], EmployeeTotal]:
+        """Obtiene una página de empleados con filtros opcionales y el total para paginar."""
+        logger.info("Getting all employees: search=%s, role_id=%s, is_active=%s, skip=%s, limit=%s", bool(search), role_id, is_active, skip, limit)
+        total = self._total_before_page(db, search, role_id, is_active)
+        employees, window_total = employee_repo.search_and_filter(
+            db,
+            search=search,
+            role_id=role_id,
+            is_active=is_active,
+            skip=skip,
+            limit=limit,
+            with_total=total is None,
+        )
+        return employees, total or self._total_after_page(db, window_total, search, role_id, is_active, skip)
+
+    def get_employee_fields(
+        self,
+        db: Session,
+        fields: tuple[str, ...],
+        search: Optional[str] = None,
+        role_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> tuple[list, EmployeeTotal]:
+        """Listado de empleados proyectado a los campos pedidos, para pantallas de listado."""
+        logger.info("Getting employee fields %s: search=%s, role_id=%s, is_active=%s, skip=%s, limit=%s", fields, bool(search), role_id, is_active, skip, limit)
+        total = self._total_before_page(db, search, role_id, is_active)
+        rows, window_total = employee_repo.search_and_filter_fields(
             db,
+            fields=fields,
             search=search,
             role_id=role_id,
             is_active=is_active,
             skip=skip,
-            limit=limit
+            limit=limit,
+            with_total=total is None,
+        )
+        return rows, total or self._total_after_page(db, window_total, search, role_id, is_active, skip)
+
+    def lookup_employees(self, db: Session, lookup_in: EmployeeLookup) -> dict:
+        """
+        Resuelve un lote de ids y números de documento con una sola consulta.
+        Retorna los empleados en el orden pedido (sin repetir) y las claves no encontradas.
+        """
+        ids = list(dict.fromkeys(lookup_in.ids))
+        document_numbers = list(dict.fromkeys(lookup_in.document_numbers))
+        logger.info("Looking up %s employee ids and %s document numbers", len(ids), len(document_numbers))
+        found = employee_repo.get_many(db, ids=ids, document_numbers=document_numbers)
+        by_id = {employee.id: employee for employee in found}
+        by_document = {employee.document_number: employee for employee in found}
+
+        ordered = {}
+        for employee in [by_id.get(i) for i in ids] + [by_document.get(d) for d in document_numbers]:
+            if employee is not None:
+                ordered.setdefault(employee.id, employee)
+        return {
+            "employees": list(ordered.values()),
+            "not_found_ids": [i for i in ids if i not in by_id],
+            "not_found_document_numbers": [d for d in document_numbers if d not in by_document],
+        }
+
+    def get_employee_validators(
+        self, db: Session, employee_id: int, availability_window_days: Optional[int] = None
+    ) -> Validators:
+        """
+        Calcula ETag y Last-Modified de un empleado con una consulta de versión,
+        sin cargar ni serializar el empleado.
+        Con disponibilidades anidadas solo hay ETag (incluye los límites de la ventana y
+        el número de filas): borrar una fila o desplazar la ventana no mueve ningún
+        updated_at, así que un Last-Modified daría 304 obsoletos.
+        Lanza RecordNotFoundError si no existe.
+        """
+        availability_range = None
+        if availability_window_days is not None:
+            availability_range = self._availability_range(availability_window_days)
+        version = employee_repo.get_version(db, id=employee_id, availability_range=availability_range)
+        if not version:
+            raise RecordNotFoundError(f"Employee with id {employee_id} not found.")
+        return make_validators(
+            "employee", employee_id, availability_range, *version, parametric_cache.get(db).etag,
+            last_modified=version[0] if availability_range is None else None,
+        )
+
+    def get_employees_validators(
+        self,
+        db: Session,
+        search: Optional[str] = None,
+        role_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[tuple[str, ...]] = None
+    ) -> Validators:
+        """
+        Calcula el ETag de un listado de empleados con la versión de toda la colección
+        (ver get_collection_version): una lectura por clave, sin recorrer el conjunto
+        filtrado. Cualquier cambio en employees invalida todos los listados.
+        """
+        version = employee_repo.get_collection_version(db)
+        return make_validators(
+            "employees", search, role_id, is_active, skip, limit, fields, *version, parametric_cache.get(db).etag
         )
 
     def create_employee(self, db: Session, employee_in: EmployeeCreate) -> Employee:
@@ -54,11 +235,12 @@ class EmployeeService:
         Crea un nuevo empleado.
         Lanza DuplicateRecordError si el número de documento ya existe.
         """
-        logging.info(f"Creating employee: {employee_in}")
+        logger.info("Creating employee with operational role %s", employee_in.operational_role_id)
         existing_employee = employee_repo.get_by_document_number(db, document_number=employee_in.document_number)
         if existing_employee:
-            logging.error(f"Employee with document number {employee_in.document_number} already exists.")
+            logger.error("Employee with the given document number already exists.")
             raise DuplicateRecordError(f"Employee with document number {employee_in.document_number} already exists.")
+        self._validate_parametric_ids(db, employee_in.model_dump())
         
         # Aquí podrías añadir más lógica de negocio, como enviar un email de bienvenida, etc.
         
@@ -71,8 +253,9 @@ class EmployeeService:
         Actualiza un empleado existente.
         Lanza RecordNotFoundError si el empleado no existe.
         """
-        logging.info(f"Updating employee: {employee_id}")
+        logger.info("Updating employee: %s", employee_id)
         db_employee = self.get_employee(db, employee_id) # Reutiliza el método get para la validación
+        self._validate_parametric_ids(db, employee_in.model_dump(exclude_unset=True))
         
         # Aquí podrías añadir lógica compleja de actualización
         
@@ -91,13 +274,58 @@ class EmployeeService:
             joinedload(Employee.operational_role)
         )
         
-        deleted_employee = employee_repo.remove(db, id=employee_id, options=options)
+        deleted_employee = employee_repo.remove(db, id=employee_id, options=options, commit=False)
         
         if not deleted_employee:
-            logging.error(f"Employee with id {employee_id} not found.")
+            logger.error("Employee with id %s not found.", employee_id)
             raise RecordNotFoundError(f"Employee with id {employee_id} not found.")
-            
+
+        availability_event_service.employee_removed(
+            db, employee_id=deleted_employee.id, operational_role_id=deleted_employee.operational_role_id
+        )
+        db.commit()
         return deleted_employee
 
+    def terminate_employees(self, db: Session, termination_in: EmployeeTermination) -> EmployeeTerminationResult:
+        """
+        Retira varios empleados a la vez: quedan inactivos con la fecha y el motivo
+        de retiro, y se eliminan sus disponibilidades posteriores a esa fecha.
+        Los ya inactivos se informan en already_inactive_ids sin modificarlos (un
+        reintento no cambia el retiro original) y los inexistentes en not_found_ids.
+        """
+        ids = list(dict.fromkeys(termination_in.employee_ids))
+        logger.info("Terminating %s employees as of %s", len(ids), termination_in.termination_date)
+        terminated, already_inactive, removed = employee_repo.terminate_many(
+            db,
+            ids=ids,
+            termination_date=termination_in.termination_date,
+            reason_for_termination=termination_in.reason_for_termination,
+        )
+        for employee_id in terminated:
+            outbox_service.record(db, "employee", employee_id, "employee.terminated", {
+                "id": employee_id,
+                "is_active": False,
+                "termination_date": termination_in.termination_date,
+                "reason_for_termination": termination_in.reason_for_termination,
+            })
+        for row in removed:
+            outbox_service.record(db, "availability", row["id"], "availability.deleted", row)
+        availability_event_service.availabilities_terminated(
+            db,
+            start_date=termination_in.termination_date + timedelta(days=1),
+            removed=removed,
+            roles=terminated,
+        )
+        db.commit()
+        return EmployeeTerminationResult(
+            terminated_ids=sorted(terminated),
+            already_inactive_ids=already_inactive,
+            not_found_ids=[
+                employee_id for employee_id in ids
+                if employee_id not in terminated and employee_id not in already_inactive
+            ],
+            removed_availabilities=len(removed),
+        )
+
 # Creamos una instancia del servicio para ser usada con inyección de dependencias
 employee_service = EmployeeService()
\ No newline at end of file
@@ -0,0 +1,106 @@
+import csv
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session
+
+from repositories import availability_repo, employee_repo
+from schemas import AvailabilityExportParams, AvailabilityScheduleParams, AvailabilityArchiveParams
+from services.availabilityArchive import availability_archive_service
+from services.availabilityEvents import availability_event_service
+from services.dailyAvailability import availability_service
+from services.jobs import JobContext, JobResult, job_type
+from services.outbox import outbox_service
+from services.parametric import availability_status_service
+
+# Cada cuántas filas o empleados se reporta el avance (y se revisa si se pidió cancelar)
+PROGRESS_EVERY = 1000
+SCHEDULE_CHUNK_EMPLOYEES = 200
+
+EXPORT_COLUMNS = (
+    "id", "date", "employee_id", "employee_full_name", "operational_role", "status", "notes",
+)
+
+
+@job_type("availability_export", max_concurrency=2)
+def export_availabilities(db: Session, context: JobContext, params: dict) -> JobResult:
+    """
+    Escribe en CSV el reporte detallado de disponibilidades (incluye el histórico archivado).
+    Las filas llegan en streaming como tuplas: ni se cargan todas ni se crean objetos del ORM.
+    """
+    export = AvailabilityExportParams.model_validate(params)
+    total, rows = availability_service.iter_detailed_rows(
+        db, start_date=export.start_date, end_date=export.end_date, employee_id=export.employee_id
+    )
+    context.progress(0, total, "Writing CSV")
+    path = context.result_path("csv")
+    done = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(EXPORT_COLUMNS)
+        for availability_id, day, employee_id, full_name, role, status, notes in rows:
+            writer.writerow((availability_id, day.isoformat(), employee_id, full_name, role, status, notes or ""))
+            done += 1
+            if done % PROGRESS_EVERY == 0:
+                context.progress(done, max(total, done))
+    context.progress(done, done, "Done")
+    return JobResult(data={"rows": done}, path=path, content_type="text/csv")
+
+
+@job_type("availability_schedule", max_concurrency=1)
+def schedule_availabilities(db: Session, context: JobContext, params: dict) -> JobResult:
+    """
+    Crea en bloque la disponibilidad de cada día del rango para los empleados activos.
+    Se confirma por grupos de empleados: si se cancela, lo ya creado se conserva.
+    Cada grupo es un INSERT ... ON CONFLICT DO NOTHING: los días que ya existen (o que
+    se crean por la API mientras corre el trabajo) se omiten, y el outbox y el stream
+    reciben solo las filas que devolvió la sentencia.
+    """
+    schedule = AvailabilityScheduleParams.model_validate(params)
+    if schedule.start_date < date.today():
+        raise ValueError("Cannot register availability for a past date.")
+    availability_status_service.get_by_id(db, schedule.status_id)
+
+    roles = employee_repo.get_active_roles(db, role_id=schedule.role_id, ids=schedule.employee_ids)
+    employee_ids = list(roles)
+    days = [
+        schedule.start_date + timedelta(days=offset)
+        for offset in range((schedule.end_date - schedule.start_date).days + 1)
+    ]
+    created = skipped = 0
+    context.progress(0, len(employee_ids), "Creating availabilities")
+    for start in range(0, len(employee_ids), SCHEDULE_CHUNK_EMPLOYEES):
+        chunk = employee_ids[start : start + SCHEDULE_CHUNK_EMPLOYEES]
+        rows = availability_repo.create_missing(db, rows=[
+            {"employee_id": employee_id, "date": day, "status_id": schedule.status_id, "notes": schedule.notes}
+            for employee_id in chunk
+            for day in days
+        ])
+        for row in rows:
+            outbox_service.record(db, "availability", row.id, "availability.created", dict(row._mapping))
+        if rows:
+            availability_event_service.availabilities_scheduled(
+                db,
+                start_date=schedule.start_date,
+                end_date=schedule.end_date,
+                status_id=schedule.status_id,
+                roles={employee_id: roles[employee_id] for employee_id in {row.employee_id for row in rows}},
+                count=len(rows),
+            )
+        db.commit()
+        created += len(rows)
+        skipped += len(chunk) * len(days) - len(rows)
+        context.progress(start + len(chunk), len(employee_ids))
+    return JobResult(data={"employees": len(employee_ids), "created": created, "skipped": skipped})
+
+
+@job_type("availability_archive", max_concurrency=1)
+def archive_availabilities(db: Session, context: JobContext, params: dict) -> JobResult:
+    """
+    Mueve al archivo Parquet las disponibilidades anteriores a la fecha de corte.
+    Reporta el avance por mes archivado: si se pide cancelar, se detiene tras el mes en curso.
+    """
+    archive = AvailabilityArchiveParams.model_validate(params)
+    cutoff = archive.cutoff or availability_archive_service.get_cutoff()
+    context.progress(0, None, f"Archiving before {cutoff}")
+    archived = availability_archive_service.archive_older_than(db, cutoff=cutoff, on_month=context.progress)
+    return JobResult(data={"cutoff": cutoff.isoformat(), "archived": archived})
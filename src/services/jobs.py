@@ -0,0 +1,207 @@
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.session import SessionLocal
+from models import Job
+from repositories import job_repo
+from utils.exceptions import RecordNotFoundError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# jobs_queued es el mismo valor global en cada worker; jobs_running se suma entre procesos vivos
+JOB_QUEUE_DEPTH = Gauge(
+    "jobs_queued", "Background jobs waiting to run, by type.", ["job_type"], multiprocess_mode="max"
+)
+JOBS_RUNNING = Gauge(
+    "jobs_running", "Background jobs running in this worker, by type.", ["job_type"], multiprocess_mode="livesum"
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds",
+    "Background job run time by type and final status.",
+    ["job_type", "status"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
+
+
+class JobCancelled(Exception):
+    """La lanza JobContext.progress cuando se pidió cancelar el trabajo en ejecución."""
+    pass
+
+
+@dataclass
+class JobResult:
+    """Resultado de un trabajo: datos JSON y/o un archivo descargable en JOB_RESULTS_DIR."""
+    data: Optional[dict] = None
+    path: Optional[Path] = None
+    content_type: Optional[str] = None
+
+
+class JobContext:
+    def __init__(self, db: Session, job: Job, progress_db: Optional[Session] = None):
+        """
+        Lo recibe cada handler para reportar avance y ubicar su archivo de resultado.
+        El avance se guarda con `progress_db`, una sesión aparte: su commit no expira los
+        objetos que el handler tiene cargados ni cierra un cursor del servidor abierto en `db`.
+        """
+        self.db = db
+        self.job = job
+        self.progress_db = progress_db or db
+        self.job_id = job.id
+        self.job_type = job.job_type
+        self.worker_id = job.worker_id
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        """
+        Guarda el avance (y el latido). Lanza JobCancelled si se pidió cancelar o si el
+        trabajo ya no está en ejecución a nombre de este worker.
+        """
+        if job_repo.report_progress(
+            self.progress_db, id=self.job_id, worker_id=self.worker_id, done=done, total=total, message=message
+        ):
+            raise JobCancelled()
+
+    def result_path(self, extension: str) -> Path:
+        directory = Path(settings.JOB_RESULTS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / f"{self.job_type}-{self.job_id}.{extension}"
+
+
+@dataclass(frozen=True)
+class JobType:
+    name: str
+    handler: Callable[[Session, JobContext, dict], JobResult]
+    max_concurrency: int
+
+
+# Tipo de trabajo -> definición. Los handlers se registran con @job_type.
+JOB_TYPES: dict[str, JobType] = {}
+
+def job_type(name: str, max_concurrency: int = 1):
+    """Registra un handler de trabajos. JOB_MAX_CONCURRENCY puede cambiar el límite por tipo."""
+    def register(handler):
+        limit = settings.JOB_MAX_CONCURRENCY.get(name, max_concurrency)
+        JOB_TYPES[name] = JobType(name=name, handler=handler, max_concurrency=limit)
+        return handler
+    return register
+
+
+class JobService:
+
+    def submit(self, db: Session, job_type: str, params: dict[str, Any], created_by: Optional[str] = None) -> Job:
+        """Encola un trabajo y retorna su registro (el id se usa para consultar su estado)."""
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type: {job_type}")
+        logger.info("Submitting %s job", job_type)
+        return job_repo.create(db, job_type=job_type, params=params, created_by=created_by)
+
+    def get_job(self, db: Session, job_id: int) -> Job:
+        """
+        Obtiene un trabajo por su ID.
+        Lanza RecordNotFoundError si no existe.
+        """
+        job = job_repo.get(db, job_id)
+        if not job:
+            logger.error("Job with id %s not found.", job_id)
+            raise RecordNotFoundError(f"Job with id {job_id} not found.")
+        return job
+
+    def cancel_job(self, db: Session, job_id: int) -> Job:
+        """
+        Cancela un trabajo en espera o pide detener uno en ejecución.
+        Lanza RecordNotFoundError si no existe y ValueError si ya terminó.
+        """
+        job = job_repo.request_cancel(db, id=job_id)
+        if not job:
+            raise RecordNotFoundError(f"Job with id {job_id} not found.")
+        if job.status not in ("cancelled", "running"):
+            raise ValueError(f"Job {job_id} already finished with status {job.status}.")
+        return job
+
+    def get_result_file(self, db: Session, job_id: int) -> tuple[Path, str]:
+        """
+        Ruta y tipo de contenido del archivo de resultado.
+        Lanza ValueError si el trabajo no terminó bien o no produce archivo.
+        """
+        job = self.get_job(db, job_id)
+        if job.status != "succeeded":
+            raise ValueError(f"Job {job_id} has no result yet (status {job.status}).")
+        if not job.result_path:
+            raise ValueError(f"Job {job_id} does not produce a file; see its `result`.")
+        return Path(job.result_path), job.result_content_type or "application/octet-stream"
+
+    # --- Ejecución (worker) ---
+
+    def run_next(self, db: Session, worker_id: str, types: list[JobType]) -> bool:
+        """
+        Ejecuta a lo sumo un trabajo del primer tipo de `types` que tenga cupo y
+        trabajos en espera. Retorna True si ejecutó alguno.
+        """
+        for definition in types:
+            slot = job_repo.try_acquire_slot(db, job_type=definition.name, max_concurrency=definition.max_concurrency)
+            if slot is None:
+                continue
+            try:
+                job = job_repo.claim(db, job_type=definition.name, worker_id=worker_id)
+                if job is not None:
+                    progress_db = SessionLocal()
+                    try:
+                        self._execute(db, job, definition, progress_db=progress_db)
+                    finally:
+                        progress_db.close()
+                    return True
+            finally:
+                db.rollback()
+                job_repo.release_slot(db, job_type=definition.name, slot=slot)
+        return False
+
+    def _execute(self, db: Session, job: Job, definition: JobType, progress_db: Optional[Session] = None) -> None:
+        job_id, job_type, worker_id = job.id, job.job_type, job.worker_id
+        logger.info("Running job %s (%s)", job_id, job_type)
+        JOBS_RUNNING.labels(job_type=job_type).inc()
+        started = time.monotonic()
+        status = "failed"
+        values = {}
+        try:
+            result = definition.handler(db, JobContext(db, job, progress_db), dict(job.params))
+            status = "succeeded"
+            values = {
+                "result": result.data,
+                "result_path": str(result.path) if result.path else None,
+                "result_content_type": result.content_type,
+            }
+        except JobCancelled:
+            db.rollback()
+            status = "cancelled"
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, job_type)
+            db.rollback()
+            status = "failed"
+            values = {"error": f"{type(e).__name__}: {e}"[:2000]}
+        finally:
+            JOBS_RUNNING.labels(job_type=job_type).dec()
+            JOB_DURATION.labels(job_type=job_type, status=status).observe(time.monotonic() - started)
+        if job_repo.finish(db, id=job_id, worker_id=worker_id, status=status, **values):
+            logger.info("Job %s (%s) finished: %s", job_id, job_type, status)
+        else:
+            logger.warning(
+                "Job %s (%s) is no longer running on worker %s; its %s result was not recorded",
+                job_id, job_type, worker_id, status,
+            )
+
+    def update_queue_metrics(self, db: Session) -> None:
+        queued = job_repo.count_queued_by_type(db)
+        for name in JOB_TYPES:
+            JOB_QUEUE_DEPTH.labels(job_type=name).set(queued.get(name, 0))
+
+job_service = JobService()
+
+
+# Registra los tipos de trabajo (los handlers usan JobContext, JobResult y @job_type de este módulo)
+import services.jobHandlers  # noqa: E402,F401
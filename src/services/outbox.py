@@ -0,0 +1,158 @@
+from datetime import date, datetime, timezone
+from itertools import chain
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models import Employee, DailyAvailability
+from repositories import outbox_repo
+from services.outboxSinks import OutboxSink
+import logging
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DISPATCHED = Counter(
+    "outbox_events_dispatched_total", "Outbox events delivered, by sink and event type.", ["sink", "event_type"]
+)
+OUTBOX_FAILURES = Counter(
+    "outbox_dispatch_failures_total", "Failed outbox delivery attempts (per event), by sink.", ["sink"]
+)
+OUTBOX_LAG = Histogram(
+    "outbox_dispatch_lag_seconds",
+    "Seconds between an outbox event being written and being delivered.",
+    ["sink"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+# Valores globales (los calcula cada despachador con la misma consulta)
+OUTBOX_PENDING = Gauge("outbox_pending_events", "Outbox events waiting to be delivered.", multiprocess_mode="max")
+OUTBOX_OLDEST_PENDING_AGE = Gauge(
+    "outbox_oldest_pending_age_seconds", "Age in seconds of the oldest undelivered outbox event.",
+    multiprocess_mode="max",
+)
+
+# Modelo -> (tipo de agregado, campos que viajan en el evento)
+TRACKED_MODELS = {
+    Employee: ("employee", (
+        "id", "document_number", "full_name", "operational_role_id", "is_active",
+        "hire_date", "termination_date", "reason_for_termination",
+    )),
+    DailyAvailability: ("availability", ("id", "employee_id", "date", "status_id", "notes")),
+}
+
+
+def _jsonable(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+class OutboxService:
+
+    def record(self, db: Session, aggregate_type: str, aggregate_id: int, event_type: str, payload: dict) -> None:
+        """
+        Agrega un evento al outbox en la transacción actual de `db`.
+        Se confirma (o se descarta) junto con el cambio que lo produjo.
+        """
+        outbox_repo.add(
+            db,
+            aggregate_type=aggregate_type,
+            aggregate_id=aggregate_id,
+            event_type=event_type,
+            payload={key: _jsonable(value) for key, value in payload.items()},
+        )
+
+    def _record_orm_changes(self, session: Session) -> None:
+        """Traduce las altas, cambios y bajas de objetos ORM rastreados en eventos del outbox."""
+        for obj, operation in chain(
+            ((obj, "created") for obj in session.new),
+            ((obj, "updated") for obj in session.dirty),
+            ((obj, "deleted") for obj in session.deleted),
+        ):
+            tracked = TRACKED_MODELS.get(type(obj))
+            if tracked is None:
+                continue
+            aggregate_type, fields = tracked
+            state = inspect(obj)
+            changed = []
+            if operation == "updated":
+                changed = [attr.key for attr in state.mapper.column_attrs if state.attrs[attr.key].history.has_changes()]
+                if not changed:
+                    continue
+            payload = {key: state.dict[key] for key in fields if key in state.dict}
+            if changed:
+                payload["changed"] = changed
+            self.record(session, aggregate_type, obj.id, f"{aggregate_type}.{operation}", payload)
+
+            if aggregate_type == "employee" and operation == "updated" and "is_active" in changed and not obj.is_active:
+                self.record(session, aggregate_type, obj.id, "employee.terminated", payload)
+
+    def dispatch_batch(self, db: Session, sink: OutboxSink) -> int:
+        """
+        Entrega un lote de eventos pendientes al destino y confirma el resultado.
+        Los eventos quedan bloqueados mientras se envían; si el envío falla se
+        reprograman con espera exponencial. Retorna cuántos eventos se tomaron.
+        """
+        events = outbox_repo.claim_batch(db, limit=settings.OUTBOX_BATCH_SIZE)
+        if not events:
+            db.commit()
+            return 0
+        envelopes = [
+            {
+                "id": outbox_event.id,
+                "type": outbox_event.event_type,
+                "aggregate_type": outbox_event.aggregate_type,
+                "aggregate_id": outbox_event.aggregate_id,
+                "occurred_at": outbox_event.created_at.isoformat(),
+                "payload": outbox_event.payload,
+            }
+            for outbox_event in events
+        ]
+        ids = [outbox_event.id for outbox_event in events]
+        try:
+            sink.send(envelopes)
+        except Exception as e:
+            logger.warning("Outbox delivery of %s events to %s failed: %s", len(events), sink.name, e)
+            OUTBOX_FAILURES.labels(sink=sink.name).inc(len(events))
+            outbox_repo.mark_failed(
+                db,
+                ids=ids,
+                error=f"{type(e).__name__}: {e}",
+                base_delay_seconds=settings.OUTBOX_RETRY_BASE_SECONDS,
+                max_delay_seconds=settings.OUTBOX_RETRY_MAX_SECONDS,
+                max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+            )
+            db.commit()
+            return len(events)
+
+        outbox_repo.mark_dispatched(db, ids=ids)
+        db.commit()
+        now = datetime.now(timezone.utc)
+        for outbox_event in events:
+            OUTBOX_DISPATCHED.labels(sink=sink.name, event_type=outbox_event.event_type).inc()
+            OUTBOX_LAG.labels(sink=sink.name).observe((now - outbox_event.created_at).total_seconds())
+        return len(events)
+
+    def purge_dispatched(self, db: Session) -> int:
+        """Borra los eventos entregados hace más de OUTBOX_DISPATCHED_RETENTION_HOURS."""
+        deleted = outbox_repo.purge_dispatched(db, retention_hours=settings.OUTBOX_DISPATCHED_RETENTION_HOURS)
+        db.commit()
+        if deleted:
+            logger.info("Purged %s dispatched outbox events", deleted)
+        return deleted
+
+    def update_backlog_metrics(self, db: Session) -> None:
+        pending, oldest_age = outbox_repo.count_pending(db)
+        OUTBOX_PENDING.set(pending)
+        OUTBOX_OLDEST_PENDING_AGE.set(oldest_age)
+
+
+outbox_service = OutboxService()
+
+
+# --- Registro automático de los cambios hechos con el ORM ---
+# after_flush corre dentro de la transacción; Session.commit vuelve a hacer flush
+# mientras haya objetos pendientes, así que los eventos se guardan en la misma transacción.
+
+@event.listens_for(Session, "after_flush")
+def _record_outbox_events(session: Session, flush_context) -> None:
+    outbox_service._record_orm_changes(session)
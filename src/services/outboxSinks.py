@@ -0,0 +1,75 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Protocol
+
+import httpx
+
+from core.config import settings
+
+
+class OutboxSink(Protocol):
+    """Destino de los eventos del outbox. `send` lanza una excepción si la entrega falla."""
+    name: str
+
+    def send(self, events: list[dict]) -> None: ...
+
+
+class WebhookSink:
+    name = "webhook"
+
+    def __init__(self, url: str, timeout_seconds: float = 5.0):
+        """Envía cada lote como un POST JSON {"events": [...]}; cualquier respuesta no 2xx es un fallo."""
+        self.url = url
+        self.client = httpx.Client(timeout=timeout_seconds)
+
+    def send(self, events: list[dict]) -> None:
+        response = self.client.post(self.url, json={"events": events})
+        response.raise_for_status()
+
+
+class FileSink:
+    name = "file"
+
+    def __init__(self, path: str):
+        """Agrega cada evento como una línea JSON y hace fsync antes de confirmar la entrega."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def send(self, events: list[dict]) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            for event in events:
+                file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class MemorySink:
+    name = "memory"
+
+    def __init__(self):
+        """Destino en memoria para pruebas; `fail_next` simula fallos de entrega."""
+        self.events: list[dict] = []
+        self.fail_next = 0
+        self._lock = threading.Lock()
+
+    def send(self, events: list[dict]) -> None:
+        with self._lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                raise ConnectionError("Simulated delivery failure")
+            self.events.extend(events)
+
+
+def build_sink() -> OutboxSink:
+    """Construye el destino configurado en OUTBOX_SINK."""
+    if settings.OUTBOX_SINK == "webhook":
+        if not settings.OUTBOX_WEBHOOK_URL:
+            raise ValueError("OUTBOX_WEBHOOK_URL is required when OUTBOX_SINK=webhook")
+        return WebhookSink(settings.OUTBOX_WEBHOOK_URL, timeout_seconds=settings.OUTBOX_WEBHOOK_TIMEOUT_SECONDS)
+    if settings.OUTBOX_SINK == "file":
+        return FileSink(settings.OUTBOX_FILE_PATH)
+    if settings.OUTBOX_SINK == "memory":
+        return MemorySink()
+    raise ValueError(f"Unknown OUTBOX_SINK: {settings.OUTBOX_SINK}")
@@ -7,38 +7,79 @@ from repositories import (
     operational_role_repo,
     availability_status_repo
 )
+import schemas
+from services.parametricCache import CATALOGS, parametric_cache, ParametricSnapshot
 from typing import Type
 import logging
+
+logger = logging.getLogger(__name__)
+
 class ParametricService:
     def __init__(self, repository: BaseRepository):
         """
         Servicio genérico para manejar tablas paramétricas.
+        Las lecturas se resuelven desde la caché en proceso, sin SQL.
         :param repository: Una instancia de un repositorio para una tabla paramétrica.
         """
         self.repository = repository
+        self.catalog = repository.model.__tablename__
 
     def get_all(self, db: Session) -> list:
         """Obtiene todos los registros de una tabla paramétrica."""
-        logging.info(f"Getting all {self.repository.model.__tablename__}")
-        return self.repository.get_multi(db, limit=200) # Aumentamos el límite para tablas de opciones
+        logger.info("Getting all %s", self.catalog)
+        return parametric_cache.get(db).catalogs[self.catalog]
 
     def get_by_id(self, db: Session, id: int):
-        """Obtiene un registro por su ID."""
-        logging.info(f"Getting {self.repository.model.__tablename__} by id: {id}")
-        record = self.repository.get(db, id=id)
-        if not record:
-            raise RecordNotFoundError(f"Record with id {id} not found in {self.repository.model.__tablename__}.")
-        return record
+        """
+        Obtiene un registro por su ID.
+        Si no está en la caché se busca una vez en la base de datos: los catálogos también
+        se escriben desde migraciones o seeders, fuera de este proceso. Si aparece, se
+        descarta la copia en caché para que la siguiente lectura lo incluya.
+        """
+        logger.info("Getting %s by id: %s", self.catalog, id)
+        record = parametric_cache.get(db).by_id[self.catalog].get(id)
+        if record:
+            return record
+        db_record = self.repository.get(db, id)
+        if not db_record:
+            raise RecordNotFoundError(f"Record with id {id} not found in {self.catalog}.")
+        logger.info("%s %s missing from the parametric cache, invalidating it", self.catalog, id)
+        parametric_cache.invalidate()
+        return CATALOGS[self.catalog][1].model_validate(db_record)
 
 class OperationalRoleService(ParametricService):
-    def get_all_with_count(self, db: Session) -> list:
-        """Obtiene todos los roles con el conteo de empleados."""
-        logging.info(f"Getting all operational roles with employee count")
-        return self.repository.get_with_employee_count(db)
+    def get_all_with_count(self, db: Session) -> list[schemas.OperationalRoleWithCount]:
+        """
+        Obtiene todos los roles con el conteo de empleados.
+        Los roles salen de la caché; los conteos, de la tabla de contadores.
+        """
+        logger.info("Getting all operational roles with employee count")
+        counts = self.repository.get_employee_counts(db)
+        roles = [
+            schemas.OperationalRoleWithCount(
+                **role.model_dump(),
+                employee_count=counts.get(role.id, (0, 0))[0],
+                active_employee_count=counts.get(role.id, (0, 0))[1],
+            )
+            for role in self.get_all(db)
+        ]
+        return sorted(roles, key=lambda role: role.name)
+
+    def rebuild_employee_counts(self, db: Session) -> int:
+        """Reconstruye los contadores de empleados por rol desde la tabla employees."""
+        logger.info("Rebuilding operational role employee counts")
+        return self.repository.rebuild_employee_counts(db)
+
+class ParametricCatalogService:
+    def get_snapshot(self, db: Session) -> ParametricSnapshot:
+        """Obtiene todos los catálogos paramétricos junto con su ETag."""
+        logger.info("Getting all parametric catalogs")
+        return parametric_cache.get(db)
 
 # --- Creamos una instancia del servicio para cada tabla paramétrica ---
 
 document_type_service = ParametricService(document_type_repo)
 gender_service = ParametricService(gender_repo)
 operational_role_service = OperationalRoleService(operational_role_repo)
-availability_status_service = ParametricService(availability_status_repo)
\ No newline at end of file
+availability_status_service = ParametricService(availability_status_repo)
+parametric_catalog_service = ParametricCatalogService()
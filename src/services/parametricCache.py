@@ -0,0 +1,109 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from itertools import chain
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import schemas
+from core.config import settings
+from models.parametric import DocumentType, Gender, OperationalRole, AvailabilityStatus
+from repositories import (
+    document_type_repo,
+    gender_repo,
+    operational_role_repo,
+    availability_status_repo
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Catálogo -> (repositorio, schema de lectura). La clave es el nombre de la tabla.
+CATALOGS = {
+    "document_types": (document_type_repo, schemas.DocumentType),
+    "genders": (gender_repo, schemas.Gender),
+    "operational_roles": (operational_role_repo, schemas.OperationalRole),
+    "availability_statuses": (availability_status_repo, schemas.AvailabilityStatus),
+}
+
+PARAMETRIC_MODELS = (DocumentType, Gender, OperationalRole, AvailabilityStatus)
+
+
+@dataclass(frozen=True)
+class ParametricSnapshot:
+    """Copia inmutable de todos los catálogos en un momento dado."""
+    version: int
+    etag: str
+    catalogs: dict[str, list[BaseModel]]
+    by_id: dict[str, dict[int, BaseModel]]
+
+
+class ParametricCache:
+    def __init__(self, ttl_seconds: int):
+        """
+        Caché en proceso de todas las tablas paramétricas.
+        Se invalida cuando una sesión de este proceso confirma escrituras sobre
+        ellas; el TTL cubre las escrituras hechas desde otros procesos.
+        :param ttl_seconds: Segundos que una copia se considera vigente
+        """
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._snapshot: ParametricSnapshot | None = None
+        self._loaded_at = 0.0
+        self._version = 0
+
+    def get(self, db: Session) -> ParametricSnapshot:
+        """Retorna la copia vigente, cargándola de la base de datos si hace falta."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return snapshot
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                return self._snapshot
+            self._snapshot = self._load(db)
+            self._loaded_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Descarta la copia actual; la siguiente lectura vuelve a la base de datos."""
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def _load(self, db: Session) -> ParametricSnapshot:
+        logger.info("Loading parametric catalogs into cache")
+        catalogs = {
+            name: [schema.model_validate(record) for record in repository.get_all(db)]
+            for name, (repository, schema) in CATALOGS.items()
+        }
+        by_id = {name: {item.id: item for item in items} for name, items in catalogs.items()}
+        payload = json.dumps(
+            {name: [item.model_dump() for item in items] for name, items in catalogs.items()},
+            sort_keys=True,
+        )
+        etag = f'W/"{hashlib.sha1(payload.encode()).hexdigest()[:20]}"'
+        return ParametricSnapshot(version=self._version, etag=etag, catalogs=catalogs, by_id=by_id)
+
+
+parametric_cache = ParametricCache(ttl_seconds=settings.PARAMETRIC_CACHE_TTL_SECONDS)
+
+
+# --- Invalidación al confirmar escrituras sobre tablas paramétricas ---
+
+@event.listens_for(Session, "after_flush")
+def _track_parametric_writes(session: Session, flush_context) -> None:
+    if any(isinstance(obj, PARAMETRIC_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["parametric_dirty"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop("parametric_dirty", False):
+        parametric_cache.invalidate()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_on_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop("parametric_dirty", None)
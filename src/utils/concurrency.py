@@ -0,0 +1,206 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import orjson
+from prometheus_client import Counter, Gauge
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SHED_REQUESTS = Counter(
+    "http_requests_shed_total",
+    "Requests rejected with 503 by the concurrency limiter, by route class and reason.",
+    ["route_class", "reason"],
+)
+# Con varios workers se suman los de los procesos vivos (capacidad, en curso y en cola totales)
+CONCURRENCY_LIMIT = Gauge(
+    "http_concurrency_limit", "Current adaptive in-flight limit by route class.", ["route_class"],
+    multiprocess_mode="livesum",
+)
+IN_FLIGHT = Gauge(
+    "http_concurrency_in_flight", "Requests running under the limiter by route class.", ["route_class"],
+    multiprocess_mode="livesum",
+)
+QUEUED = Gauge(
+    "http_concurrency_queued", "Requests waiting for a slot by route class.", ["route_class"],
+    multiprocess_mode="livesum",
+)
+
+
+class Overloaded(Exception):
+    """No hubo cupo: la cola estaba llena o se agotó la espera."""
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        name: str,
+        *,
+        min_limit: int,
+        max_limit: int,
+        target_latency: float,
+        queue_size: int,
+        queue_timeout: float,
+        backoff: float = 0.9,
+    ):
+        """
+        Límite de peticiones en curso que se ajusta con AIMD según la latencia observada.
+        - Cada respuesta dentro de `target_latency` con el límite copado suma 1/limit
+          (el límite crece ~1 por cada "ronda" completa de peticiones).
+        - Una respuesta lenta o 5xx multiplica el límite por `backoff`, una sola vez
+          por ronda: se ignoran las que empezaron antes de la última reducción.
+        Las peticiones sin cupo esperan en una cola FIFO corta.
+        Se usa desde un solo event loop, así que no necesita locks.
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.backoff = backoff
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        CONCURRENCY_LIMIT.labels(route_class=name).set(self.limit)
+
+    async def acquire(self) -> None:
+        """Toma un cupo, esperando en la cola si hace falta. Lanza Overloaded si no lo consigue."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self._enter()
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise Overloaded("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        QUEUED.labels(route_class=self.name).set(len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            # El cupo pudo llegar justo cuando vencía la espera (o se desconectó el cliente): se devuelve
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._wake_waiters()
+            if isinstance(e, asyncio.TimeoutError):
+                raise Overloaded("queue_timeout")
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            QUEUED.labels(route_class=self.name).set(len(self._waiters))
+
+    def release(self, started: float, latency: float, overloaded: bool = False) -> None:
+        """Libera el cupo y ajusta el límite con la latencia de la petición."""
+        was_limited = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+        if overloaded or latency > self.target_latency:
+            if started >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = time.monotonic()
+        elif was_limited:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        CONCURRENCY_LIMIT.labels(route_class=self.name).set(self.limit)
+        IN_FLIGHT.labels(route_class=self.name).set(self.in_flight)
+        self._wake_waiters()
+
+    def _enter(self) -> None:
+        self.in_flight += 1
+        IN_FLIGHT.labels(route_class=self.name).set(self.in_flight)
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._enter()
+                waiter.set_result(None)
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        limiters: dict[str, AdaptiveLimiter],
+        classify: Callable[[Scope], Optional[str]],
+        retry_after_seconds: int = 1,
+    ) -> None:
+        """
+        Middleware ASGI que limita las peticiones en curso por clase de ruta y
+        rechaza con 503 y Retry-After las que no consiguen cupo.
+        `classify` retorna la clase de la petición o None si está exenta.
+        """
+        self.app = app
+        self.limiters = limiters
+        self.classify = classify
+        self.rejection = orjson.dumps({"detail": "Server is overloaded, retry later."})
+        self.retry_after = str(retry_after_seconds).encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limiter = self.limiters.get(self.classify(scope))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            SHED_REQUESTS.labels(route_class=limiter.name, reason=e.reason).inc()
+            await self._reject(send)
+            return
+
+        status_code = 500
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.release(started, time.monotonic() - started, overloaded=status_code >= 500)
+
+    async def _reject(self, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(self.rejection)).encode()),
+                (b"retry-after", self.retry_after),
+            ],
+        })
+        await send({"type": "http.response.body", "body": self.rejection})
+
+
+def route_classifier(
+    *, exempt: set[str], overrides: dict[tuple[str, str], str]
+) -> Callable[[Scope], Optional[str]]:
+    """
+    Clasifica por ruta exacta (sin la barra final): las de `exempt` no se limitan,
+    las de `overrides` ((método, ruta) -> clase) van a su clase y el resto se reparte
+    por método: GET/HEAD -> "reads", los demás -> "writes". OPTIONS (preflight CORS) no se limita.
+    """
+    exempt = {path.rstrip("/") or "/" for path in exempt}
+    overrides = {(method, path.rstrip("/") or "/"): route_class for (method, path), route_class in overrides.items()}
+
+    def classify(scope: Scope) -> Optional[str]:
+        path = scope["path"].rstrip("/") or "/"
+        method = scope["method"]
+        if path in exempt or method == "OPTIONS":
+            return None
+        route_class = overrides.get((method, path))
+        if route_class is not None:
+            return route_class
+        return "reads" if method in ("GET", "HEAD") else "writes"
+
+    return classify
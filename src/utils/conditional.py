@@ -0,0 +1,67 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compara un encabezado If-None-Match con un ETag usando comparación débil
+    (RFC 9110 §13.1.2): se ignora el prefijo W/ en ambos lados.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+@dataclass(frozen=True)
+class Validators:
+    """Validadores de caché HTTP (ETag y Last-Modified) de una representación."""
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+    def is_not_modified(self, request: Request) -> bool:
+        """
+        Evalúa If-None-Match y, solo si no viene, If-Modified-Since (RFC 9110 §13.2.2).
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, self.etag)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            # Las fechas HTTP tienen resolución de segundos
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+
+def make_validators(kind: str, *parts: Any, last_modified: Optional[datetime] = None) -> Validators:
+    """
+    Construye un ETag débil a partir de las partes que definen la versión
+    de un recurso (marcas updated_at, conteos, versión de catálogos...).
+    """
+    digest = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:20]
+    return Validators(etag=f'W/"{kind}-{digest}"', last_modified=last_modified)
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+
+@dataclass(frozen=True)
+class Event:
+    """Evento publicado en un EventHub; se serializa como un frame de Server-Sent Events."""
+    type: str
+    data: dict[str, Any]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    def to_json(self) -> str:
+        return json.dumps({"id": self.id, "type": self.type, "data": self.data}, default=str)
+
+    @classmethod
+    def from_json(cls, payload: str) -> "Event":
+        raw = json.loads(payload)
+        return cls(id=raw["id"], type=raw["type"], data=raw["data"])
+
+    def encode(self) -> bytes:
+        data = json.dumps(self.data, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {data}\n\n".encode()
+
+
+# Marca que recibe un suscriptor cuando ya no puede garantizar que no se perdieron eventos
+RESET = object()
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, predicate: Callable[[Event], bool], max_queue: int):
+        """
+        Cola de eventos de un cliente. Los eventos se entregan en el hilo del event
+        loop del cliente, aunque se publiquen desde el threadpool de FastAPI.
+        """
+        self.loop = loop
+        self.predicate = predicate
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.closed = False
+
+    def _offer(self, event: Event) -> None:
+        if self.closed or not self.predicate(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Cliente demasiado lento: se descarta su cola y se le pide resincronizar.
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+
+
+class EventHub:
+    def __init__(self, buffer_size: int, max_queue: int = 500):
+        """
+        Distribuidor de eventos en proceso (fan-out) con un buffer circular de los
+        últimos `buffer_size` eventos, usado para reanudar con Last-Event-ID.
+        :param buffer_size: Eventos recientes que se conservan para reanudar
+        :param max_queue: Eventos pendientes por suscriptor antes de forzar un reset
+        """
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._buffer: deque[Event] = deque(maxlen=buffer_size)
+        self._subscribers: set[Subscription] = set()
+
+    def dispatch(self, event: Event) -> None:
+        """Guarda el evento en el buffer y lo entrega a todos los suscriptores. Seguro entre hilos."""
+        with self._lock:
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # El loop del suscriptor ya se cerró
+                self.unsubscribe(subscription)
+
+    def subscribe(
+        self,
+        predicate: Callable[[Event], bool] = lambda event: True,
+        last_event_id: Optional[str] = None,
+    ) -> tuple[Subscription, Optional[list[Event]]]:
+        """
+        Registra un suscriptor en el loop actual.
+        Retorna la suscripción y los eventos a reenviar después de `last_event_id`;
+        None si ese id ya salió del buffer (el cliente debe resincronizar).
+        El registro y la lectura del buffer son atómicos: no hay huecos ni duplicados.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), predicate, self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id is None:
+                return subscription, []
+            ids = [event.id for event in self._buffer]
+            if last_event_id not in ids:
+                return subscription, None
+            missed = list(self._buffer)[ids.index(last_event_id) + 1:]
+        return subscription, [event for event in missed if predicate(event)]
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def last_event_id(self) -> Optional[str]:
+        with self._lock:
+            return self._buffer[-1].id if self._buffer else None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
@@ -7,3 +7,7 @@ class RecordNotFoundError(Exception):
 class DuplicateRecordError(Exception):
     """Se lanza cuando se intenta crear un registro que viola una restricción de unicidad."""
     pass
+
+class ExpiredCursorError(Exception):
+    """Se lanza cuando un cursor apunta a cambios que ya se purgaron."""
+    pass
@@ -0,0 +1,186 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from fastapi import Header, HTTPException, Request, status
+from fastapi.exception_handlers import http_exception_handler
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from core.config import settings
+from db.session import SessionLocal, get_lock_engine
+from repositories import idempotency_key_repo
+from utils.threadpool import TimedRoute
+import logging
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+# Encabezados que no se guardan con la respuesta (los recalcula el servidor)
+_SKIPPED_HEADERS = {"content-length", "date", "server"}
+
+
+@dataclass
+class IdempotencyContext:
+    """Petición con Idempotency-Key en curso: dueño, llave y la conexión que tiene su lock."""
+    owner: str
+    key: str
+    request_hash: str
+    connection: Connection
+    session: Session
+
+    def close(self) -> None:
+        try:
+            idempotency_key_repo.unlock(self.session, owner=self.owner, key=self.key)
+        finally:
+            self.session.close()
+            self.connection.close()
+
+
+@dataclass
+class StoredResponse:
+    """Copia de la respuesta guardada: el objeto ORM no se puede leer tras commit y close."""
+    request_hash: str
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+
+
+class IdempotentReplay(Exception):
+    """La lanza la dependencia cuando la llave ya tiene respuesta; IdempotentRoute la devuelve."""
+    def __init__(self, response: Response):
+        self.response = response
+
+
+def _request_hash(request: Request, body: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.url.path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _acquire(owner: str, key: str, request_hash: str) -> IdempotencyContext:
+    """
+    Espera a que termine otra petición con la misma llave y revisa si ya hay respuesta.
+    Lanza IdempotentReplay con la respuesta guardada o HTTPException si no se puede continuar.
+    """
+    try:
+        connection = get_lock_engine().connect()
+    except PoolTimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many requests with Idempotency-Key in progress.",
+            headers={"Retry-After": str(settings.CONCURRENCY_RETRY_AFTER_SECONDS)},
+        )
+    session = SessionLocal(bind=connection)
+    if not idempotency_key_repo.lock(
+        session, owner=owner, key=key, timeout_seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS
+    ):
+        session.close()
+        connection.close()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed.",
+        )
+    context = IdempotencyContext(owner, key, request_hash, connection, session)
+    try:
+        row = idempotency_key_repo.get_active(session, owner=owner, key=key)
+        # Se copia antes del commit, que expira los atributos (expire_on_commit)
+        stored = None if row is None else StoredResponse(
+            request_hash=row.request_hash, status_code=row.status_code, headers=dict(row.headers), body=bytes(row.body),
+        )
+        session.commit()
+    except Exception:
+        context.close()
+        raise
+    if stored is None:
+        return context
+
+    context.close()
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="This Idempotency-Key was already used with a different request.",
+        )
+    logger.info("Replaying stored response for Idempotency-Key %s", key)
+    raise IdempotentReplay(Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        headers={**stored.headers, REPLAYED_HEADER: "true"},
+    ))
+
+
+def _store_and_release(context: IdempotencyContext, response: Optional[Response]) -> None:
+    """Guarda la respuesta (salvo errores 5xx, que se pueden reintentar) y suelta el lock."""
+    try:
+        if response is not None and response.status_code < 500 and hasattr(response, "body"):
+            idempotency_key_repo.save(
+                context.session,
+                owner=context.owner,
+                key=context.key,
+                request_hash=context.request_hash,
+                status_code=response.status_code,
+                headers={
+                    name: value for name, value in response.headers.items() if name not in _SKIPPED_HEADERS
+                },
+                body=bytes(response.body),
+                ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            )
+    except Exception:
+        logger.exception("Could not store response for Idempotency-Key %s", context.key)
+        context.session.rollback()
+    finally:
+        context.close()
+
+
+async def idempotency_key(
+    request: Request,
+    key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+) -> Optional[str]:
+    """
+    Dependencia para los POST que aceptan Idempotency-Key. Debe declararse después
+    de la de permisos: la llave es por usuario (request.state.current_user).
+    Sin encabezado no hace nada. Requiere que el router use IdempotentRoute.
+    """
+    if not key:
+        return None
+    current_user = getattr(request.state, "current_user", None) or {}
+    owner = str(current_user.get("user_id") or current_user.get("user_email") or "anonymous")
+    request_hash = _request_hash(request, await request.body())
+    request.state.idempotency = await run_in_threadpool(_acquire, owner, key, request_hash)
+    return key
+
+
+class IdempotentRoute(TimedRoute):
+    """
+    Clase de ruta que completa la dependencia idempotency_key: devuelve la
+    respuesta guardada en los reintentos y guarda la primera respuesta,
+    incluidas las de HTTPException (p. ej. un 409 por duplicado).
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            response = None
+            try:
+                response = await handler(request)
+                return response
+            except IdempotentReplay as replay:
+                return replay.response
+            except HTTPException as e:
+                if getattr(request.state, "idempotency", None) is None:
+                    raise
+                response = await http_exception_handler(request, e)
+                return response
+            finally:
+                context = getattr(request.state, "idempotency", None)
+                if context is not None:
+                    request.state.idempotency = None
+                    await run_in_threadpool(_store_and_release, context, response)
+
+        return idempotent_handler
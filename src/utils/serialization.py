@@ -0,0 +1,32 @@
+from functools import lru_cache
+from typing import Any, Optional
+
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+
+# Acotado: los esquemas de `fields=` se crean por combinación de campos y no deben acumularse
+@lru_cache(maxsize=512)
+def get_adapter(response_type: Any) -> TypeAdapter:
+    """TypeAdapter por tipo de respuesta, construido una sola vez por proceso (LRU acotado)."""
+    return TypeAdapter(response_type)
+
+
+def serialize_response(
+    response_type: Any,
+    content: Any,
+    *,
+    status_code: int = 200,
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """
+    Valida `content` (objetos ORM u otros con atributos) contra `response_type`
+    y lo escribe directamente a bytes JSON desde pydantic-core, sin pasar por
+    diccionarios intermedios ni por jsonable_encoder.
+
+    Pensado para respuestas de listas grandes; el `response_model` de la ruta
+    se mantiene para la documentación OpenAPI.
+    """
+    adapter = get_adapter(response_type)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
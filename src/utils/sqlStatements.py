@@ -0,0 +1,51 @@
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SQL_STATEMENT_COUNT_HEADER = b"x-sql-statement-count"
+
+# Contador de la petición en curso. Es una lista (mutable) porque los handlers síncronos
+# corren en hilos con una copia del contexto: la copia apunta a la misma lista.
+_statements: ContextVar[Optional[list[int]]] = ContextVar("sql_statements", default=None)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class SqlStatementCountMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Middleware ASGI que cuenta las sentencias SQL de cada petición y las devuelve en
+        X-SQL-Statement-Count. Es para pruebas de carga y benchmarks (SQL_STATEMENT_COUNT_HEADER):
+        el encabezado sale al empezar la respuesta, así que no cuenta lo que corra después
+        (p. ej. el cuerpo de un StreamingResponse).
+        """
+        self.app = app
+        if not event.contains(Engine, "before_cursor_execute", _count_statement):
+            event.listen(Engine, "before_cursor_execute", _count_statement)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = [0]
+        token = _statements.set(counter)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((SQL_STATEMENT_COUNT_HEADER, str(counter[0]).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _statements.reset(token)
@@ -1,28 +1,34 @@
+import atexit
+import os
+import re
 import time
-from typing import Tuple
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
 
 from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import \
-    OTLPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.logging import LoggingInstrumentor
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
 from prometheus_client.openmetrics.exposition import (CONTENT_TYPE_LATEST,
                                                       generate_latest)
-from starlette.middleware.base import (BaseHTTPMiddleware,
-                                       RequestResponseEndpoint)
+from sqlalchemy.engine import Engine
 from starlette.requests import Request
 from starlette.responses import Response
 from starlette.routing import Match
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+
+
+# Con varios workers (uvicorn --workers / gunicorn) cada proceso escribe sus métricas
+# en archivos de este directorio y /metrics los agrega. prometheus_client lo lee del
+# entorno al importarse: debe existir (y estar vacío) antes de arrancar los workers.
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
 
 INFO = Gauge(
     "fastapi_app_info", "FastAPI application information.", [
-        "app_name"]
+        "app_name"], multiprocess_mode="max"
 )
 REQUESTS = Counter(
     "fastapi_requests_total", "Total count of requests by method and path.", [
@@ -47,67 +53,176 @@ REQUESTS_IN_PROGRESS = Gauge(
     "fastapi_requests_in_progress",
     "Gauge of requests by method and path currently being processed",
     ["method", "path", "app_name"],
+    # Suma de los workers vivos: los de procesos muertos se descartan
+    multiprocess_mode="livesum",
 )
 
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp, app_name: str = "fastapi-app") -> None:
-        super().__init__(app)
+class _RouteMetrics:
+    """Hijos de las métricas ya ligados a (método, plantilla de ruta, app)."""
+    __slots__ = ("labels", "requests", "in_progress", "duration", "responses", "exceptions")
+
+    def __init__(self, method: str, path: str, app_name: str):
+        self.labels = {"method": method, "path": path, "app_name": app_name}
+        self.requests = REQUESTS.labels(**self.labels)
+        self.in_progress = REQUESTS_IN_PROGRESS.labels(**self.labels)
+        self.duration = REQUESTS_PROCESSING_TIME.labels(**self.labels)
+        self.responses: dict[int, Counter] = {}
+        self.exceptions: dict[str, Counter] = {}
+
+    def response(self, status_code: int) -> Counter:
+        child = self.responses.get(status_code)
+        if child is None:
+            child = self.responses[status_code] = RESPONSES.labels(status_code=status_code, **self.labels)
+        return child
+
+    def exception(self, exception_type: str) -> Counter:
+        child = self.exceptions.get(exception_type)
+        if child is None:
+            child = self.exceptions[exception_type] = EXCEPTIONS.labels(exception_type=exception_type, **self.labels)
+        return child
+
+
+# Segmentos numéricos de la ruta (ids): /employees/123 y /employees/456 comparten entrada en la caché
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+class PrometheusMiddleware:
+    def __init__(self, app: ASGIApp, app_name: str = "fastapi-app", cache_size: int = 1024) -> None:
+        """
+        Middleware ASGI puro que mide peticiones por método y plantilla de ruta.
+        La plantilla se resuelve una vez por (método, ruta con los ids normalizados)
+        y se guarda en una caché LRU; las rutas que no existen (404) no se miden.
+        """
+        self.app = app
         self.app_name = app_name
+        self.cache_size = cache_size
+        self._templates: OrderedDict[tuple[str, str], Optional[str]] = OrderedDict()
+        self._children: dict[tuple[str, str], _RouteMetrics] = {}
         INFO.labels(app_name=self.app_name).inc()
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        method = request.method
-        path, is_handled_path = self.get_path(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_metrics = self.get_route_metrics(scope)
+        if route_metrics is None:
+            await self.app(scope, receive, send)
+            return
 
-        if not is_handled_path:
-            return await call_next(request)
+        status_code = HTTP_500_INTERNAL_SERVER_ERROR
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-        REQUESTS_IN_PROGRESS.labels(
-            method=method, path=path, app_name=self.app_name).inc()
-        REQUESTS.labels(method=method, path=path, app_name=self.app_name).inc()
+        route_metrics.in_progress.inc()
+        route_metrics.requests.inc()
         before_time = time.perf_counter()
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except BaseException as e:
             status_code = HTTP_500_INTERNAL_SERVER_ERROR
-            EXCEPTIONS.labels(method=method, path=path, exception_type=type(
-                e).__name__, app_name=self.app_name).inc()
-            raise e from None
+            route_metrics.exception(type(e).__name__).inc()
+            raise
         else:
-            status_code = response.status_code
-            after_time = time.perf_counter()
-            # retrieve trace id for exemplar
-            span = trace.get_current_span()
-            trace_id = trace.format_trace_id(
-                span.get_span_context().trace_id)
-
-            REQUESTS_PROCESSING_TIME.labels(method=method, path=path, app_name=self.app_name).observe(
-                after_time - before_time, exemplar={'TraceID': trace_id}
-            )
+            # retrieve trace id for exemplar (solo de trazas muestreadas, que sí se exportan)
+            span_context = trace.get_current_span().get_span_context()
+            exemplar = None
+            if span_context.trace_flags.sampled:
+                exemplar = {'TraceID': trace.format_trace_id(span_context.trace_id)}
+            route_metrics.duration.observe(time.perf_counter() - before_time, exemplar=exemplar)
         finally:
-            RESPONSES.labels(method=method, path=path,
-                             status_code=status_code, app_name=self.app_name).inc()
-            REQUESTS_IN_PROGRESS.labels(
-                method=method, path=path, app_name=self.app_name).dec()
+            route_metrics.response(status_code).inc()
+            route_metrics.in_progress.dec()
 
-        return response
+    def get_route_metrics(self, scope: Scope) -> Optional[_RouteMetrics]:
+        method = scope["method"]
+        key = (method, _NUMERIC_SEGMENT.sub("/0", scope["path"]))
+        try:
+            template = self._templates[key]
+            self._templates.move_to_end(key)
+        except KeyError:
+            template = self._templates[key] = self.get_path(scope)
+            if len(self._templates) > self.cache_size:
+                self._templates.popitem(last=False)
+        if template is None:
+            return None
+        route_metrics = self._children.get((method, template))
+        if route_metrics is None:
+            route_metrics = self._children[(method, template)] = _RouteMetrics(method, template, self.app_name)
+        return route_metrics
 
     @staticmethod
-    def get_path(request: Request) -> Tuple[str, bool]:
-        for route in request.app.routes:
-            match, child_scope = route.matches(request.scope)
+    def get_path(scope: Scope) -> Optional[str]:
+        """Plantilla de la primera ruta que coincide por completo (o None si ninguna)."""
+        for route in scope["app"].routes:
+            match, child_scope = route.matches(scope)
             if match == Match.FULL:
-                return route.path, True
+                return route.path
+        return None
+
+
+def _metrics_registry() -> CollectorRegistry:
+    """En modo multiproceso, un registro que agrega los archivos de todos los workers."""
+    if MULTIPROCESS_DIR is None:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=MULTIPROCESS_DIR)
+    return registry
+
+METRICS_REGISTRY = _metrics_registry()
 
-        return request.url.path, False
+if MULTIPROCESS_DIR is not None:
+    # Al salir un worker se borran sus gauges "live*"; os.getpid() se evalúa al salir
+    # para que valga también en procesos creados con fork después de importar.
+    atexit.register(lambda: multiprocess.mark_process_dead(os.getpid(), MULTIPROCESS_DIR))
 
 
 def metrics(request: Request) -> Response:
-    return Response(generate_latest(REGISTRY), headers={"Content-Type": CONTENT_TYPE_LATEST})
+    return Response(generate_latest(METRICS_REGISTRY), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+def instrument_app(app: ASGIApp) -> None:
+    """
+    Agrega el middleware de OpenTelemetry; debe llamarse al crear la app (antes de
+    que arranque). Sin tracer_provider usa el proxy global, que empieza a delegar en
+    el proveedor real cuando setting_otlp lo registra durante el lifespan.
+    """
+    FastAPIInstrumentor.instrument_app(app)
+
+
+def setting_otlp(
+    app_name: str,
+    endpoint: str,
+    log_correlation: bool = True,
+    *,
+    engine: Optional[Engine] = None,
+    sample_ratio: float = 1.0,
+    slow_request_seconds: float = 1.0,
+    max_queue_size: int = 2048,
+    max_export_batch_size: int = 512,
+    schedule_delay_millis: int = 5000,
+    export_timeout_millis: int = 30000,
+    tail_buffer_max_traces: int = 1000,
+) -> "TracerProvider":
+    """
+    Registra el proveedor de trazas con su exportador OTLP e instrumenta SQLAlchemy y httpx.
+    Se llama en el arranque (lifespan): los módulos del exportador gRPC son los más
+    pesados de importar y no hacen falta para que el proceso cargue la app.
+    Retorna el TracerProvider para vaciarlo y cerrarlo al apagar.
+    """
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+    from opentelemetry.instrumentation.logging import LoggingInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
+    from utils.tracing import TailSpanProcessor, build_sampler
 
-def setting_otlp(app: ASGIApp, app_name: str, endpoint: str, log_correlation: bool = True) -> None:
     # Setting OpenTelemetry
     # set the service name to show in traces
     resource = Resource.create(attributes={
@@ -115,14 +230,31 @@ def setting_otlp(app: ASGIApp, app_name: str, endpoint: str, log_correlation: bo
         "compose_service": app_name
     })
 
-    # set the tracer provider
-    tracer = TracerProvider(resource=resource)
+    # set the tracer provider: muestreo por proporción respetando al padre; las trazas
+    # no muestreadas se graban y solo se exportan si terminan en error o son lentas
+    tracer = TracerProvider(resource=resource, sampler=build_sampler(sample_ratio))
     trace.set_tracer_provider(tracer)
 
-    tracer.add_span_processor(BatchSpanProcessor(
-        OTLPSpanExporter(endpoint=endpoint)))
+    # La cola del BatchSpanProcessor es acotada: si el exportador no da abasto se
+    # descartan spans en lugar de frenar las peticiones
+    tracer.add_span_processor(TailSpanProcessor(
+        BatchSpanProcessor(
+            OTLPSpanExporter(endpoint=endpoint),
+            max_queue_size=max_queue_size,
+            max_export_batch_size=max_export_batch_size,
+            schedule_delay_millis=schedule_delay_millis,
+            export_timeout_millis=export_timeout_millis,
+        ),
+        slow_threshold_seconds=slow_request_seconds,
+        max_traces=tail_buffer_max_traces,
+    ))
 
     if log_correlation:
         LoggingInstrumentor().instrument(set_logging_format=True)
 
-    FastAPIInstrumentor.instrument_app(app, tracer_provider=tracer)
\ No newline at end of file
+    # Consultas SQL y llamadas HTTP salientes (p. ej. check-authorization) como spans hijos.
+    # httpx se instrumenta antes de crear el cliente compartido de auth.
+    if engine is not None:
+        SQLAlchemyInstrumentor().instrument(engine=engine, tracer_provider=tracer)
+    HTTPXClientInstrumentor().instrument(tracer_provider=tracer)
+    return tracer
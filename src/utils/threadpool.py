@@ -0,0 +1,106 @@
+import functools
+import inspect
+import time
+from typing import Any, Callable, Optional
+
+import anyio
+from anyio import CapacityLimiter
+from fastapi.routing import APIRoute
+from prometheus_client import Gauge, Histogram
+
+# Con varios workers se suman los de los procesos vivos
+THREADPOOL_CAPACITY = Gauge(
+    "http_threadpool_capacity", "Threads available to run sync route handlers.", multiprocess_mode="livesum"
+)
+THREADPOOL_BUSY = Gauge(
+    "http_threadpool_busy", "Threads currently running a sync route handler.", multiprocess_mode="livesum"
+)
+THREADPOOL_WAITING = Gauge(
+    "http_threadpool_waiting", "Requests waiting for a thread to run their sync handler.", multiprocess_mode="livesum"
+)
+REQUEST_PHASE_TIME = Histogram(
+    "fastapi_requests_phase_duration_seconds",
+    "Time of sync route handlers by phase: waiting for a thread (thread_wait) and running (handler).",
+    ["method", "path", "phase"],
+)
+
+_handler_limiter: Optional[CapacityLimiter] = None
+
+
+def configure_handler_threadpool(capacity: int) -> None:
+    """
+    Fija los hilos para los handlers síncronos de las rutas con TimedRoute.
+    Se dimensiona con el pool de SQLAlchemy (pool_size + max_overflow): con más hilos
+    que conexiones las peticiones sobrantes solo esperan el checkout ocupando un hilo.
+    """
+    global _handler_limiter
+    _handler_limiter = CapacityLimiter(capacity)
+    THREADPOOL_CAPACITY.set(capacity)
+
+
+def _handler_threadpool() -> CapacityLimiter:
+    if _handler_limiter is None:
+        configure_handler_threadpool(40)  # el mismo valor por defecto de AnyIO
+    return _handler_limiter
+
+
+def _timed(endpoint: Callable, method: str, path: str) -> Callable:
+    """
+    Envuelve un handler síncrono en uno async que lo corre en el pool de hilos propio
+    y mide por separado la espera por un hilo y la ejecución.
+    functools.wraps conserva la firma, así que FastAPI resuelve las dependencias igual.
+    """
+    # Los hijos se ligan en la primera llamada: la ruta del APIRouter (sin el prefijo
+    # de include_router) nunca se llama y no debe dejar series vacías
+    phases: dict[str, Any] = {}
+
+    @functools.wraps(endpoint)
+    async def run_in_handler_threadpool(*args: Any, **kwargs: Any) -> Any:
+        if not phases:
+            phases["thread_wait"] = REQUEST_PHASE_TIME.labels(method=method, path=path, phase="thread_wait")
+            phases["handler"] = REQUEST_PHASE_TIME.labels(method=method, path=path, phase="handler")
+        wait_time, handler_time = phases["thread_wait"], phases["handler"]
+        queued_at = time.perf_counter()
+        started_at = None
+
+        def call() -> Any:
+            nonlocal started_at
+            started_at = time.perf_counter()
+            THREADPOOL_WAITING.dec()
+            THREADPOOL_BUSY.inc()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                THREADPOOL_BUSY.dec()
+                handler_time.observe(time.perf_counter() - started_at)
+
+        THREADPOOL_WAITING.inc()
+        try:
+            return await anyio.to_thread.run_sync(call, limiter=_handler_threadpool())
+        finally:
+            if started_at is None:
+                # Se canceló (p. ej. se desconectó el cliente) antes de conseguir hilo
+                THREADPOOL_WAITING.dec()
+                wait_time.observe(time.perf_counter() - queued_at)
+            else:
+                wait_time.observe(started_at - queued_at)
+
+    run_in_handler_threadpool.__timed_endpoint__ = endpoint
+    return run_in_handler_threadpool
+
+
+class TimedRoute(APIRoute):
+    """
+    Clase de ruta que corre los handlers síncronos en un pool de hilos dimensionado
+    con el pool de la base de datos (configure_handler_threadpool) en vez del de 40
+    hilos de AnyIO, y exporta los hilos ocupados, la cola y el tiempo de cada fase.
+    Los handlers async y las dependencias no cambian.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        # include_router vuelve a crear la ruta con el endpoint ya envuelto: se parte del original
+        endpoint = getattr(endpoint, "__timed_endpoint__", endpoint)
+        if inspect.isfunction(endpoint) and not inspect.iscoroutinefunction(endpoint):
+            methods = kwargs.get("methods") or ["GET"]
+            endpoint = _timed(endpoint, ",".join(sorted(m.upper() for m in methods)), path)
+        super().__init__(path, endpoint, **kwargs)
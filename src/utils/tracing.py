@@ -0,0 +1,164 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.sampling import (Decision, ParentBased, Sampler,
+                                              SamplingResult, TraceIdRatioBased)
+from opentelemetry.trace import Link, SpanContext, SpanKind, StatusCode, TraceFlags, get_current_span
+from opentelemetry.util.types import Attributes
+
+
+class RecordOnlySampler(Sampler):
+    """Graba el span sin marcarlo como muestreado: solo se exporta si TailSpanProcessor lo promueve."""
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state=None,
+    ) -> SamplingResult:
+        parent_span_context = get_current_span(parent_context).get_span_context()
+        return SamplingResult(
+            Decision.RECORD_ONLY,
+            attributes,
+            parent_span_context.trace_state if parent_span_context.is_valid else None,
+        )
+
+    def get_description(self) -> str:
+        return "RecordOnlySampler"
+
+
+class RatioOrRecordSampler(Sampler):
+    """Muestrea por trace_id en la proporción dada; el resto de las trazas se graban sin muestrear."""
+
+    def __init__(self, ratio: float):
+        self._ratio = TraceIdRatioBased(ratio)
+        self._record_only = RecordOnlySampler()
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state=None,
+    ) -> SamplingResult:
+        result = self._ratio.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+        if result.decision.is_sampled():
+            return result
+        return self._record_only.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+
+    def get_description(self) -> str:
+        return f"RatioOrRecordSampler{{{self._ratio.rate}}}"
+
+
+def build_sampler(ratio: float) -> Sampler:
+    """
+    Respeta la decisión del padre cuando viene muestreado; las trazas nuevas se muestrean
+    con `ratio` y todas las demás (incluidas las de un padre no muestreado) se graban
+    sin exportar para que TailSpanProcessor pueda rescatar errores y peticiones lentas.
+    """
+    record_only = RecordOnlySampler()
+    return ParentBased(
+        root=RatioOrRecordSampler(ratio),
+        remote_parent_not_sampled=record_only,
+        local_parent_not_sampled=record_only,
+    )
+
+
+def _as_sampled(span: ReadableSpan) -> ReadableSpan:
+    """Copia del span con la marca de muestreado, que BatchSpanProcessor exige para exportarlo."""
+    context = span.context
+    return ReadableSpan(
+        name=span.name,
+        context=SpanContext(
+            context.trace_id,
+            context.span_id,
+            is_remote=context.is_remote,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED),
+            trace_state=context.trace_state,
+        ),
+        parent=span.parent,
+        resource=span.resource,
+        attributes=span.attributes,
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+class TailSpanProcessor(SpanProcessor):
+    def __init__(
+        self,
+        delegate: SpanProcessor,
+        *,
+        slow_threshold_seconds: float,
+        max_traces: int = 1000,
+        max_spans_per_trace: int = 256,
+    ):
+        """
+        Envía a `delegate` los spans muestreados y guarda en memoria los de las trazas
+        grabadas sin muestrear. Cuando termina el span raíz local de una de esas
+        trazas, la exporta completa si terminó en error (o 5xx) o tardó más de
+        `slow_threshold_seconds`; si no, la descarta.
+        El buffer está acotado: se descartan las trazas más antiguas y los spans de más.
+        """
+        self.delegate = delegate
+        self.slow_threshold_ns = int(slow_threshold_seconds * 1e9)
+        self.max_traces = max_traces
+        self.max_spans_per_trace = max_spans_per_trace
+        self._traces: OrderedDict[int, list[ReadableSpan]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        self.delegate.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context.trace_flags.sampled:
+            self.delegate.on_end(span)
+            return
+
+        trace_id = span.context.trace_id
+        is_local_root = span.parent is None or span.parent.is_remote
+        with self._lock:
+            if not is_local_root:
+                spans = self._traces.get(trace_id)
+                if spans is None:
+                    spans = self._traces[trace_id] = []
+                    if len(self._traces) > self.max_traces:
+                        self._traces.popitem(last=False)
+                if len(spans) < self.max_spans_per_trace:
+                    spans.append(span)
+                return
+            spans = self._traces.pop(trace_id, [])
+
+        if self._should_keep(span):
+            for buffered in spans:
+                self.delegate.on_end(_as_sampled(buffered))
+            self.delegate.on_end(_as_sampled(span))
+
+    def _should_keep(self, span: ReadableSpan) -> bool:
+        if span.status.status_code == StatusCode.ERROR:
+            return True
+        status_code = (span.attributes or {}).get("http.status_code")
+        if isinstance(status_code, int) and status_code >= 500:
+            return True
+        return span.end_time - span.start_time >= self.slow_threshold_ns
+
+    def shutdown(self) -> None:
+        self.delegate.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.delegate.force_flush(timeout_millis)
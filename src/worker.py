@@ -0,0 +1,121 @@
+import argparse
+import os
+import signal
+import socket
+import threading
+
+from prometheus_client import start_http_server
+
+from core.config import settings
+from core.logger import setup_logging
+from db.session import SessionLocal, get_engine
+from repositories import job_repo, idempotency_key_repo, change_log_repo
+from services.jobs import JOB_TYPES, job_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+def run_slot(worker_id: str, stop: threading.Event, once: bool = False):
+    """
+    Un hilo del worker: toma trabajos de cualquier tipo con cupo libre, uno a la vez.
+    La sesión queda atada a una sola conexión porque los cupos por tipo son
+    advisory locks de sesión de PostgreSQL: se toman y se sueltan en la misma conexión.
+    """
+    types = list(JOB_TYPES.values())
+    connection = get_engine().connect()
+    db_session = SessionLocal(bind=connection)
+    try:
+        while not stop.is_set():
+            try:
+                ran = job_service.run_next(db_session, worker_id, types)
+            except Exception:
+                logger.exception("Worker %s loop failed", worker_id)
+                db_session.rollback()
+                ran = False
+            # Rotar el orden para que un tipo con mucha cola no acapare el hilo
+            types = types[1:] + types[:1]
+            if once and not ran:
+                break
+            if not ran:
+                stop.wait(settings.WORKER_POLL_INTERVAL_SECONDS)
+    finally:
+        db_session.close()
+        connection.close()
+
+def run_monitor(worker_ids: list[str], stop: threading.Event):
+    """
+    Renueva el latido de los trabajos en curso, falla los abandonados, purga las
+    llaves de idempotencia y los cambios de GET /changes vencidos y actualiza las
+    métricas de la cola.
+    """
+    interval = max(settings.JOB_STALE_SECONDS / 4, 1)
+    while not stop.is_set():
+        db_session = SessionLocal()
+        try:
+            job_repo.heartbeat(db_session, worker_ids=worker_ids)
+            stale = job_repo.fail_stale(db_session, stale_seconds=settings.JOB_STALE_SECONDS)
+            if stale:
+                logger.warning("Marked %s stale jobs as failed", stale)
+            idempotency_key_repo.purge_expired(db_session)
+            purged = change_log_repo.purge_expired(db_session, retention_days=settings.CHANGE_LOG_RETENTION_DAYS)
+            if purged:
+                logger.info("Purged %s expired change log entries", purged)
+            job_service.update_queue_metrics(db_session)
+        except Exception:
+            logger.exception("Worker monitor failed")
+            db_session.rollback()
+        finally:
+            db_session.close()
+        stop.wait(min(interval, settings.WORKER_POLL_INTERVAL_SECONDS * 5))
+
+def run_worker(once: bool = False):
+    """
+    Ejecuta los trabajos en segundo plano con WORKER_CONCURRENCY hilos.
+    Los límites por tipo se cumplen entre todos los workers (advisory locks),
+    así que se pueden correr varias instancias. SIGTERM deja terminar los trabajos en curso.
+    """
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    base_id = f"{socket.gethostname()}-{os.getpid()}"
+    worker_ids = [f"{base_id}-{n}" for n in range(settings.WORKER_CONCURRENCY)]
+
+    monitor = None
+    if not once:
+        start_http_server(settings.WORKER_METRICS_PORT)
+        monitor = threading.Thread(target=run_monitor, args=(worker_ids, stop), name="job-monitor", daemon=True)
+        monitor.start()
+    if settings.AVAILABILITY_EVENTS_BACKEND != "postgres":
+        logger.warning(
+            "AVAILABILITY_EVENTS_BACKEND=%s: availabilities created by jobs will not reach "
+            "/availabilities/stream, which only receives events from other processes via postgres",
+            settings.AVAILABILITY_EVENTS_BACKEND,
+        )
+    print(f"Running jobs ({', '.join(JOB_TYPES)}) with {len(worker_ids)} threads...")
+
+    slots = [
+        threading.Thread(target=run_slot, args=(worker_id, stop, once), name=f"job-{worker_id}")
+        for worker_id in worker_ids
+    ]
+    for slot in slots:
+        slot.start()
+    for slot in slots:
+        slot.join()
+    stop.set()
+    if monitor is not None:
+        monitor.join()
+    print("Worker stopped.")
+
+# Punto de entrada: python -m worker [--once]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ejecuta los trabajos en segundo plano encolados por la API.")
+    parser.add_argument("--once", action="store_true", help="Ejecuta lo que haya en cola y termina (sin servidor de métricas).")
+    args = parser.parse_args()
+    setup_logging(
+        settings.APP_NAME,
+        level=settings.LOG_LEVEL,
+        levels=settings.LOG_LEVELS,
+        fmt=settings.LOG_FORMAT,
+        queue_size=settings.LOG_QUEUE_SIZE,
+    )
+    run_worker(once=args.once)
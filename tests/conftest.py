@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from main import app
 from db.session import SessionLocal, get_db, engine
+from services.parametricCache import parametric_cache
 # Se importa Base y todos los modelos para que Base.metadata los conozca
 import models 
 
@@ -46,5 +47,8 @@ def client(db: Session) -> TestClient:
         yield db
 
     app.dependency_overrides[get_db] = override_get_db
+    # Cada test revierte su transacción; la caché no debe sobrevivir entre tests.
+    parametric_cache.invalidate()
     yield TestClient(app)
-    del app.dependency_overrides[get_db] 
\ No newline at end of file
+    del app.dependency_overrides[get_db]
+    parametric_cache.invalidate()
@@ -0,0 +1,97 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import parametric, Employee, DailyAvailability, ChangeLog
+from repositories import change_log_repo
+
+@pytest.fixture
+def employee(db: Session):
+    doc_type = parametric.DocumentType(name="DocType Changes Test")
+    gender = parametric.Gender(name="Gender Changes Test")
+    role = parametric.OperationalRole(name="Rol Changes Test")
+    status = parametric.AvailabilityStatus(name="Estado Changes Test")
+    db.add_all([doc_type, gender, role, status])
+    db.commit()
+    employee = Employee(
+        document_number="CHG-1", full_name="Empleado Cambios", birth_date=date(1990, 1, 1),
+        hire_date=date(2024, 1, 1), document_type_id=doc_type.id, gender_id=gender.id,
+        operational_role_id=role.id,
+    )
+    db.add(employee)
+    db.commit()
+    return employee, status
+
+def test_changes_include_inserts_updates_and_tombstones(client: TestClient, db: Session, employee):
+    employee, status = employee
+    cursor = client.get("/changes").json()["next_cursor"]
+
+    availability = DailyAvailability(employee_id=employee.id, date=date.today(), status_id=status.id)
+    db.add(availability)
+    db.commit()
+    availability_id, employee_id = availability.id, employee.id
+    client.put(f"/employees/{employee_id}", json={"full_name": "Empleado Renombrado"})
+    client.delete(f"/employees/{employee_id}")
+
+    response = client.get(f"/changes?since={cursor}")
+    assert response.status_code == 200
+    changes = [(c["entity"], c["entity_id"], c["operation"]) for c in response.json()["changes"]]
+    assert changes == [
+        ("daily_availability", availability_id, "insert"),
+        ("employee", employee_id, "update"),
+        # ON DELETE CASCADE borra las disponibilidades después de la fila del empleado
+        ("employee", employee_id, "delete"),
+        ("daily_availability", availability_id, "delete"),
+    ]
+    update = response.json()["changes"][1]
+    assert update["data"]["full_name"] == "Empleado Renombrado"
+    assert response.json()["changes"][2]["data"] is None
+
+def test_changes_are_keyset_paginated(client: TestClient, employee):
+    employee, _ = employee
+    for i in range(3):
+        client.put(f"/employees/{employee.id}", json={"full_name": f"Nombre {i}"})
+
+    first = client.get("/changes?limit=2").json()
+    assert len(first["changes"]) == 2
+    assert first["has_more"] is True
+
+    seen = [c["seq"] for c in first["changes"]]
+    cursor = first["next_cursor"]
+    while True:
+        page = client.get(f"/changes?since={cursor}&limit=2").json()
+        seen += [c["seq"] for c in page["changes"]]
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+    assert len(seen) == len(set(seen))
+    # Al final del feed, el cursor no cambia y no hay más cambios
+    assert client.get(f"/changes?since={cursor}").json()["changes"] == []
+    assert client.get("/changes/cursor").json()["cursor"] == cursor
+
+def test_changes_rejects_invalid_cursor(client: TestClient):
+    assert client.get("/changes?since=not-a-cursor").status_code == 400
+
+def test_purge_keeps_recent_changes_and_expires_older_cursors(client: TestClient, db: Session, employee):
+    employee, _ = employee
+    # Cambios de transacciones viejas ya terminadas (tx_id menor que cualquiera en curso)
+    old = [
+        ChangeLog(tx_id=tx_id, entity="employee", entity_id=employee.id, operation="update",
+                  data={}, changed_at=func.now() - timedelta(days=40))
+        for tx_id in (1, 2)
+    ]
+    db.add_all(old)
+    db.commit()
+    stale_cursor = f"1-{old[0].id}"
+    assert client.get(f"/changes?since={stale_cursor}").status_code == 200
+
+    assert change_log_repo.purge_expired(db, retention_days=30) == 2
+    assert change_log_repo.purge_expired(db, retention_days=30) == 0
+
+    response = client.get(f"/changes?since={stale_cursor}")
+    assert response.status_code == 410
+    # Los cambios recientes (el alta del empleado) siguen en el feed
+    changes = client.get("/changes").json()["changes"]
+    assert ("employee", employee.id, "insert") in [(c["entity"], c["entity_id"], c["operation"]) for c in changes]
+    assert client.get(f"/changes?since={client.get('/changes/cursor').json()['cursor']}").status_code == 200
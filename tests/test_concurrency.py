@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from utils.concurrency import AdaptiveLimiter, ConcurrencyLimitMiddleware, Overloaded, route_classifier
+
+def make_limiter(**overrides) -> AdaptiveLimiter:
+    options = dict(min_limit=1, max_limit=2, target_latency=0.1, queue_size=1, queue_timeout=0.05)
+    options.update(overrides)
+    return AdaptiveLimiter("test", **options)
+
+def test_limiter_queues_then_sheds():
+    async def scenario():
+        limiter = make_limiter()
+        await limiter.acquire()
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as full:
+            await limiter.acquire()
+        assert full.value.reason == "queue_full"
+
+        limiter.release(started=0, latency=0.01)
+        await queued
+        assert limiter.in_flight == 2
+
+        with pytest.raises(Overloaded) as timeout:
+            await limiter.acquire()
+        assert timeout.value.reason == "queue_timeout"
+        assert limiter.in_flight == 2
+
+    asyncio.run(scenario())
+
+def test_limit_decreases_on_slow_responses_once_per_round_and_recovers():
+    limiter = make_limiter(max_limit=10, min_limit=2, backoff=0.5)
+    limiter.in_flight = 3
+    limiter.release(started=1.0, latency=1.0)
+    assert limiter.limit == 5
+    # Empezó antes de la reducción: no vuelve a reducir
+    limiter.release(started=0.5, latency=1.0)
+    assert limiter.limit == 5
+
+    limiter.in_flight = 5
+    limiter.release(started=10**9, latency=0.01)
+    assert limiter.limit == pytest.approx(5.2)
+    # Sin el límite copado, las respuestas rápidas no lo hacen crecer
+    limiter.release(started=10**9, latency=0.01)
+    assert limiter.limit == pytest.approx(5.2)
+
+def test_middleware_rejects_with_retry_after_and_skips_exempt_paths():
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(0.1)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    classify = route_classifier(exempt={"/metrics"}, overrides={("GET", "/report"): "reports"})
+    middleware = ConcurrencyLimitMiddleware(
+        slow_app, limiters={"reads": make_limiter(max_limit=1, queue_size=0)}, classify=classify, retry_after_seconds=2
+    )
+
+    async def call(path):
+        messages = []
+        async def send(message):
+            messages.append(message)
+        await middleware({"type": "http", "method": "GET", "path": path}, None, send)
+        return messages[0]["status"], dict(messages[0]["headers"])
+
+    async def scenario():
+        return await asyncio.gather(call("/employees"), call("/employees/"), call("/metrics"))
+
+    (first, _), (second, headers), (metrics, _) = asyncio.run(scenario())
+    assert first == 200 and metrics == 200
+    assert second == 503 and headers[b"retry-after"] == b"2"
+
+    assert classify({"method": "GET", "path": "/report/"}) == "reports"
+    assert classify({"method": "POST", "path": "/report"}) == "writes"
+    assert classify({"method": "OPTIONS", "path": "/employees"}) is None
@@ -1,8 +1,12 @@
+import asyncio
+import os
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from models import parametric, Employee, DailyAvailability
 from datetime import date, timedelta
+from services.availabilityEvents import availability_event_service
+from utils.eventHub import Event, EventHub, RESET
 
 # --- Fixtures de Datos ---
 
@@ -117,3 +121,263 @@ def test_get_availabilities_invalid_date_range_fails(client: TestClient):
     response = client.get(f"/availabilities/?start_date={today.isoformat()}&end_date={yesterday.isoformat()}")
     assert response.status_code == 400
     assert "Start date cannot be after end date" in response.json()["detail"]
+
+def test_get_availabilities_by_date_range_not_modified(client: TestClient, sample_employee, parametric_data):
+    _, _, _, status_disponible_id, _ = parametric_data
+    today = date.today()
+    url = f"/availabilities/?start_date={today.isoformat()}&end_date={today.isoformat()}"
+    client.post("/availabilities/", json={"employee_id": sample_employee.id, "date": today.isoformat(), "status_id": status_disponible_id})
+
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # Un nuevo registro en el rango cambia la versión
+    tomorrow = today + timedelta(days=1)
+    client.post("/availabilities/", json={"employee_id": sample_employee.id, "date": tomorrow.isoformat(), "status_id": status_disponible_id})
+    url = f"/availabilities/?start_date={today.isoformat()}&end_date={tomorrow.isoformat()}"
+    etag_range = client.get(url).headers["ETag"]
+    assert etag_range != etag
+
+# --- Pruebas de Archivo Histórico ---
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    from repositories import availability_archive_repo
+    monkeypatch.setattr(availability_archive_repo, "base_dir", str(tmp_path))
+    return tmp_path
+
+def test_archived_availabilities_are_read_transparently(client: TestClient, db: Session, sample_employee, parametric_data, archive_dir):
+    from services import availability_archive_service
+    _, _, _, status_disponible_id, status_vacaciones_id = parametric_data
+    old_date = date.today() - timedelta(days=400)
+    db.add_all([
+        DailyAvailability(employee_id=sample_employee.id, date=old_date, status_id=status_vacaciones_id),
+        DailyAvailability(employee_id=sample_employee.id, date=date.today(), status_id=status_disponible_id),
+    ])
+    db.commit()
+
+    archived = availability_archive_service.archive_older_than(db)
+    assert archived == {f"{old_date:%Y-%m}": 1}
+    assert db.query(DailyAvailability).filter(DailyAvailability.date == old_date).count() == 0
+    assert len(list(archive_dir.glob("*.parquet"))) == 1
+
+    # Consulta por rango que cruza la fecha de corte
+    response = client.get(f"/availabilities/?start_date={old_date.isoformat()}&end_date={date.today().isoformat()}")
+    assert response.status_code == 200
+    data = response.json()
+    assert [d["date"] for d in data] == [old_date.isoformat(), date.today().isoformat()]
+    assert data[0]["status"]["name"] == "Vacaciones"
+    assert data[0]["employee"]["id"] == sample_employee.id
+
+    # Listado por empleado: primero lo archivado, luego lo caliente
+    response = client.get(f"/availabilities/employee/{sample_employee.id}?skip=1&limit=1")
+    assert response.status_code == 200
+    assert [d["date"] for d in response.json()] == [date.today().isoformat()]
+
+def test_archive_stops_between_months(db: Session, sample_employee, parametric_data, archive_dir):
+    from services import availability_archive_service
+    _, _, _, status_disponible_id, _ = parametric_data
+    first = (date.today() - timedelta(days=500)).replace(day=1)
+    second = (first + timedelta(days=32)).replace(day=1)
+    db.add_all([
+        DailyAvailability(employee_id=sample_employee.id, date=first, status_id=status_disponible_id),
+        DailyAvailability(employee_id=sample_employee.id, date=second, status_id=status_disponible_id),
+    ])
+    db.commit()
+
+    reports = []
+    def stop_after_first(done, total):
+        reports.append((done, total))
+        raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        availability_archive_service.archive_older_than(db, on_month=stop_after_first)
+    # El primer mes quedó confirmado y archivado; el segundo sigue en la tabla
+    assert reports == [(1, 2)]
+    assert db.query(DailyAvailability).filter(DailyAvailability.date == first).count() == 0
+    assert db.query(DailyAvailability).filter(DailyAvailability.date == second).count() == 1
+    assert len(list(archive_dir.glob("*.parquet"))) == 1
+
+def test_export_rows_merge_archive_by_date_and_name(db: Session, sample_employee, parametric_data, archive_dir):
+    from services import availability_archive_service, availability_service
+    doc_type_id, gender_id, role_id, status_disponible_id, _ = parametric_data
+    old_date = date.today() - timedelta(days=400)
+    # "Ana" va antes que "Empleado Para Disponibilidad" aunque su fila se cree después
+    other = Employee(
+        document_number="556", full_name="Ana Archivo", birth_date="1995-01-01", hire_date="2024-01-01",
+        document_type_id=doc_type_id, gender_id=gender_id, operational_role_id=role_id,
+    )
+    db.add_all([other, DailyAvailability(employee_id=sample_employee.id, date=old_date, status_id=status_disponible_id)])
+    db.commit()
+    availability_archive_service.archive_older_than(db)
+    # Mismo día: una fila archivada y otra todavía en la tabla caliente
+    db.add(DailyAvailability(employee_id=other.id, date=old_date, status_id=status_disponible_id))
+    db.commit()
+
+    _, rows = availability_service.iter_detailed_rows(db, start_date=old_date, end_date=old_date)
+    assert [row[3] for row in rows] == ["Ana Archivo", "Empleado Para Disponibilidad"]
+
+def test_employee_listing_skips_archive_outside_range(client: TestClient, db: Session, sample_employee, parametric_data, archive_dir, monkeypatch):
+    from services import availability_archive_service
+    from repositories import availability_archive_repo
+    _, _, _, status_disponible_id, status_vacaciones_id = parametric_data
+    old_date = date.today() - timedelta(days=400)
+    db.add_all([
+        DailyAvailability(employee_id=sample_employee.id, date=old_date, status_id=status_vacaciones_id),
+        DailyAvailability(employee_id=sample_employee.id, date=date.today(), status_id=status_disponible_id),
+    ])
+    db.commit()
+    availability_archive_service.archive_older_than(db)
+
+    # Rango dentro del archivo: solo se abre el mes pedido
+    response = client.get(
+        f"/availabilities/employee/{sample_employee.id}?start_date={old_date.isoformat()}&end_date={old_date.isoformat()}"
+    )
+    assert response.status_code == 200
+    assert [d["date"] for d in response.json()] == [old_date.isoformat()]
+
+    # Rango posterior a la fecha de corte: el archivo no se toca
+    def fail_read(*args, **kwargs):
+        raise AssertionError("archive should not be read")
+    monkeypatch.setattr(availability_archive_repo, "read_employee_page", fail_read)
+    start = date.today() - timedelta(days=7)
+    response = client.get(f"/availabilities/employee/{sample_employee.id}?start_date={start.isoformat()}")
+    assert response.status_code == 200
+    assert [d["date"] for d in response.json()] == [date.today().isoformat()]
+
+    response = client.get(
+        f"/availabilities/employee/{sample_employee.id}?start_date={date.today().isoformat()}&end_date={start.isoformat()}"
+    )
+    assert response.status_code == 400
+
+def test_archiving_twice_does_not_duplicate_rows(db: Session, sample_employee, parametric_data, archive_dir):
+    from services import availability_archive_service
+    from repositories import availability_archive_repo
+    _, _, _, status_disponible_id, _ = parametric_data
+    old_date = date.today() - timedelta(days=400)
+    db.add(DailyAvailability(employee_id=sample_employee.id, date=old_date, status_id=status_disponible_id))
+    db.commit()
+
+    availability_archive_service.archive_older_than(db)
+    archived_rows = availability_archive_repo.read()
+    # Simula un archivado interrumpido: la misma fila se vuelve a escribir, ya modificada
+    archived_rows[0]["notes"] = "Actualizada"
+    availability_archive_repo.write_month(old_date.year, old_date.month, [archived_rows])
+    rows = availability_archive_repo.read()
+    assert len(rows) == 1
+    assert rows[0]["notes"] == "Actualizada"
+
+def test_employee_listing_reads_only_the_archived_months_of_the_page(client: TestClient, db: Session, sample_employee, parametric_data, archive_dir, monkeypatch):
+    import pyarrow.parquet as pq
+    from services import availability_archive_service
+    _, _, _, status_disponible_id, _ = parametric_data
+    first_month = (date.today() - timedelta(days=500)).replace(day=1)
+    months = [first_month]
+    for _ in range(2):
+        months.append((months[-1] + timedelta(days=32)).replace(day=1))
+    db.add_all([
+        DailyAvailability(employee_id=sample_employee.id, date=month, status_id=status_disponible_id)
+        for month in months
+    ] + [DailyAvailability(employee_id=sample_employee.id, date=date.today(), status_id=status_disponible_id)])
+    db.commit()
+    availability_archive_service.archive_older_than(db)
+
+    opened = []
+    read_table = pq.read_table
+    def spy_read_table(path, *args, **kwargs):
+        opened.append(path)
+        return read_table(path, *args, **kwargs)
+    monkeypatch.setattr(pq, "read_table", spy_read_table)
+
+    # Segunda fila: el primer mes se cuenta por metadatos y el tercero no hace falta
+    response = client.get(f"/availabilities/employee/{sample_employee.id}?skip=1&limit=1")
+    assert response.status_code == 200
+    assert [d["date"] for d in response.json()] == [months[1].isoformat()]
+    assert [os.path.basename(path) for path in opened] == [f"daily_availabilities_{months[1]:%Y_%m}.parquet"]
+
+    # Página posterior a todo lo archivado: solo la tabla caliente
+    opened.clear()
+    response = client.get(f"/availabilities/employee/{sample_employee.id}?skip=3&limit=10")
+    assert response.status_code == 200
+    assert [d["date"] for d in response.json()] == [date.today().isoformat()]
+    assert opened == []
+
+# --- Pruebas de Eventos (SSE) ---
+
+def test_availability_changes_are_published(client: TestClient, sample_employee, parametric_data):
+    _, _, role_id, status_disponible_id, status_vacaciones_id = parametric_data
+    hub = availability_event_service.hub
+
+    created = client.post("/availabilities/", json={
+        "employee_id": sample_employee.id, "date": date.today().isoformat(), "status_id": status_disponible_id,
+    }).json()
+    client.put(f"/availabilities/{created['id']}", json={"status_id": status_vacaciones_id})
+    assert client.delete(f"/availabilities/{created['id']}").status_code == 200
+
+    events = list(hub._buffer)[-3:]
+    assert [(e.type, e.data["id"]) for e in events] == [
+        ("availability.created", created["id"]),
+        ("availability.updated", created["id"]),
+        ("availability.deleted", created["id"]),
+    ]
+    assert events[1].data["status_id"] == status_vacaciones_id
+    assert events[0].data["operational_role_id"] == role_id
+
+def test_events_are_dispatched_on_commit_and_dropped_on_rollback():
+    from sqlalchemy import text
+    from db.session import SessionLocal
+
+    hub = availability_event_service.hub
+    session = SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
+        discarded = Event("availability.updated", {"id": 1})
+        availability_event_service.publish(session, discarded)
+        session.rollback()
+
+        session.execute(text("SELECT 1"))
+        committed = Event("availability.updated", {"id": 2})
+        availability_event_service.publish(session, committed)
+        assert hub.last_event_id() != committed.id
+        session.commit()
+    finally:
+        session.close()
+    assert hub.last_event_id() == committed.id
+    assert discarded.id not in [event.id for event in hub._buffer]
+
+def test_event_hub_replays_after_last_event_id_and_resets_when_evicted():
+    hub = EventHub(buffer_size=3)
+
+    async def scenario():
+        for i in range(5):
+            hub.dispatch(Event("availability.created", {"id": i, "date": "2025-01-01"}))
+        ids = [event.id for event in hub._buffer]
+
+        _, replay = hub.subscribe(last_event_id=ids[0])
+        assert [event.data["id"] for event in replay] == [3, 4]
+
+        _, replay = hub.subscribe(lambda event: event.data["id"] != 4, last_event_id=ids[0])
+        assert [event.data["id"] for event in replay] == [3]
+
+        # El id ya salió del buffer: el cliente debe resincronizar
+        _, replay = hub.subscribe(last_event_id="evicted")
+        assert replay is None
+
+        subscription, _ = hub.subscribe()
+        hub.dispatch(Event("availability.updated", {"id": 9}))
+        event = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+        assert event.data["id"] == 9
+
+    asyncio.run(scenario())
+
+def test_slow_subscriber_gets_reset():
+    hub = EventHub(buffer_size=10, max_queue=2)
+
+    async def scenario():
+        subscription, _ = hub.subscribe()
+        for i in range(3):
+            hub.dispatch(Event("availability.created", {"id": i}))
+        await asyncio.sleep(0)
+        assert await subscription.queue.get() is RESET
+
+    asyncio.run(scenario())
@@ -1,7 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from models import parametric, Employee
+from datetime import date, timedelta
+from models import parametric, Employee, DailyAvailability
+from services.availabilityEvents import availability_event_service
+from routes.employees import employee_fields
 
 # --- Fixtures de Datos Reutilizables ---
 
@@ -100,6 +104,208 @@ def test_delete_employee(client: TestClient, sample_employees):
     response = client.get(f"/employees/{employee_id}")
     assert response.status_code == 404
 
+def test_delete_employee_cascades_to_availabilities(client: TestClient, db: Session, sample_employees):
+    employee_id = sample_employees[0].id
+    status = parametric.AvailabilityStatus(name="Disponible (Cascade Test)")
+    db.add(status)
+    db.commit()
+    db.add_all([
+        DailyAvailability(employee_id=employee_id, date=date.today() + timedelta(days=i), status_id=status.id)
+        for i in range(3)
+    ])
+    db.commit()
+    db.expire_all()
+
+    response = client.delete(f"/employees/{employee_id}")
+    assert response.status_code == 200
+    assert db.query(DailyAvailability).filter(DailyAvailability.employee_id == employee_id).count() == 0
+
+# --- Pruebas de Retiro Masivo ---
+
+def test_terminate_employees_in_bulk(client: TestClient, db: Session, sample_employees):
+    first, second, _ = sample_employees
+    status = parametric.AvailabilityStatus(name="Disponible (Termination Test)")
+    db.add(status)
+    db.commit()
+    termination_date = date.today()
+    db.add_all([
+        DailyAvailability(employee_id=employee.id, date=termination_date + timedelta(days=offset), status_id=status.id)
+        for employee in (first, second)
+        for offset in (-1, 0, 1, 2)
+    ])
+    db.commit()
+
+    response = client.post("/employees/terminations", json={
+        "employee_ids": [first.id, second.id, 99999],
+        "termination_date": termination_date.isoformat(),
+        "reason_for_termination": "Fin de contrato",
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["terminated_ids"] == sorted([first.id, second.id])
+    assert data["already_inactive_ids"] == []
+    assert data["not_found_ids"] == [99999]
+    assert data["removed_availabilities"] == 4
+
+    # Un evento agregado para el retiro, no uno por disponibilidad eliminada
+    bulk_event = availability_event_service.hub._buffer[-1]
+    assert bulk_event.type == "availability.bulk_deleted"
+    assert bulk_event.data["count"] == 4
+    assert bulk_event.data["employee_ids"] == sorted([first.id, second.id])
+    assert bulk_event.data["start_date"] == (termination_date + timedelta(days=1)).isoformat()
+    assert bulk_event.data["end_date"] == (termination_date + timedelta(days=2)).isoformat()
+
+    db.expire_all()
+    assert db.get(Employee, first.id).is_active is False
+    assert db.get(Employee, first.id).reason_for_termination == "Fin de contrato"
+    remaining = db.query(DailyAvailability).filter(DailyAvailability.employee_id == first.id).all()
+    assert sorted(a.date for a in remaining) == [termination_date - timedelta(days=1), termination_date]
+
+def test_terminate_employees_leaves_inactive_ones_untouched(client: TestClient, db: Session, sample_employees):
+    first, second, _ = sample_employees
+    termination_date = date.today()
+    client.post("/employees/terminations", json={
+        "employee_ids": [first.id],
+        "termination_date": termination_date.isoformat(),
+        "reason_for_termination": "Fin de contrato",
+    })
+
+    # Un reintento sin Idempotency-Key y con otros datos no reescribe el retiro original
+    response = client.post("/employees/terminations", json={
+        "employee_ids": [first.id, second.id],
+        "termination_date": (termination_date - timedelta(days=10)).isoformat(),
+        "reason_for_termination": "Renuncia",
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["terminated_ids"] == [second.id]
+    assert data["already_inactive_ids"] == [first.id]
+    assert data["not_found_ids"] == []
+
+    db.expire_all()
+    assert db.get(Employee, first.id).termination_date == termination_date
+    assert db.get(Employee, first.id).reason_for_termination == "Fin de contrato"
+
+def test_terminate_employees_requires_ids(client: TestClient):
+    response = client.post("/employees/terminations", json={"employee_ids": [], "termination_date": "2025-01-01"})
+    assert response.status_code == 422
+
+# --- Pruebas de Búsqueda por Lotes ---
+
+def test_lookup_employees_preserves_request_order(client: TestClient, sample_employees):
+    first, second, third = sample_employees
+    response = client.post("/employees/lookup", json={
+        "ids": [third.id, 99999, first.id, third.id],
+        "document_numbers": ["102", "101", "NOPE"],
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert [e["id"] for e in data["employees"]] == [third.id, first.id, second.id]
+    assert data["employees"][0]["operational_role"]["name"] == "Rol A"
+    assert data["not_found_ids"] == [99999]
+    assert data["not_found_document_numbers"] == ["NOPE"]
+
+def test_lookup_employees_requires_keys(client: TestClient):
+    assert client.post("/employees/lookup", json={}).status_code == 422
+    assert client.post("/employees/lookup", json={"ids": list(range(501))}).status_code == 422
+
+# --- Pruebas de Disponibilidades Embebidas ---
+
+def test_get_employee_omits_availabilities_by_default(client: TestClient, sample_employees):
+    response = client.get(f"/employees/{sample_employees[0].id}")
+    assert response.status_code == 200
+    assert "availabilities" not in response.json()
+
+def test_get_employee_includes_availabilities_within_window(client: TestClient, db: Session, sample_employees):
+    employee = sample_employees[0]
+    status = parametric.AvailabilityStatus(name="Disponible (Include Test)")
+    db.add(status)
+    db.commit()
+    today = date.today()
+    # Se insertan fuera de orden: la respuesta las trae ordenadas por fecha
+    db.add_all([
+        DailyAvailability(employee_id=employee.id, date=today + timedelta(days=5), status_id=status.id),
+        DailyAvailability(employee_id=employee.id, date=today, status_id=status.id),
+        DailyAvailability(employee_id=employee.id, date=today - timedelta(days=60), status_id=status.id),
+    ])
+    db.commit()
+
+    response = client.get(f"/employees/{employee.id}?include=availabilities&availability_window=30d")
+    assert response.status_code == 200
+    dates = [item["date"] for item in response.json()["availabilities"]]
+    assert dates == [today.isoformat(), (today + timedelta(days=5)).isoformat()]
+    assert response.json()["availabilities"][0]["status"]["name"] == "Disponible (Include Test)"
+
+def test_get_employee_rejects_invalid_include_or_window(client: TestClient, sample_employees):
+    employee_id = sample_employees[0].id
+    assert client.get(f"/employees/{employee_id}?include=contracts").status_code == 400
+    assert client.get(f"/employees/{employee_id}?include=availabilities&availability_window=400d").status_code == 400
+    assert client.get(f"/employees/{employee_id}?include=availabilities&availability_window=30").status_code == 422
+
+# --- Pruebas de GET Condicional ---
+
+def test_get_employee_not_modified(client: TestClient, sample_employees):
+    employee_id = sample_employees[0].id
+    response = client.get(f"/employees/{employee_id}")
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert "Last-Modified" in response.headers
+
+    response = client.get(f"/employees/{employee_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    last_modified = client.get(f"/employees/{employee_id}").headers["Last-Modified"]
+    response = client.get(f"/employees/{employee_id}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+def test_get_employee_with_availabilities_is_validated_by_etag_only(client: TestClient, db: Session, sample_employees):
+    employee = sample_employees[0]
+    status = parametric.AvailabilityStatus(name="Disponible (ETag Test)")
+    db.add(status)
+    db.commit()
+    today = date.today()
+    db.add_all([
+        DailyAvailability(employee_id=employee.id, date=today, status_id=status.id),
+        DailyAvailability(employee_id=employee.id, date=today + timedelta(days=1), status_id=status.id),
+    ])
+    db.commit()
+    url = f"/employees/{employee.id}?include=availabilities&availability_window=30d"
+    response = client.get(url)
+    # Borrar una fila de la ventana no mueve ningún updated_at: no hay Last-Modified
+    assert "Last-Modified" not in response.headers
+    etag = response.headers["ETag"]
+
+    availability_id = response.json()["availabilities"][1]["id"]
+    assert client.delete(f"/availabilities/{availability_id}").status_code == 200
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+def test_get_employee_etag_changes_after_update(client: TestClient, db: Session, sample_employees):
+    employee_id = sample_employees[0].id
+    # Toda la prueba corre en una transacción y now() no avanza: se simula una versión anterior
+    sample_employees[0].updated_at = sample_employees[0].updated_at - timedelta(minutes=5)
+    db.commit()
+    etag = client.get(f"/employees/{employee_id}").headers["ETag"]
+    client.put(f"/employees/{employee_id}", json={"full_name": "Nombre Nuevo"})
+
+    response = client.get(f"/employees/{employee_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Nombre Nuevo"
+
+def test_list_employees_not_modified_until_collection_changes(client: TestClient, sample_employees):
+    etag = client.get("/employees/?is_active=true").headers["ETag"]
+    assert client.get("/employees/?is_active=true", headers={"If-None-Match": etag}).status_code == 304
+
+    client.delete(f"/employees/{sample_employees[0].id}")
+    assert client.get("/employees/?is_active=true", headers={"If-None-Match": etag}).status_code == 200
+
+def test_list_employees_etag_changes_on_rename(client: TestClient, sample_employees):
+    # Un cambio de nombre no mueve los contadores por rol y, dentro de la misma
+    # transacción, tampoco max(updated_at): la versión de la colección sí cambia
+    etag = client.get("/employees/?is_active=true").headers["ETag"]
+    client.put(f"/employees/{sample_employees[0].id}", json={"full_name": "Nombre Renombrado"})
+    assert client.get("/employees/?is_active=true", headers={"If-None-Match": etag}).status_code == 200
+
 # --- Pruebas de Listado, Filtros y Búsqueda ---
 
 def test_get_all_employees_paginated(client: TestClient, sample_employees):
@@ -123,6 +329,35 @@ def test_filter_employees_by_active_status(client: TestClient, sample_employees)
     assert len(data) == 1
     assert data[0]["full_name"] == "Pedro Inactivo (A)"
 
+def test_list_employees_reports_total_count(client: TestClient, sample_employees):
+    response = client.get("/employees/?is_active=true&limit=1")
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.headers["X-Total-Count"] == "2"
+
+    # Más allá de la última página también se informa el total
+    response = client.get("/employees/?skip=10")
+    assert response.json() == []
+    assert response.headers["X-Total-Count"] == "3"
+
+def test_search_reports_exact_total_from_the_page_query(client: TestClient, sample_employees):
+    response = client.get("/employees/?search=(A)&limit=1")
+    assert len(response.json()) == 1
+    assert response.headers["X-Total-Count"] == "2"
+    assert "X-Total-Count-Estimated" not in response.headers
+
+    response = client.get("/employees/?search=(A)&skip=10&fields=full_name")
+    assert response.json() == []
+    assert response.headers["X-Total-Count"] == "2"
+
+def test_search_over_large_sets_reports_an_estimate(client: TestClient, sample_employees, monkeypatch):
+    from core.config import settings
+    monkeypatch.setattr(settings, "EMPLOYEE_EXACT_COUNT_LIMIT", -1)
+    response = client.get("/employees/?search=(A)")
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count-Estimated"] == "true"
+    assert int(response.headers["X-Total-Count"]) >= 0
+
 def test_search_employees_by_name_and_document(client: TestClient, sample_employees):
     # Búsqueda por nombre
     response = client.get("/employees/?search=Juan")
@@ -133,3 +368,44 @@ def test_search_employees_by_name_and_document(client: TestClient, sample_employ
     assert response.status_code == 200
     assert len(response.json()) == 1
     assert response.json()[0]["full_name"] == "Ana Gomez (B)"
+
+# --- Pruebas de Carga Ansiosa y Campos Dispersos ---
+
+def test_list_employees_loads_relations_without_per_row_queries(client: TestClient, db: Session, sample_employees):
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", count)
+    try:
+        response = client.get("/employees/")
+    finally:
+        event.remove(connection, "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    assert response.json()[0]["operational_role"]["name"] in ("Rol A", "Rol B")
+    # Los catálogos vienen en el mismo JOIN del listado: ninguna carga perezosa por fila
+    lazy_loads = [
+        s for s in statements
+        if any(f"WHERE {table}.id =" in s for table in ("document_types", "genders", "operational_roles"))
+    ]
+    assert lazy_loads == []
+
+def test_list_employees_with_sparse_fields(client: TestClient, sample_employees):
+    response = client.get("/employees/?fields=full_name,operational_role_name&is_active=false")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": sample_employees[2].id, "full_name": "Pedro Inactivo (A)", "operational_role_name": "Rol A"}
+    ]
+
+def test_list_employees_with_unknown_field_fails(client: TestClient, sample_employees):
+    response = client.get("/employees/?fields=full_name,salary")
+    assert response.status_code == 400
+    assert "salary" in response.json()["detail"]
+
+def test_sparse_fields_are_canonicalized():
+    # Cualquier orden o repetición de los mismos campos reutiliza el mismo esquema
+    assert employee_fields("operational_role_name,full_name,full_name") == ("id", "full_name", "operational_role_name")
+    assert employee_fields("full_name,operational_role_name") == employee_fields("operational_role_name,full_name")
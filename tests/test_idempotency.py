@@ -0,0 +1,87 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from db.session import SessionLocal, engine
+from models import parametric, Employee
+from repositories import idempotency_key_repo
+
+# Las respuestas se guardan en su propia conexión (fuera de la transacción del test),
+# así que cada prueba usa llaves nuevas.
+
+@pytest.fixture
+def employee_data(db: Session):
+    doc_type = parametric.DocumentType(name="DocType Idempotency Test")
+    gender = parametric.Gender(name="Gender Idempotency Test")
+    role = parametric.OperationalRole(name="Rol Idempotency Test")
+    db.add_all([doc_type, gender, role])
+    db.commit()
+    return {
+        "document_number": f"IDEM-{uuid.uuid4().hex[:8]}",
+        "full_name": "Empleado Idempotente",
+        "birth_date": "1995-05-05",
+        "hire_date": "2024-01-01",
+        "document_type_id": doc_type.id,
+        "gender_id": gender.id,
+        "operational_role_id": role.id,
+    }
+
+def test_retry_with_same_key_replays_first_response(client: TestClient, db: Session, employee_data):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    first = client.post("/employees/", json=employee_data, headers=headers)
+    assert first.status_code == 201
+    assert "idempotent-replayed" not in first.headers
+
+    retry = client.post("/employees/", json=employee_data, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert db.query(Employee).filter(Employee.document_number == employee_data["document_number"]).count() == 1
+
+def test_without_key_a_retry_conflicts(client: TestClient, employee_data):
+    assert client.post("/employees/", json=employee_data).status_code == 201
+    assert client.post("/employees/", json=employee_data).status_code == 409
+
+def test_error_responses_are_replayed(client: TestClient, employee_data):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    employee_data["gender_id"] = 999999
+    first = client.post("/employees/", json=employee_data, headers=headers)
+    assert first.status_code == 404
+    retry = client.post("/employees/", json=employee_data, headers=headers)
+    assert retry.status_code == 404
+    assert retry.headers["idempotent-replayed"] == "true"
+
+def test_same_key_with_different_body_is_rejected(client: TestClient, employee_data):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    assert client.post("/employees/", json=employee_data, headers=headers).status_code == 201
+    employee_data["full_name"] = "Otro Nombre"
+    response = client.post("/employees/", json=employee_data, headers=headers)
+    assert response.status_code == 422
+    assert "different request" in response.json()["detail"]
+
+def test_concurrent_request_waits_for_in_flight_key():
+    owner, key = "test-owner", str(uuid.uuid4())
+    with engine.connect() as first_connection, engine.connect() as second_connection:
+        first = SessionLocal(bind=first_connection)
+        second = SessionLocal(bind=second_connection)
+        assert idempotency_key_repo.lock(first, owner=owner, key=key, timeout_seconds=1)
+        assert not idempotency_key_repo.lock(second, owner=owner, key=key, timeout_seconds=0.1)
+        idempotency_key_repo.unlock(first, owner=owner, key=key)
+        assert idempotency_key_repo.lock(second, owner=owner, key=key, timeout_seconds=0.1)
+        idempotency_key_repo.unlock(second, owner=owner, key=key)
+        first.close()
+        second.close()
+
+def test_keyed_requests_beyond_the_lock_pool_get_503(client: TestClient, employee_data, monkeypatch):
+    from sqlalchemy import create_engine
+    from core.config import settings
+    from utils import idempotency
+
+    # Pool de locks de una conexión, ya ocupada: la petición no toca el pool de la API
+    lock_engine = create_engine(settings.DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=0.1)
+    monkeypatch.setattr(idempotency, "get_lock_engine", lambda: lock_engine)
+    with lock_engine.connect():
+        response = client.post("/employees/", json=employee_data, headers={"Idempotency-Key": str(uuid.uuid4())})
+    lock_engine.dispose()
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
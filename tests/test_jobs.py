@@ -0,0 +1,180 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from core.config import settings
+from models import parametric, Employee, DailyAvailability, Job, OutboxEvent
+from repositories import job_repo
+from services.availabilityEvents import availability_event_service
+from services.jobs import JOB_TYPES, job_service
+
+@pytest.fixture
+def setup_data(db: Session):
+    doc_type = parametric.DocumentType(name="DocType Jobs Test")
+    gender = parametric.Gender(name="Gender Jobs Test")
+    role = parametric.OperationalRole(name="Rol Jobs Test")
+    status = parametric.AvailabilityStatus(name="Estado Jobs Test")
+    db.add_all([doc_type, gender, role, status])
+    db.commit()
+    employees = [
+        Employee(
+            document_number=f"JOB-{i}", full_name=f"Empleado Jobs {i}", birth_date=date(1990, 1, 1),
+            hire_date=date(2024, 1, 1), document_type_id=doc_type.id, gender_id=gender.id,
+            operational_role_id=role.id,
+        )
+        for i in range(2)
+    ]
+    db.add_all(employees)
+    db.commit()
+    return employees, role, status
+
+@pytest.fixture
+def results_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RESULTS_DIR", str(tmp_path))
+    return tmp_path
+
+def run_job(db: Session, job_type: str) -> Job:
+    # Igual que JobService.run_next, sin el cupo ni el rollback final (la prueba corre en una transacción)
+    job = job_repo.claim(db, job_type=job_type, worker_id="test-worker")
+    assert job is not None
+    job_service._execute(db, job, JOB_TYPES[job_type])
+    db.expire_all()
+    return db.get(Job, job.id)
+
+def test_export_job_runs_and_result_is_downloadable(client: TestClient, db: Session, setup_data, results_dir):
+    employees, _, status = setup_data
+    today = date.today()
+    db.add(DailyAvailability(employee_id=employees[0].id, date=today, status_id=status.id, notes="turno"))
+    db.commit()
+
+    response = client.post("/jobs/availability-exports", json={
+        "start_date": today.isoformat(), "end_date": today.isoformat(),
+    })
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.json()["status"] == "queued"
+    assert response.headers["location"].endswith(f"/jobs/{job_id}")
+    assert client.get(f"/jobs/{job_id}/result").status_code == 409
+
+    job = run_job(db, "availability_export")
+    assert job.id == job_id and job.status == "succeeded"
+
+    data = client.get(f"/jobs/{job_id}").json()
+    assert data["result"] == {"rows": 1}
+    assert data["has_result_file"] is True
+    response = client.get(f"/jobs/{job_id}/result")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.strip().splitlines()
+    assert lines[0].startswith("id,date,employee_id")
+    assert "Empleado Jobs 0" in lines[1] and "turno" in lines[1]
+
+def test_export_job_streams_rows_without_a_query_per_row(db: Session, setup_data, results_dir, monkeypatch):
+    from sqlalchemy import event
+    import services.jobHandlers as job_handlers
+    employees, _, status = setup_data
+    today = date.today()
+    db.add_all([
+        DailyAvailability(employee_id=employee.id, date=today + timedelta(days=offset), status_id=status.id)
+        for employee in employees
+        for offset in range(3)
+    ])
+    db.commit()
+    # Un reporte de avance (y su commit) por fila: antes cada uno expiraba lo cargado
+    monkeypatch.setattr(job_handlers, "PROGRESS_EVERY", 1)
+    job_service.submit(db, "availability_export", {
+        "start_date": today.isoformat(), "end_date": (today + timedelta(days=2)).isoformat(),
+    })
+
+    selects = []
+    def count_selects(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and (
+            "daily_availabilities" in statement or "employees" in statement
+        ):
+            selects.append(statement)
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", count_selects)
+    try:
+        job = run_job(db, "availability_export")
+    finally:
+        event.remove(connection, "before_cursor_execute", count_selects)
+
+    assert job.status == "succeeded"
+    assert job.result == {"rows": 6}
+    # El conteo y la consulta de filas: ninguna recarga por fila
+    assert len(selects) == 2
+
+def test_schedule_job_creates_missing_availabilities(client: TestClient, db: Session, setup_data):
+    employees, role, status = setup_data
+    start = date.today() + timedelta(days=1)
+    existing = DailyAvailability(employee_id=employees[0].id, date=start, status_id=status.id)
+    db.add(existing)
+    db.commit()
+
+    response = client.post("/jobs/availability-schedules", json={
+        "start_date": start.isoformat(), "end_date": (start + timedelta(days=2)).isoformat(),
+        "status_id": status.id, "role_id": role.id,
+    })
+    assert response.status_code == 202
+
+    job = run_job(db, "availability_schedule")
+    assert job.status == "succeeded"
+    assert job.result == {"employees": 2, "created": 5, "skipped": 1}
+    assert job.progress_done == job.progress_total == 2
+    assert db.query(DailyAvailability).filter(DailyAvailability.date >= start).count() == 6
+    # Una alta en el outbox por cada fila devuelta por el INSERT ... ON CONFLICT DO NOTHING
+    created_events = db.query(OutboxEvent).filter(
+        OutboxEvent.event_type == "availability.created", OutboxEvent.aggregate_id != existing.id
+    ).all()
+    assert len(created_events) == 5
+    assert {e.payload["date"] for e in created_events} == {
+        (start + timedelta(days=offset)).isoformat() for offset in range(3)
+    }
+
+    # Un solo evento para el grupo, no uno por fila
+    event = availability_event_service.hub._buffer[-1]
+    assert event.type == "availability.bulk_created"
+    assert event.data["count"] == 5
+    assert event.data["operational_role_ids"] == [role.id]
+
+def test_cancel_queued_job(client: TestClient):
+    response = client.post("/jobs/availability-archives", json={})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    response = client.post(f"/jobs/{job_id}/cancel")
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert client.post(f"/jobs/{job_id}/cancel").json()["status"] == "cancelled"
+
+def test_cancel_finished_job_conflicts(client: TestClient, db: Session, setup_data, results_dir):
+    today = date.today().isoformat()
+    job_id = client.post("/jobs/availability-exports", json={"start_date": today, "end_date": today}).json()["id"]
+    run_job(db, "availability_export")
+    assert client.post(f"/jobs/{job_id}/cancel").status_code == 409
+
+def test_running_job_stops_when_cancelled(db: Session):
+    job = job_service.submit(db, "availability_archive", {})
+    job_repo.claim(db, job_type="availability_archive", worker_id="test-worker")
+    job_service.cancel_job(db, job.id)
+    assert job_repo.report_progress(db, id=job.id, worker_id="test-worker", done=1, total=None, message=None) is True
+
+def test_job_failed_as_stale_is_not_overwritten_by_its_worker(db: Session):
+    from sqlalchemy import func, update
+    job = job_service.submit(db, "availability_archive", {})
+    job_repo.claim(db, job_type="availability_archive", worker_id="test-worker")
+    db.execute(update(Job).where(Job.id == job.id).values(heartbeat_at=func.now() - func.make_interval(0, 0, 0, 1)))
+    assert job_repo.fail_stale(db, stale_seconds=60) == 1
+
+    # El worker sigue vivo: su próximo reporte lo detiene y su cierre no cambia el estado
+    assert job_repo.report_progress(db, id=job.id, worker_id="test-worker", done=1, total=None, message=None) is True
+    assert job_repo.finish(db, id=job.id, worker_id="test-worker", status="succeeded") is False
+    db.expire_all()
+    assert db.get(Job, job.id).status == "failed"
+
+def test_submission_validation_and_unknown_job(client: TestClient):
+    response = client.post("/jobs/availability-schedules", json={
+        "start_date": "2030-01-01", "end_date": "2031-06-01", "status_id": 1,
+    })
+    assert response.status_code == 422
+    assert client.get("/jobs/999999").status_code == 404
@@ -0,0 +1,70 @@
+import importlib.util
+import json
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+
+# run.py importa `scenarios` desde su propia carpeta
+LOADTEST_DIR = Path(__file__).resolve().parent.parent / "benchmarks" / "loadtest"
+sys.path.insert(0, str(LOADTEST_DIR))
+_spec = importlib.util.spec_from_file_location("loadtest_run", LOADTEST_DIR / "run.py")
+loadtest = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(loadtest)
+
+def make_summary(**overrides) -> dict:
+    summary = dict(
+        requests=1000, error_rate=0.0, throughput_rps=100.0,
+        p50_ms=10.0, p95_ms=20.0, p99_ms=40.0, sql_mean=3.0,
+    )
+    summary.update(overrides)
+    return summary
+
+def run_compare(tmp_path, base: dict, candidate: dict, threshold: float = 0.10) -> int:
+    paths = []
+    for name, total in (("base", base), ("candidate", candidate)):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps({
+            "meta": {"mix": "default", "concurrency": 32}, "scenarios": {"list": total}, "total": total,
+        }))
+        paths.append(str(path))
+    with pytest.raises(SystemExit) as exit_info:
+        loadtest.compare(Namespace(base=paths[0], candidate=paths[1], threshold=threshold))
+    return exit_info.value.code
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert loadtest.percentile(values, 0.50) == 50.0
+    assert loadtest.percentile(values, 0.95) == 95.0
+    assert loadtest.percentile(values, 0.99) == 99.0
+    assert loadtest.percentile([1.0, 2.0, 3.0], 0.50) == 2.0
+    assert loadtest.percentile([7.0], 0.99) == 7.0
+    assert loadtest.percentile([], 0.95) == 0.0
+
+def test_latency_and_throughput_threshold():
+    base = make_summary()
+    assert loadtest.regressions(base, make_summary(p95_ms=22.0, throughput_rps=90.0), 0.10) == []
+    found = loadtest.regressions(base, make_summary(p95_ms=22.1, throughput_rps=89.9), 0.10)
+    assert [reason.split()[0] for reason in found] == ["p95_ms", "throughput"]
+
+def test_error_rate_tolerates_one_point():
+    base = make_summary(error_rate=0.02)
+    assert loadtest.regressions(base, make_summary(error_rate=0.03), 0.10) == []
+    assert loadtest.regressions(base, make_summary(error_rate=0.031), 0.10)[0].startswith("error rate")
+
+def test_one_more_sql_statement_per_request_is_a_regression():
+    base = make_summary(sql_mean=3.0)
+    assert loadtest.regressions(base, make_summary(sql_mean=3.9), 0.10) == []
+    assert loadtest.regressions(base, make_summary(sql_mean=4.0), 0.10) == ["sql/request 3.0 -> 4.0"]
+    # Sin el encabezado en alguna de las corridas no se compara
+    assert loadtest.regressions(make_summary(sql_mean=None), make_summary(sql_mean=9.0), 0.10) == []
+
+def test_compare_exit_code(tmp_path):
+    assert run_compare(tmp_path, make_summary(), make_summary(p99_ms=43.0)) == 0
+    assert run_compare(tmp_path, make_summary(), make_summary(p99_ms=50.0)) == 1
+
+def test_compare_skips_scenarios_with_few_samples(tmp_path):
+    few = loadtest.MIN_SAMPLES - 1
+    assert run_compare(tmp_path, make_summary(requests=few), make_summary(requests=1000, p95_ms=200.0)) == 0
+    assert run_compare(tmp_path, make_summary(requests=loadtest.MIN_SAMPLES), make_summary(p95_ms=200.0)) == 1
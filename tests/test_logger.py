@@ -0,0 +1,37 @@
+import logging
+import queue
+import orjson
+from core.logger import JsonFormatter, NonBlockingQueueHandler, SamplingFilter, TraceContextFilter
+
+def make_record(name="services.employee", level=logging.INFO, msg="Getting employee: %s", args=(7,), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_includes_trace_and_extra_fields():
+    record = make_record(trace_id="ab" * 16, span_id="cd" * 8, job_id=3)
+    entry = orjson.loads(JsonFormatter("rh").format(record))
+    assert entry["message"] == "Getting employee: 7"
+    assert entry["level"] == "INFO" and entry["logger"] == "services.employee" and entry["service"] == "rh"
+    assert entry["trace_id"] == "ab" * 16 and entry["span_id"] == "cd" * 8
+    assert entry["job_id"] == 3
+
+def test_sampling_keeps_whole_traces_and_never_drops_warnings():
+    sampling = SamplingFilter(0.5, ["services"])
+    kept = [sampling.filter(make_record(trace_id=f"{i:032x}")) for i in range(10_000)]
+    assert 4_000 < sum(kept) < 6_000
+    # Misma traza, misma decisión
+    assert sampling.filter(make_record(trace_id=f"{1:032x}")) == kept[1]
+    assert sampling.filter(make_record(level=logging.WARNING, trace_id=f"{9_999:032x}"))
+    assert sampling.filter(make_record(name="core.dependencies", trace_id=f"{9_999:032x}"))
+
+def test_queue_handler_drops_instead_of_blocking_when_full():
+    log_queue = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(TraceContextFilter())
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert log_queue.qsize() == 1
+    queued = log_queue.get_nowait()
+    assert queued.msg == "Getting employee: 7" and queued.args is None
+    assert queued.trace_id is None
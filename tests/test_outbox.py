@@ -0,0 +1,92 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from models import parametric, Employee, OutboxEvent
+from core.config import settings
+from services.outbox import outbox_service
+from services.outboxSinks import MemorySink
+
+@pytest.fixture
+def setup_data(db: Session):
+    doc_type = parametric.DocumentType(name="DocType Outbox Test")
+    gender = parametric.Gender(name="Gender Outbox Test")
+    role = parametric.OperationalRole(name="Rol Outbox Test")
+    status = parametric.AvailabilityStatus(name="Estado Outbox Test")
+    db.add_all([doc_type, gender, role, status])
+    db.commit()
+    employee = Employee(
+        document_number="OUT-1", full_name="Empleado Outbox", birth_date=date(1990, 1, 1),
+        hire_date=date(2024, 1, 1), document_type_id=doc_type.id, gender_id=gender.id,
+        operational_role_id=role.id,
+    )
+    db.add(employee)
+    db.commit()
+    return employee, status
+
+def pending_events(db: Session) -> list[OutboxEvent]:
+    return db.query(OutboxEvent).filter(OutboxEvent.dispatched_at.is_(None)).order_by(OutboxEvent.id).all()
+
+def test_domain_changes_write_outbox_events(client: TestClient, db: Session, setup_data):
+    employee, status = setup_data
+    response = client.post("/availabilities/", json={
+        "employee_id": employee.id, "date": date.today().isoformat(), "status_id": status.id,
+    })
+    assert response.status_code == 201
+    client.put(f"/employees/{employee.id}", json={"is_active": False})
+
+    events = [(e.event_type, e.aggregate_id) for e in pending_events(db)]
+    assert events == [
+        ("employee.created", employee.id),
+        ("availability.created", response.json()["id"]),
+        ("employee.updated", employee.id),
+        ("employee.terminated", employee.id),
+    ]
+    assert pending_events(db)[2].payload["changed"] == ["is_active"]
+
+def test_dispatch_delivers_in_order_per_aggregate_with_retries(db: Session, setup_data):
+    employee, _ = setup_data
+    for name in ("Primero", "Segundo"):
+        employee.full_name = name
+        db.commit()
+
+    sink = MemorySink()
+    sink.fail_next = 1
+    outbox_service.dispatch_batch(db, sink)
+    assert sink.events == []
+    failed = pending_events(db)[0]
+    assert failed.attempts == 1 and failed.last_error
+
+    # Mientras el primer evento del agregado espera su reintento, los siguientes no salen
+    outbox_service.dispatch_batch(db, sink)
+    assert sink.events == []
+
+    db.execute(update(OutboxEvent).values(next_attempt_at=OutboxEvent.created_at - timedelta(seconds=1)))
+    while outbox_service.dispatch_batch(db, sink):
+        pass
+    delivered = [(e["type"], e["payload"].get("full_name")) for e in sink.events]
+    assert delivered == [
+        ("employee.created", "Empleado Outbox"),
+        ("employee.updated", "Primero"),
+        ("employee.updated", "Segundo"),
+    ]
+    assert pending_events(db) == []
+
+def test_purge_removes_only_events_dispatched_before_retention(db: Session, setup_data, monkeypatch):
+    employee, _ = setup_data
+    employee.full_name = "Pendiente"
+    db.commit()
+    sink = MemorySink()
+    outbox_service.dispatch_batch(db, sink)
+    assert len(sink.events) == 1 and len(pending_events(db)) == 1
+
+    monkeypatch.setattr(settings, "OUTBOX_DISPATCHED_RETENTION_HOURS", 24)
+    assert outbox_service.purge_dispatched(db) == 0
+
+    db.execute(update(OutboxEvent).where(OutboxEvent.dispatched_at.is_not(None)).values(
+        dispatched_at=OutboxEvent.dispatched_at - timedelta(hours=25)
+    ))
+    assert outbox_service.purge_dispatched(db) == 1
+    # El evento sin entregar se conserva
+    assert [e.event_type for e in db.query(OutboxEvent).all()] == ["employee.updated"]
@@ -19,6 +19,7 @@ def setup_roles_and_employees(db: Session):
     emp3 = Employee(document_number="803", full_name="Emp Rol B1", birth_date="1990-01-01", hire_date="2024-01-01", document_type_id=doc_type.id, gender_id=gender.id, operational_role_id=role_b.id)
     db.add_all([emp1, emp2, emp3])
     db.commit()
+    return role_a, role_b, [emp1, emp2, emp3]
 
 # --- Pruebas para Roles Operativos ---
 
@@ -36,6 +37,70 @@ def test_get_operational_roles_with_employee_count(client: TestClient, setup_rol
 
     assert role_a_data["employee_count"] == 2
     assert role_b_data["employee_count"] == 1
+    assert role_a_data["active_employee_count"] == 2
+
+def test_role_counts_follow_employee_changes(client: TestClient, db: Session, setup_roles_and_employees):
+    role_a, role_b, (emp1, emp2, emp3) = setup_roles_and_employees
+    # Cambio de rol, desactivación y eliminación actualizan los contadores
+    emp1.operational_role_id = role_b.id
+    emp3.is_active = False
+    db.commit()
+    db.delete(emp2)
+    db.commit()
+
+    data = {r["name"]: r for r in client.get("/options/operational-roles").json()}
+    assert data["Rol de Prueba A"]["employee_count"] == 0
+    assert data["Rol de Prueba B"]["employee_count"] == 2
+    assert data["Rol de Prueba B"]["active_employee_count"] == 1
+
+def test_role_counts_apply_one_aggregated_delta_per_statement(client: TestClient, db: Session, setup_roles_and_employees):
+    from sqlalchemy import case, update
+    role_a, role_b, (emp1, emp2, emp3) = setup_roles_and_employees
+    # Una sola sentencia intercambia roles y desactiva a un empleado
+    db.execute(
+        update(Employee)
+        .where(Employee.id.in_([emp1.id, emp3.id]))
+        .values(
+            operational_role_id=case((Employee.id == emp1.id, role_b.id), else_=role_a.id),
+            is_active=Employee.id != emp3.id,
+        )
+    )
+    # Actualizar solo el nombre no cambia ningún contador
+    db.execute(update(Employee).where(Employee.id == emp2.id).values(full_name="Emp Rol A2 Renombrado"))
+    db.commit()
+
+    data = {r["name"]: r for r in client.get("/options/operational-roles").json()}
+    assert data["Rol de Prueba A"]["employee_count"] == 2
+    assert data["Rol de Prueba A"]["active_employee_count"] == 1
+    assert data["Rol de Prueba B"]["employee_count"] == 1
+    assert data["Rol de Prueba B"]["active_employee_count"] == 1
+
+def test_rebuild_role_counts_repairs_drift(client: TestClient, db: Session, setup_roles_and_employees):
+    from models import OperationalRoleEmployeeCount
+    from services import operational_role_service
+    role_a, _, _ = setup_roles_and_employees
+    db.query(OperationalRoleEmployeeCount).filter(
+        OperationalRoleEmployeeCount.operational_role_id == role_a.id
+    ).update({"total_count": 99})
+    db.commit()
+
+    operational_role_service.rebuild_employee_counts(db)
+
+    data = {r["name"]: r for r in client.get("/options/operational-roles").json()}
+    assert data["Rol de Prueba A"]["employee_count"] == 2
+
+def test_bulk_loads_can_skip_role_counts(db: Session, setup_roles_and_employees):
+    from sqlalchemy import text
+    from models import OperationalRoleEmployeeCount
+    role_a, _, (emp1, _, _) = setup_roles_and_employees
+    db.execute(text("SELECT set_config('nutripae.skip_role_counts', 'on', true)"))
+    db.add(Employee(document_number="804", full_name="Emp Rol A3", birth_date="1990-01-01", hire_date="2024-01-01", document_type_id=emp1.document_type_id, gender_id=emp1.gender_id, operational_role_id=role_a.id))
+    db.flush()
+    db.execute(text("SELECT set_config('nutripae.skip_role_counts', 'off', true)"))
+
+    counts = db.get(OperationalRoleEmployeeCount, role_a.id)
+    db.refresh(counts)
+    assert counts.total_count == 2
 
 # --- Pruebas para otros datos paramétricos (casos simples) ---
 
@@ -69,3 +134,41 @@ def test_get_availability_statuses(client: TestClient, db: Session):
     assert response.status_code == 200
     assert isinstance(response.json(), list)
     assert len(response.json()) > 0
+
+# --- Pruebas del endpoint combinado y la caché ---
+
+def test_get_all_options_with_etag(client: TestClient, setup_roles_and_employees):
+    response = client.get("/options")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"document_types", "genders", "operational_roles", "availability_statuses"}
+    assert any(r["name"] == "Rol de Prueba A" for r in data["operational_roles"])
+    etag = response.headers["ETag"]
+
+    # Sin cambios: 304 sin cuerpo
+    response = client.get("/options", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+def test_options_cache_is_invalidated_on_write(client: TestClient, db: Session, setup_roles_and_employees):
+    etag = client.get("/options").headers["ETag"]
+
+    db.add(parametric.Gender(name="Gender Cache Test"))
+    db.commit()
+
+    response = client.get("/options", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert any(g["name"] == "Gender Cache Test" for g in response.json()["genders"])
+    assert response.headers["ETag"] != etag
+
+def test_cache_miss_falls_back_to_database(db: Session, setup_roles_and_employees):
+    from sqlalchemy import text
+    from services import operational_role_service
+    from services.parametricCache import parametric_cache
+    parametric_cache.get(db)
+    # Insertado como lo haría una migración o un seeder: ninguna sesión de este proceso lo marca
+    role_id = db.execute(text("INSERT INTO operational_roles (name) VALUES ('Rol Externo') RETURNING id")).scalar()
+    db.commit()
+
+    assert operational_role_service.get_by_id(db, role_id).name == "Rol Externo"
+    assert role_id in parametric_cache.get(db).by_id["operational_roles"]
@@ -0,0 +1,144 @@
+import re
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import Session
+from models import parametric, Employee, DailyAvailability
+from repositories import availability_repo, employee_repo
+
+# Estas pruebas ejecutan EXPLAIN sobre el SQL real que emite cada consulta de los
+# repositorios y verifican que el plan use el índice pensado para ella. No basta con
+# que no haya Seq Scan: con enable_seqscan desactivado PostgreSQL recorre entero la
+# pkey o la restricción única antes que la tabla, así que la prueba pasaría aunque
+# se perdiera el índice. Por eso cada prueba nombra el índice que espera.
+
+SEED_EMPLOYEES = 400
+SEED_DAYS = 30
+
+@pytest.fixture
+def seeded_data(db: Session):
+    """Siembra suficientes filas para que las estadísticas del planificador sean realistas."""
+    doc_type = parametric.DocumentType(name="DocType Plan Test")
+    gender = parametric.Gender(name="Gender Plan Test")
+    roles = [parametric.OperationalRole(name=f"Rol Plan Test {i}") for i in range(4)]
+    statuses = [parametric.AvailabilityStatus(name=f"Estado Plan Test {i}") for i in range(3)]
+    db.add_all([doc_type, gender, *roles, *statuses])
+    db.commit()
+
+    employee_ids = db.scalars(
+        insert(Employee).returning(Employee.id),
+        [
+            {
+                "document_number": f"PLAN-{i:05d}",
+                "full_name": f"Empleado Plan {i:05d}",
+                "birth_date": date(1990, 1, 1),
+                "hire_date": date(2024, 1, 1),
+                "document_type_id": doc_type.id,
+                "gender_id": gender.id,
+                "operational_role_id": roles[i % len(roles)].id,
+                "is_active": i % 10 != 0,
+            }
+            for i in range(SEED_EMPLOYEES)
+        ],
+    ).all()
+
+    start = date.today()
+    db.execute(
+        insert(DailyAvailability),
+        [
+            {
+                "employee_id": employee_id,
+                "date": start + timedelta(days=offset),
+                "status_id": statuses[(employee_id + offset) % len(statuses)].id,
+            }
+            for employee_id in employee_ids
+            for offset in range(SEED_DAYS)
+        ],
+    )
+    db.commit()
+    db.execute(text("ANALYZE employees"))
+    db.execute(text("ANALYZE daily_availabilities"))
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    return {"employee_ids": employee_ids, "role_id": roles[0].id, "start": start}
+
+
+def explain_plans(db: Session, run) -> list[str]:
+    """Ejecuta `run`, captura los SELECT que emite y devuelve el plan de cada uno."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+    assert captured, "The repository call did not emit any SELECT"
+    plans = []
+    cursor = connection.connection.cursor()
+    for statement, parameters in captured:
+        cursor.execute(f"EXPLAIN {statement}", parameters)
+        plans.append("\n".join(row[0] for row in cursor.fetchall()))
+    return plans
+
+
+def assert_uses_indexes(db: Session, run, *index_names: str):
+    """Falla si algún plan hace Seq Scan o si ninguno usa cada uno de los índices dados."""
+    plans = explain_plans(db, run)
+    for plan in plans:
+        assert "Seq Scan" not in plan, f"Sequential scan found in plan:\n{plan}"
+    for index_name in index_names:
+        assert any(re.search(rf"\b{re.escape(index_name)}\b", plan) for plan in plans), (
+            f"Index {index_name} not used:\n" + "\n\n".join(plans)
+        )
+
+# --- Disponibilidades ---
+
+def test_date_range_query_uses_indexes(db: Session, seeded_data):
+    start = seeded_data["start"]
+    assert_uses_indexes(db, lambda: availability_repo.get_by_date_range(
+        db, start_date=start, end_date=start + timedelta(days=2)
+    ), "ix_daily_availabilities_date_covering")
+
+def test_date_range_query_for_employee_uses_indexes(db: Session, seeded_data):
+    start = seeded_data["start"]
+    employee_id = seeded_data["employee_ids"][0]
+    assert_uses_indexes(db, lambda: availability_repo.get_by_date_range(
+        db, start_date=start, end_date=start + timedelta(days=7), employee_id=employee_id
+    ), "_employee_date_uc")
+
+def test_employee_listing_query_uses_indexes(db: Session, seeded_data):
+    # La restricción única (employee_id, date) es el índice del listado por empleado
+    employee_id = seeded_data["employee_ids"][0]
+    assert_uses_indexes(
+        db, lambda: availability_repo.get_by_employee(db, employee_id=employee_id), "_employee_date_uc"
+    )
+
+def test_employee_and_date_lookup_uses_indexes(db: Session, seeded_data):
+    employee_id = seeded_data["employee_ids"][0]
+    assert_uses_indexes(db, lambda: availability_repo.get_by_employee_and_date(
+        db, employee_id=employee_id, target_date=seeded_data["start"]
+    ), "_employee_date_uc")
+
+# --- Empleados ---
+
+def test_filter_by_role_and_status_uses_indexes(db: Session, seeded_data):
+    assert_uses_indexes(db, lambda: employee_repo.search_and_filter(
+        db, role_id=seeded_data["role_id"], is_active=True
+    ), "ix_employees_operational_role_id_is_active")
+
+def test_document_number_lookup_uses_indexes(db: Session, seeded_data):
+    assert_uses_indexes(
+        db,
+        lambda: employee_repo.get_by_document_number(db, document_number="PLAN-00042"),
+        "ix_employees_document_number",
+    )
+
+def test_batch_lookup_uses_indexes(db: Session, seeded_data):
+    assert_uses_indexes(db, lambda: employee_repo.get_many(
+        db, ids=seeded_data["employee_ids"][:50], document_numbers=["PLAN-00042", "PLAN-00300"]
+    ), "ix_employees_document_number")
@@ -0,0 +1,25 @@
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+def requests_by_path(suffix: str) -> dict[str, float]:
+    return {
+        sample.labels["path"]: sample.value
+        for metric in REGISTRY.collect() if metric.name == "fastapi_requests"
+        for sample in metric.samples
+        if sample.name == "fastapi_requests_total" and sample.labels["path"].endswith(suffix)
+    }
+
+def test_requests_are_labelled_with_the_route_template(client: TestClient):
+    before = requests_by_path("/employees/{employee_id}")
+    client.get("/employees/987654")
+    client.get("/employees/987655")
+    after = requests_by_path("/employees/{employee_id}")
+    assert len(after) == 1
+    path, count = next(iter(after.items()))
+    assert count - before.get(path, 0) == 2
+    # Ninguna ruta concreta con ids termina como etiqueta
+    assert not requests_by_path("/employees/987654")
+
+def test_unknown_paths_are_not_measured(client: TestClient):
+    assert client.get("/no-such-route/123").status_code == 404
+    assert not requests_by_path("/no-such-route/123")
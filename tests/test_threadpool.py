@@ -0,0 +1,44 @@
+import threading
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from utils.threadpool import TimedRoute, configure_handler_threadpool
+
+def phase_count(path: str, phase: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "fastapi_requests_phase_duration_seconds_count", {"method": "GET", "path": path, "phase": phase}
+    )
+    return value or 0
+
+def test_sync_handlers_run_in_sized_threadpool_and_record_phases():
+    router = APIRouter(prefix="/items", route_class=TimedRoute)
+    handler_threads = []
+
+    @router.get("/{item_id}")
+    def read_item(item_id: int, q: str = "x"):
+        handler_threads.append(threading.current_thread().name)
+        return {"item_id": item_id, "q": q}
+
+    @router.get("/")
+    async def list_items():
+        return []
+
+    app = FastAPI()
+    app.include_router(router, prefix="/timed-test")
+    configure_handler_threadpool(3)
+
+    before = phase_count("/timed-test/items/{item_id}", "handler")
+    with TestClient(app) as client:
+        # La firma original se conserva: validación de parámetros y respuesta iguales
+        assert client.get("/timed-test/items/7?q=y").json() == {"item_id": 7, "q": "y"}
+        assert client.get("/timed-test/items/abc").status_code == 422
+        assert client.get("/timed-test/items/").json() == []
+
+    assert phase_count("/timed-test/items/{item_id}", "handler") == before + 1
+    assert phase_count("/timed-test/items/{item_id}", "thread_wait") == before + 1
+    assert REGISTRY.get_sample_value("http_threadpool_capacity") == 3
+    assert REGISTRY.get_sample_value("http_threadpool_busy") == 0
+    assert REGISTRY.get_sample_value("http_threadpool_waiting") == 0
+    assert len(handler_threads) == 1
+    # La ruta del APIRouter sin prefijo no deja series
+    assert phase_count("/items/{item_id}", "handler") == 0
@@ -0,0 +1,42 @@
+import time
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode
+from utils.tracing import TailSpanProcessor, build_sampler
+
+def make_tracer(ratio: float, slow_seconds: float = 10.0):
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider(sampler=build_sampler(ratio))
+    provider.add_span_processor(TailSpanProcessor(SimpleSpanProcessor(exporter), slow_threshold_seconds=slow_seconds))
+    return provider.get_tracer("test"), exporter
+
+def exported_names(exporter: InMemorySpanExporter) -> list[str]:
+    return sorted(span.name for span in exporter.get_finished_spans())
+
+def test_sampled_traces_are_exported():
+    tracer, exporter = make_tracer(ratio=1.0)
+    with tracer.start_as_current_span("request"):
+        with tracer.start_as_current_span("SELECT"):
+            pass
+    assert exported_names(exporter) == ["SELECT", "request"]
+
+def test_unsampled_fast_traces_are_dropped():
+    tracer, exporter = make_tracer(ratio=0.0)
+    with tracer.start_as_current_span("request") as span:
+        assert span.is_recording()
+        with tracer.start_as_current_span("SELECT"):
+            pass
+    assert exported_names(exporter) == []
+
+def test_unsampled_error_and_slow_traces_are_kept_whole():
+    tracer, exporter = make_tracer(ratio=0.0, slow_seconds=0.01)
+    with tracer.start_as_current_span("failing") as span:
+        with tracer.start_as_current_span("POST check-authorization"):
+            pass
+        span.set_status(Status(StatusCode.ERROR))
+    with tracer.start_as_current_span("slow"):
+        with tracer.start_as_current_span("SELECT"):
+            time.sleep(0.02)
+    assert exported_names(exporter) == ["POST check-authorization", "SELECT", "failing", "slow"]
+    assert all(span.context.trace_flags.sampled for span in exporter.get_finished_spans())